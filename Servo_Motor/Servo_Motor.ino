@@ -56,6 +56,10 @@ bool direccionDerecha = true;
 unsigned long lastStepTime = 0;
 unsigned long stepDelay = 2500;
 
+// Aviso de fin de movimiento al PC. Cada comando de movimiento lo activa, así que todo
+// "A," o "S," recibe su FIN aunque ningún servo tenga que cambiar de ángulo.
+bool brazoEnMovimiento = false;
+
 // ----------------------
 // FUNCIONES DE PLANIFICACIÓN DE MOVIMIENTO
 // ----------------------
@@ -158,6 +162,17 @@ void actualizarMovimientos() {
       }
     }
   }
+
+  // Cuando termina el último perfil activo se avisa al PC (el siguiente punto espera este mensaje).
+  // Tras un comando sin ningún perfil activo, el FIN sale en esta misma vuelta.
+  bool algunoActivo = false;
+  for (int i = 0; i < 6; i++) {
+    if (profiles[i].active) algunoActivo = true;
+  }
+  if (brazoEnMovimiento && !algunoActivo) {
+    Serial.println("FIN: MOVIMIENTO");
+  }
+  brazoEnMovimiento = algunoActivo;
 }
 
 // ----------------------
@@ -213,6 +228,7 @@ void cmdGlobal(String cmd) {
   for (int i = 0; i < 6; i++) {
     iniciarMovimiento(i, angles[i]);
   }
+  brazoEnMovimiento = true;
   Serial.println("OK: MOVIMIENTO GLOBAL");
 }
 
@@ -224,6 +240,7 @@ void cmdIndividual(String cmd) {
   
   if (servoNum >= 1 && servoNum <= 6) {
     iniciarMovimiento(servoNum - 1, constrain(angle, 0.0, 180.0));
+    brazoEnMovimiento = true;
     Serial.print("OK: SERVO ");
     Serial.println(servoNum);
   }
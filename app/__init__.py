@@ -34,4 +34,8 @@ def create_app():
     app.register_blueprint(web_bp)
     app.register_blueprint(api_bp)
 
+    # 5. Canal de jog por WebSocket (opcional, ver routes_socket.py)
+    from app.routes_socket import init_socketio
+    init_socketio(app)
+
     return app
\ No newline at end of file
@@ -11,28 +11,49 @@ import subprocess
 # --- Importaciones de tus módulos de hardware ---
 from modulos.banda_transportadora import BandaTransportadora
 from modulos.brazo_robotico import BrazoRobotico
+from modulos.puerto_serie import PuertoSerie
+from modulos.jog import ControlJog
 from modulos.com_modbus import ModbusBridge # Corregido: en tu original era com_modbusTCP
+from modulos.camara import CapturaCamara, FuenteReproduccion, RITMO_TIEMPO_REAL
+from modulos.deteccion_cambios import DetectorCambios
+from modulos.reconocimiento import CascadaClasificacion
+from modulos.modelos import ConjuntoModelos, GestorModelos
+from modulos.consenso import ConsensoTemporal
+from modulos.seguimiento import SeguimientoBanda
+from modulos.inferencia import (EjecutorInferencia, PoolInferencia, SesionCombinada, crear_sesion,
+                                 buscar_modelo, BACKEND_TFLITE)
 
 # --- Configuración de Entorno ---
 IS_WINDOWS = platform.system() == "Windows"
 IS_LINUX = platform.system() == "Linux"
 CONFIG_FILE = "config.json" # Puedes mantenerlo o usar estado.json si prefieres la compatibilidad total
 
-# --- Selección del Backend de IA ---
-TFLITE_BACKEND = None
-try:
-    if IS_WINDOWS:
-        import tensorflow as tf
-        TFLITE_BACKEND = "tensorflow"
-    else:
-        import tflite_runtime.interpreter as tflite
-        TFLITE_BACKEND = "tflite_runtime"
-except ImportError:
-    try:
-        import tensorflow as tf
-        TFLITE_BACKEND = "tensorflow"
-    except ImportError:
-        print("ADVERTENCIA: No se encontró backend de TensorFlow/TFlite.")
+# Valores por defecto de la sección "vision" de config.json
+VISION_DEFAULTS = {
+    "modo_inferencia": "paralelo",  # "secuencial" o "paralelo" (forma y color a la vez)
+    "hilos_forma": 2,               # num_threads de TFLite para el modelo de formas
+    "hilos_color": 2,               # num_threads de TFLite para el modelo de colores
+    "tamano_pool": 1,               # Pares de intérpretes para clasificar varias regiones a la vez (1 = sin pool)
+    "compuerta_movimiento": True,   # Saltar las CNN mientras la escena no cambie
+    "umbral_cambio": 0.02,          # Fracción de píxeles que debe cambiar para reclasificar
+    "modo_clasificacion": "completo", # "completo" o "cascada" (omite etapas innecesarias)
+    "umbral_hsv_decisivo": 0.05,    # Fracción HSV mínima para omitir la CNN de color
+    "margen_hsv_decisivo": 2.0,     # Veces que el color HSV dominante supera al segundo
+    "modelo_cuantizado": True,      # Usar model.tflite (int8/uint8) si existe junto al flotante
+    "backend_forma": "tflite",      # "tflite", "opencv" (cv2.dnn) u "onnxruntime" (model.onnx)
+    "backend_color": "tflite",
+    "modelo_combinado": True,       # Usar uploads/model_combinado (forma y color en un invoke) si existe
+    "umbral_consenso": 1.5,         # Confianza acumulada para confirmar un objeto
+    "ventana_consenso": 10,         # Frames de la ventana de votación temporal
+    "margen_consenso": 0.5,         # Fracción de la evidencia que debe tener el ganador
+    "recogida_al_vuelo": False,     # Lanzar el movimiento sin parar la banda (requiere calibrar lo siguiente)
+    "eje_banda": "x",               # Eje de la imagen en el que avanza la banda ("x" o "y")
+    "linea_recogida": 0.5,          # Posición en ese eje (fracción del frame) donde recoge el brazo
+    "adelanto_recogida": 0.8,       # Segundos desde lanzar el movimiento hasta que la pinza llega a la banda
+    "cola_multiobjeto": False,      # Clasificar cada objeto seguido y recogerlos en orden desde una cola
+    "frames_vacios_limpieza": 5,    # Frames vacíos seguidos que dan por despejada la zona tras recoger
+    "tiempo_maximo_limpieza": 5.0   # Segundos máximos de limpieza antes de avisar y seguir
+}
 
 # --- FUNCIONES CRÍTICAS DE RUTAS (Restauradas del original) ---
 
@@ -62,6 +83,14 @@ def app_data_path(filename):
         application_path = os.path.abspath(".")
     return os.path.join(application_path, filename)
 
+def model_folder(name):
+    """
+    Carpeta de un modelo dentro de uploads/. La subida por el usuario (/upload_model,
+    junto al ejecutable) tiene prioridad sobre la empaquetada.
+    """
+    uploaded = app_data_path(os.path.join('uploads', name))
+    return uploaded if os.path.isdir(uploaded) else resource_path(os.path.join('uploads', name))
+
 # --- Clase Gestora de Hardware (Singleton) ---
 class RobotContext:
     def __init__(self):
@@ -70,17 +99,22 @@ class RobotContext:
         self.conveyor = None
         self.modbus = None
         self.serial_port = None
+        self.serial_io = None  # PuertoSerie: cola de comandos y lector de respuestas sobre serial_port
+        self.jog = None  # ControlJog: jog manual con frecuencia limitada (ver app/routes_socket.py)
+        
+        # Cámaras: un hilo de captura compartido por dispositivo
+        self.cameras = {}
+        self._camera_lock = threading.Lock()
         
-        # IA y Modelos
-        self.color_model = None
-        self.shape_model = None
-        # Necesitamos las etiquetas también para paridad con el original
-        self.color_labels = [] 
-        self.shape_labels = []
+        # IA y Modelos: sesiones, etiquetas e índices se publican juntos por versión
+        self.models = GestorModelos(self._build_models)
+        self.inference_executor = None
+        self.change_detector = None
+        self.classification_cascade = None
+        self.detection_consensus = None
+        self.belt_tracking = None
         
         # Estado de la Aplicación
-        self.fps = 0
-        self.current_frame = None
         self.total_objects = 0
         self.total_circles = 0
         self.last_classification = ""
@@ -96,17 +130,30 @@ class RobotContext:
                 "max_object_distance": 100,
                 "modbus_ip": "127.0.0.1",
                 "modbus_port": 5020
-            }
+            },
+            "vision": dict(VISION_DEFAULTS),
+            # Zonas de interés por cámara: {camera_id: [[x, y, ancho, alto], ...]} en fracciones 0-1
+            "rois": {},
+            # Cámaras virtuales: camera_id -> {"ruta", "ritmo", "bucle"} (vídeo o carpeta)
+            "fuentes_camara": {}
         }
         
         self.load_config()
 
+    @property
+    def fps(self):
+        """FPS reales del hilo de captura de la cámara principal."""
+        captura = self.cameras.get("default")
+        return captura.fps if captura else 0
+
     def load_config(self):
         path = app_data_path(CONFIG_FILE)
         if os.path.exists(path):
             try:
                 with open(path, 'r') as f:
                     self.config_data.update(json.load(f))
+                # Completar claves de visión que falten en configuraciones antiguas
+                self.config_data["vision"] = {**VISION_DEFAULTS, **self.config_data.get("vision", {})}
             except Exception as e:
                 logging.error(f"Error cargando config: {e}")
 
@@ -118,23 +165,90 @@ class RobotContext:
         except Exception as e:
             logging.error(f"Error guardando config: {e}")
 
+    def get_rois(self, camera_id="default"):
+        return self.config_data.get("rois", {}).get(camera_id, [])
+
+    def set_rois(self, camera_id, rois):
+        """
+        Valida y persiste las ROIs de una cámara. Cada ROI es [x, y, ancho, alto] con
+        valores entre 0 y 1 relativos al frame. Una lista vacía elimina el recorte.
+        """
+        validas = []
+        for roi in rois:
+            if len(roi) != 4:
+                raise ValueError(f"ROI inválida (se esperaban 4 valores): {roi}")
+            x, y, w, h = (float(v) for v in roi)
+            if not (0 <= x < 1 and 0 <= y < 1 and w > 0 and h > 0 and x + w <= 1 and y + h <= 1):
+                raise ValueError(f"ROI fuera de rango: {roi}")
+            validas.append([x, y, w, h])
+        self.config_data.setdefault("rois", {})[camera_id] = validas
+        self.save_config()
+        return validas
+
+    def get_camera_source(self, camera_id="default"):
+        return self.config_data.get("fuentes_camara", {}).get(camera_id)
+
+    def set_camera_source(self, camera_id, ruta=None, ritmo=RITMO_TIEMPO_REAL, bucle=True):
+        """
+        Sustituye la cámara física `camera_id` por la reproducción de un vídeo o de una
+        carpeta de imágenes (ruta relativa a la carpeta de datos, p. ej. "uploads/lote1").
+        Con ruta=None se vuelve al dispositivo real. La captura activa se reinicia.
+        """
+        fuentes = self.config_data.setdefault("fuentes_camara", {})
+        if ruta is None:
+            fuentes.pop(camera_id, None)
+        else:
+            fuente = FuenteReproduccion(app_data_path(ruta), ritmo, bucle)  # Valida ritmo y ruta
+            abierta = fuente.isOpened()
+            fuente.release()
+            if not abierta:
+                raise ValueError(f"No se puede reproducir: {ruta}")
+            fuentes[camera_id] = {"ruta": ruta, "ritmo": ritmo, "bucle": bucle}
+        self.save_config()
+        with self._camera_lock:
+            captura = self.cameras.pop(camera_id, None)
+        if captura:
+            captura.detener()
+
     def initialize_hardware(self):
         logging.info("Inicializando Hardware...")
         try:
             # Inicializamos objetos base (sin conexión serial aún)
             self.arm = BrazoRobotico()
             self.conveyor = BandaTransportadora()
+            self.jog = ControlJog(self.arm)
             logging.info("Instancias de hardware creadas.")
             
             # Inicializar Modbus automáticamente si estaba configurado
             self.initialize_modbus()
             
-            # Cargar modelos automáticamente
+            # Cargar modelos automáticamente (en segundo plano, no bloquea el arranque)
             self.load_models()
             
         except Exception as e:
             logging.error(f"Error inicializando hardware: {e}")
 
+    def start_serial_io(self):
+        """
+        Pone el puerto abierto bajo un único PuertoSerie (ver modulos/puerto_serie.py):
+        brazo y banda encolan sus comandos en él y el brazo espera en él el fin de cada movimiento.
+        """
+        self.stop_serial_io()
+        self.serial_io = PuertoSerie(self.serial_port)
+        self.serial_io.iniciar()
+        if self.conveyor:
+            self.conveyor.set_connection(self.serial_io)
+        if self.arm:
+            self.arm.set_connection(self.serial_io)
+            self.arm.set_lector(self.serial_io)
+
+    def stop_serial_io(self):
+        if self.serial_io:
+            self.serial_io.detener()
+            self.serial_io = None
+        if self.arm:
+            self.arm.set_lector(None)
+
     def initialize_modbus(self):
         ip = self.config_data['latest_position'].get('modbus_ip', '127.0.0.1')
         port = self.config_data['latest_position'].get('modbus_port', 502)
@@ -147,43 +261,226 @@ class RobotContext:
         except Exception as e:
             logging.error(f"Error Modbus: {e}")
 
-    def load_models(self):
-        """Carga modelos usando resource_path para compatibilidad con .exe"""
-        # Usamos resource_path para encontrar los modelos dentro del empaquetado o carpeta source
-        form_model_path = resource_path('uploads/model_form/model_unquant.tflite')
-        color_model_path = resource_path('uploads/model_color/model_unquant.tflite')
-        form_labels_path = resource_path('uploads/model_form/labels.txt')
-        color_labels_path = resource_path('uploads/model_color/labels.txt')
+    # --- Modelos (carga en segundo plano, ver modulos/modelos.py) ---
+    # Los atributos de siempre leen la instantánea publicada, que cambia de forma atómica.
+    shape_session = property(lambda self: self.models.actual.sesion_forma)
+    color_session = property(lambda self: self.models.actual.sesion_color)
+    # Compatibilidad: las rutas web comprueban shape_model/color_model para saber si hay modelos
+    shape_model = shape_session
+    color_model = color_session
+    shape_labels = property(lambda self: self.models.actual.etiquetas_forma)
+    color_labels = property(lambda self: self.models.actual.etiquetas_color)
+    shape_index = property(lambda self: self.models.actual.indice_forma)
+    color_index = property(lambda self: self.models.actual.indice_color)
+
+    def load_models(self, wait=False):
+        """
+        Programa la (re)carga de los modelos en segundo plano. Las peticiones web nunca
+        esperan: siguen usando la versión anterior hasta que la nueva esté calentada.
+        """
+        self.models.solicitar_carga()
+        if wait:
+            self.models.esperar()
+
+    def ensure_models(self):
+        """Dispara la primera carga si aún no se hizo (no bloquea)."""
+        self.models.asegurar_carga()
+
+    def _build_models(self, version):
+        """Carga real de una versión de los modelos (se ejecuta en el hilo de GestorModelos)."""
+        # model_folder: modelos subidos por el usuario o, si no hay, los del empaquetado
+        vision = self.config_data["vision"]
+        # Modelo multicabeza: una invocación y un backbone en memoria en lugar de dos
+        if vision["modelo_combinado"]:
+            combined = self._build_combined_models(version, vision)
+            if combined is not None:
+                return combined
+
+        # Backend por modelo; con TFLite, cuantizado (model.tflite) o flotante (model_unquant.tflite)
+        form_backend, color_backend = vision["backend_forma"], vision["backend_color"]
+        form_folder, color_folder = model_folder('model_form'), model_folder('model_color')
+        form_model_path = (buscar_modelo(form_folder, vision["modelo_cuantizado"], form_backend)
+                           or os.path.join(form_folder, 'model_unquant.tflite'))
+        color_model_path = (buscar_modelo(color_folder, vision["modelo_cuantizado"], color_backend)
+                            or os.path.join(color_folder, 'model_unquant.tflite'))
+        form_labels_path = os.path.join(form_folder, 'labels.txt')
+        color_labels_path = os.path.join(color_folder, 'labels.txt')
+
+        shape_session = self._load_single_model(form_model_path, vision["hilos_forma"], form_backend, "forma")
+        color_session = self._load_single_model(color_model_path, vision["hilos_color"], color_backend, "color")
 
-        self.shape_model = self._load_single_model(form_model_path)
-        self.color_model = self._load_single_model(color_model_path)
-        
         # Cargar etiquetas (labels)
+        shape_labels, color_labels = [], []
         if os.path.exists(form_labels_path):
             with open(form_labels_path, 'r', encoding='utf-8') as f:
-                self.shape_labels = f.read().splitlines()
+                shape_labels = f.read().splitlines()
         if os.path.exists(color_labels_path):
             with open(color_labels_path, 'r', encoding='utf-8') as f:
-                self.color_labels = f.read().splitlines()
+                color_labels = f.read().splitlines()
+        pool = None
+        if shape_session is not None and color_session is not None:
+            pool = self._create_inference_pool(lambda: (
+                self._load_single_model(form_model_path, vision["hilos_forma"], form_backend, "forma"),
+                self._load_single_model(color_model_path, vision["hilos_color"], color_backend, "color")))
+        return ConjuntoModelos(version, shape_session, color_session, shape_labels, color_labels,
+                               rutas=(form_model_path, color_model_path), pool=pool)
+
+    def _build_combined_models(self, version, vision):
+        """
+        Carga uploads/model_combinado (modelo + labels_forma.txt + labels_color.txt).
+        Devuelve None si no existe o no encaja, para usar los dos modelos separados.
+        """
+        folder = model_folder('model_combinado')
+        model_path = buscar_modelo(folder, vision["modelo_cuantizado"], vision["backend_forma"])
+        form_labels_path = os.path.join(folder, 'labels_forma.txt')
+        color_labels_path = os.path.join(folder, 'labels_color.txt')
+        if not (model_path and os.path.exists(form_labels_path) and os.path.exists(color_labels_path)):
+            return None
+        with open(form_labels_path, 'r', encoding='utf-8') as f:
+            shape_labels = f.read().splitlines()
+        with open(color_labels_path, 'r', encoding='utf-8') as f:
+            color_labels = f.read().splitlines()
+        session = self._load_combined_session(model_path, len(shape_labels), len(color_labels))
+        if session is None:
+            return None
+        logging.info(f"Modelo combinado forma+color cargado: {model_path}")
 
-    def _load_single_model(self, path):
+        def combined_pair():
+            pair_session = self._load_combined_session(model_path, len(shape_labels), len(color_labels))
+            return (pair_session, pair_session)
+
+        # La misma sesión ocupa los dos puestos: reconocimiento_de_objetos la detecta
+        return ConjuntoModelos(version, session, session, shape_labels, color_labels,
+                               ruta_combinada=model_path, pool=self._create_inference_pool(combined_pair))
+
+    def _load_combined_session(self, path, shape_classes, color_classes):
+        vision = self.config_data["vision"]
+        # Un solo modelo: puede usar el presupuesto de hilos de los dos
+        session = self._load_single_model(path, vision["hilos_forma"] + vision["hilos_color"],
+                                          vision["backend_forma"], "combinado")
+        if session is None:
+            return None
+        try:
+            return SesionCombinada(session, shape_classes, color_classes)
+        except ValueError as e:
+            logging.error(f"Modelo combinado no válido ({path}): {e}")
+            return None
+
+    def _load_single_model(self, path, num_threads=None, backend=BACKEND_TFLITE, name=""):
+        """Sesión de inferencia del modelo con el backend indicado (None si falla)."""
         if not os.path.exists(path):
             logging.warning(f"Modelo no encontrado en: {path}")
             return None
         try:
-            if TFLITE_BACKEND == "tensorflow":
-                interpreter = tf.lite.Interpreter(model_path=path)
-            elif TFLITE_BACKEND == "tflite_runtime":
-                interpreter = tflite.Interpreter(model_path=path)
-            else:
-                return None
-            interpreter.allocate_tensors()
-            return interpreter
+            return crear_sesion(path, name, backend, num_threads)
         except Exception as e:
             logging.error(f"Error cargando modelo {path}: {e}")
             return None
 
-    def get_camera(self):
+    def _create_inference_pool(self, factory):
+        """
+        PoolInferencia de `vision.tamano_pool` pares propios de la versión que se carga.
+        Devuelve None con tamaño 1 o si algún intérprete extra no se pudo crear.
+        """
+        size = self.config_data["vision"]["tamano_pool"]
+        if size <= 1:
+            return None
+
+        def checked_factory():
+            pair = factory()
+            if any(session is None for session in pair):
+                raise RuntimeError("no se pudo crear un par de intérpretes")
+            return pair
+
+        try:
+            return PoolInferencia(checked_factory, size)
+        except Exception as e:
+            logging.error(f"Pool de inferencia desactivado: {e}")
+            return None
+
+    def get_inference_executor(self):
+        """Ejecutor forma/color según `vision.modo_inferencia` (se crea una sola vez)."""
+        if self.inference_executor is None:
+            self.inference_executor = EjecutorInferencia(self.config_data["vision"]["modo_inferencia"])
+        return self.inference_executor
+
+    def create_change_detector(self):
+        """Compuerta de movimiento para el bucle de ejecución (None si está desactivada)."""
+        vision = self.config_data["vision"]
+        if not vision["compuerta_movimiento"]:
+            self.change_detector = None
+        else:
+            self.change_detector = DetectorCambios(umbral_area=vision["umbral_cambio"])
+        return self.change_detector
+
+    def create_classification_cascade(self):
+        """Configuración de cascada según `vision.modo_clasificacion` (None en modo completo)."""
+        vision = self.config_data["vision"]
+        if vision["modo_clasificacion"] != "cascada":
+            self.classification_cascade = None
+        else:
+            self.classification_cascade = CascadaClasificacion(vision["umbral_hsv_decisivo"],
+                                                               vision["margen_hsv_decisivo"])
+        return self.classification_cascade
+
+    def create_detection_consensus(self):
+        """Votación temporal del bucle de ejecución según `vision.*_consenso`."""
+        vision = self.config_data["vision"]
+        self.detection_consensus = ConsensoTemporal(vision["umbral_consenso"],
+                                                    vision["ventana_consenso"],
+                                                    vision["margen_consenso"])
+        return self.detection_consensus
+
+    def create_belt_tracking(self):
+        """
+        Seguimiento de objetos y velocidad de banda para el bucle de ejecución, o None si
+        no hay recogida al vuelo ni cola multiobjeto (así no se segmenta cada frame en balde).
+        """
+        vision = self.config_data["vision"]
+        if not (vision["recogida_al_vuelo"] or vision["cola_multiobjeto"]):
+            self.belt_tracking = None
+            return None
+        self.belt_tracking = SeguimientoBanda(vision["eje_banda"], vision["linea_recogida"],
+                                              vision["adelanto_recogida"], vision["recogida_al_vuelo"],
+                                              vision["cola_multiobjeto"])
+        return self.belt_tracking
+
+    def get_camera(self, camera_id="default"):
+        """
+        Devuelve un lector del servicio de captura compartido.
+        La cámara física se abre una sola vez; cada llamada crea un consumidor
+        independiente (read/isOpened/release) que lee el frame más reciente.
+        """
+        with self._camera_lock:
+            captura = self.cameras.get(camera_id)
+            if captura is None:
+                captura = CapturaCamara(lambda: self._open_camera_source(camera_id), nombre=camera_id)
+                self.cameras[camera_id] = captura
+            if not captura.iniciar():
+                return None
+        return captura.lector()
+
+    def release_cameras(self):
+        with self._camera_lock:
+            for captura in self.cameras.values():
+                captura.detener()
+            self.cameras.clear()
+
+    def _open_camera_source(self, camera_id):
+        """Cámara virtual si `fuentes_camara` tiene una entrada para camera_id; si no, la física."""
+        fuente = self.get_camera_source(camera_id)
+        if not fuente:
+            return self._open_camera_device()
+        reproduccion = FuenteReproduccion(app_data_path(fuente["ruta"]),
+                                          fuente.get("ritmo", RITMO_TIEMPO_REAL),
+                                          fuente.get("bucle", True))
+        if not reproduccion.isOpened():
+            logging.warning(f"No se puede reproducir {fuente['ruta']} para la cámara {camera_id}")
+            return None
+        logging.info(f"Cámara {camera_id}: reproduciendo {fuente['ruta']} ({reproduccion.fps:.0f} FPS)")
+        return reproduccion
+
+    def _open_camera_device(self):
         """
         Lógica robusta de recuperación de cámara (Paridad con app.py original)
         """
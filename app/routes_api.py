@@ -5,6 +5,7 @@ import json
 import threading
 import shutil
 import zipfile
+import tempfile
 import base64
 import logging
 import serial
@@ -16,7 +17,8 @@ from io import BytesIO
 from app.hardware import robot, app_data_path
 
 # --- Importaciones de Módulos de Lógica Existentes ---
-from modulos.ejecucion import iniciar_ejecucion, detener_ejecucion
+from modulos.ejecucion import iniciar_ejecucion, detener_ejecucion, estado_ejecucion, procesar_movimiento, biblioteca
+from modulos.perfil_movimiento import resumen_prediccion
 from modulos.cinematica_directa import forward_kinematics
 # Nota: Importamos cinemática inversa dentro de la función para evitar errores si el archivo falta
 
@@ -52,6 +54,7 @@ def listar_puertos():
 @api_bp.route("/conectar_serial/<path:puerto>", methods=["POST"])
 def conectar_serial(puerto):
     # Lógica restaurada del app.py original
+    robot.stop_serial_io()
     if robot.serial_port and robot.serial_port.is_open:
         robot.serial_port.close()
     try:
@@ -59,13 +62,12 @@ def conectar_serial(puerto):
         time.sleep(2) # Espera a que Arduino reinicie
         
         if robot.serial_port.is_open:
-            # Asignar la conexión a los objetos de hardware
-            robot.conveyor.set_connection(robot.serial_port)
-            robot.arm.set_connection(robot.serial_port)
+            # Brazo y banda escriben a través de la cola del puerto (un único dueño)
+            robot.start_serial_io()
             
             # Mover a posición segura al conectar
             posicion_segura = {"velocidad": 0, "servos": [90, 90, 90, 90, 90, 90]}
-            robot.serial_port.write((json.dumps(posicion_segura) + "\n").encode())
+            robot.serial_io.write((json.dumps(posicion_segura) + "\n").encode())
             
             return f"Conectado a {puerto}"
         raise serial.SerialException("No se pudo abrir el puerto.")
@@ -122,7 +124,9 @@ def mover_servos_global():
         
     # Mapeo de lista a diccionario {1:val, 2:val...} que espera la clase Brazo
     servos_dict = {i + 1: s for i, s in enumerate(data["servos"])}
-    robot.arm.mover_servos(servos_dict, data["velocidad"])
+    # Jog manual: mismo control que el canal WebSocket (frecuencia limitada, gana el último valor)
+    if not robot.jog.pedir(servos_dict, data["velocidad"]):
+        return "Datos incorrectos.", 400
     return "Comando enviado.", 200
 
 # ==========================================
@@ -169,19 +173,21 @@ def ejecutar_movimiento(nombre):
     if not os.path.exists(file_path):
         return jsonify({"error": "Movimiento no encontrado"}), 404
         
-    def run_sequence():
-        with open(file_path, "r", encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    pos = json.loads(line)
-                    servos_dict = {i+1: s for i, s in enumerate(pos['servos'])}
-                    robot.arm.mover_servos(servos_dict, pos['velocidad'])
-                    time.sleep(0.5)
-    
-    # Ejecutar en hilo para no bloquear el servidor
-    threading.Thread(target=run_sequence, daemon=True).start()
+    # Ejecutar en hilo para no bloquear el servidor. Cada punto espera al fin real del
+    # anterior (lector serie); con su propia parada, independiente de la clasificación.
+    threading.Thread(target=procesar_movimiento, args=(file_path, robot.arm, threading.Event()),
+                     daemon=True).start()
     return jsonify({"mensaje": "Movimiento ejecutado."})
 
+@api_bp.route("/prediccion_movimiento/<nombre>", methods=["GET"])
+def prediccion_movimiento(nombre):
+    """Duración exacta de cada paso y del movimiento completo, y velocidad de pico por servo."""
+    movimiento = biblioteca.obtener(app_data_path(os.path.join("movimientos", nombre)))
+    if movimiento is None:
+        return jsonify({"error": "Movimiento no encontrado"}), 404
+    inicio = robot.arm.angulos_servos if robot.arm else {i: 90 for i in range(1, 7)}
+    return jsonify(resumen_prediccion(*movimiento.prediccion(inicio)))
+
 # ==========================================
 # 4. GESTIÓN DE LÓGICA Y CONFIGURACIÓN
 # ==========================================
@@ -203,6 +209,44 @@ def cargar_logica():
         try: return jsonify(json.load(f))
         except: return jsonify([])
 
+@api_bp.route("/obtener_roi", methods=["GET"])
+def obtener_roi():
+    camara = request.args.get("camara", "default")
+    return jsonify({"camara": camara, "rois": robot.get_rois(camara)})
+
+@api_bp.route("/guardar_roi", methods=["POST"])
+def guardar_roi():
+    """Recibe {"camara": "default", "rois": [[x, y, ancho, alto], ...]} en fracciones 0-1."""
+    data = request.get_json()
+    if not data or not isinstance(data.get("rois"), list):
+        return jsonify({"error": "Datos incorrectos."}), 400
+    camara = data.get("camara", "default")
+    try:
+        rois = robot.set_rois(camara, data["rois"])
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"camara": camara, "rois": rois})
+
+@api_bp.route("/fuente_camara", methods=["GET", "POST"])
+def fuente_camara():
+    """
+    GET ?camara=default -> fuente configurada (null = cámara física).
+    POST {"camara", "ruta": "uploads/lote1" | "grabacion.mp4" | null, "ritmo": "tiempo_real" | "maximo", "bucle"}
+    """
+    if request.method == "GET":
+        camara = request.args.get("camara", "default")
+        return jsonify({"camara": camara, "fuente": robot.get_camera_source(camara)})
+    data = request.get_json() or {}
+    camara = data.get("camara", "default")
+    ruta = data.get("ruta")
+    if ruta is not None and (os.path.isabs(ruta) or ".." in ruta.replace("\\", "/").split("/")):
+        return jsonify({"error": "La ruta debe ser relativa a la carpeta de la aplicación."}), 400
+    try:
+        robot.set_camera_source(camara, ruta, data.get("ritmo", "tiempo_real"), bool(data.get("bucle", True)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"camara": camara, "fuente": robot.get_camera_source(camara)})
+
 @api_bp.route("/obtener_estado", methods=["GET"])
 def obtener_estado():
     # Intenta leer el archivo estado.json que escribe el backend
@@ -249,7 +293,7 @@ def obtener_carpetas():
     # Filtramos para no mostrar las carpetas de modelos
     return jsonify([f for f in os.listdir(folder_path) 
                    if os.path.isdir(os.path.join(folder_path, f)) 
-                   and f not in ['model_color', 'model_form']])
+                   and not f.startswith(('model_', '.'))])
 
 @api_bp.route("/descargar/<folder_name>")
 def descargar(folder_name):
@@ -365,21 +409,32 @@ def iniciar_ejecucion_route():
     cap = robot.get_camera() # Obtener cámara limpia
     
     # Lanzamos el hilo de ejecución pasando los objetos globales
-    # Nota: Aseguramos que los labels estén cargados
-    if not robot.shape_labels or not robot.color_labels:
-        robot.load_models()
+    # Nota: la carga de modelos es en segundo plano; el bucle toma la versión publicada
+    # en cada frame (robot.models), así que no esperamos aquí a que termine
+    robot.ensure_models()
 
     threading.Thread(
         target=iniciar_ejecucion, 
         args=(
-            robot.shape_model, 
-            robot.color_model, 
-            robot.shape_labels, 
-            robot.color_labels, 
+            robot.shape_session, 
+            robot.color_session, 
+            robot.shape_index, 
+            robot.color_index, 
             cap, 
             robot.conveyor, 
-            robot.arm
+            robot.arm,
+            robot.get_inference_executor(),
+            robot.create_change_detector(),
+            robot.get_rois(),
+            robot.create_classification_cascade(),
+            robot.create_detection_consensus(),
+            robot.models,
+            robot.create_belt_tracking()
         ), 
+        kwargs={
+            "frames_limpieza": robot.config_data["vision"]["frames_vacios_limpieza"],
+            "tiempo_max_limpieza": robot.config_data["vision"]["tiempo_maximo_limpieza"]
+        },
         daemon=True
     ).start()
     
@@ -390,10 +445,126 @@ def detener_ejecucion_route():
     detener_ejecucion()
     return jsonify(status='enviado')
 
+@api_bp.route("/estado_ejecucion", methods=["GET"])
+def estado_ejecucion_route():
+    """Estado de la máquina de ejecución (IDLE, DETECTING, ...) y segundos acumulados en cada uno."""
+    estado = estado_ejecucion()
+    if robot.serial_io:
+        estado["serie"] = robot.serial_io.estadisticas()
+    if robot.jog:
+        estado["jog"] = robot.jog.estadisticas()
+    return jsonify(estado)
+
+@api_bp.route("/estadisticas_vision", methods=["GET"])
+def estadisticas_vision():
+    """Latencia por invocación de cada modelo y FPS de captura."""
+    sesiones = [s for s in (robot.shape_session, robot.color_session) if s]
+    if robot.shape_session is robot.color_session:
+        sesiones = sesiones[:1]  # Modelo combinado: una sola sesión
+    return jsonify({
+        "fps_camara": round(robot.fps, 1),
+        "modelos": [s.estadisticas() for s in sesiones],
+        "compuerta": robot.change_detector.estadisticas() if robot.change_detector else None,
+        "cascada": robot.classification_cascade.estadisticas() if robot.classification_cascade else None,
+        "consenso": robot.detection_consensus.estadisticas() if robot.detection_consensus else None,
+        "seguimiento": robot.belt_tracking.estadisticas() if robot.belt_tracking else None
+    })
+
 # ==========================================
-# 8. SUBIDA DE MODELOS (STUB)
+# 8. SUBIDA DE MODELOS
 # ==========================================
 
+# Campo del formulario -> carpeta de destino dentro de uploads/
+CAMPOS_MODELO = {"form_model": "model_form", "color_model": "model_color"}
+
+def _extraer_modelo(archivo, destino_tmp):
+    """
+    Extrae el .zip exportado de Teachable Machine y deja labels.txt y los modelos
+    (.tflite/.onnx) en la raíz de `destino_tmp`, estén en la subcarpeta que estén.
+    Devuelve las etiquetas o lanza ValueError si el zip no sirve.
+    """
+    try:
+        with zipfile.ZipFile(archivo) as zf:
+            for nombre in zf.namelist():
+                # Evitar rutas que escapen de la carpeta temporal
+                if os.path.isabs(nombre) or ".." in nombre.replace("\\", "/").split("/"):
+                    raise ValueError(f"Ruta no permitida en el zip: {nombre}")
+            zf.extractall(destino_tmp)
+    except zipfile.BadZipFile:
+        raise ValueError("El archivo no es un .zip válido")
+
+    encontrados = {}
+    for raiz, _, archivos in os.walk(destino_tmp):
+        for nombre in archivos:
+            if nombre == "labels.txt" or nombre.endswith((".tflite", ".onnx")):
+                encontrados.setdefault(nombre, os.path.join(raiz, nombre))
+    if "labels.txt" not in encontrados:
+        raise ValueError("Falta labels.txt en el zip")
+    if not any(n.endswith(".tflite") for n in encontrados):
+        raise ValueError("Falta el modelo .tflite en el zip")
+
+    for nombre, ruta in encontrados.items():
+        plano = os.path.join(destino_tmp, nombre)
+        if ruta != plano:
+            shutil.move(ruta, plano)
+    with open(os.path.join(destino_tmp, "labels.txt"), "r", encoding="utf-8") as f:
+        etiquetas = [l for l in f.read().splitlines() if l.strip()]
+    if not etiquetas:
+        raise ValueError("labels.txt está vacío")
+    return etiquetas
+
 @api_bp.route("/upload_model", methods=["POST"])
 def upload_model():
-    return jsonify({'message': 'Subir modelos no soportado en ejecución compilada. Recompile la app.'}), 400
\ No newline at end of file
+    """
+    Sustituye los modelos de forma y/o color. Primero se validan todos los zips; luego
+    cada carpeta se cambia por la nueva (la anterior queda como <carpeta>_anterior) y se
+    programa la recarga en segundo plano: la ejecución sigue con la versión anterior
+    hasta que la nueva está cargada y calentada.
+    """
+    archivos = {campo: request.files.get(campo) for campo in CAMPOS_MODELO}
+    archivos = {campo: a for campo, a in archivos.items() if a and a.filename}
+    if not archivos:
+        return jsonify({"error": "No se recibió ningún modelo"}), 400
+
+    uploads = app_data_path("uploads")
+    os.makedirs(uploads, exist_ok=True)
+    temporales = {}
+    etiquetas = {}
+    try:
+        for campo, archivo in archivos.items():
+            if not archivo.filename.lower().endswith(".zip"):
+                raise ValueError(f"{archivo.filename}: se esperaba un .zip")
+            tmp = tempfile.mkdtemp(prefix=".subida_", dir=uploads)
+            temporales[campo] = tmp
+            try:
+                etiquetas[campo] = _extraer_modelo(archivo, tmp)
+            except ValueError as e:
+                raise ValueError(f"{archivo.filename}: {e}")
+
+        for campo, tmp in temporales.items():
+            destino = os.path.join(uploads, CAMPOS_MODELO[campo])
+            respaldo = destino + "_anterior"
+            if os.path.exists(destino):
+                shutil.rmtree(respaldo, ignore_errors=True)
+                os.replace(destino, respaldo)
+            os.replace(tmp, destino)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except OSError as e:
+        logging.error(f"Error instalando modelos: {e}")
+        return jsonify({"error": f"No se pudieron guardar los modelos: {e}"}), 500
+    finally:
+        for tmp in temporales.values():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    robot.load_models()  # No bloquea: ver /estado_modelos
+    return jsonify({
+        "form_labels": etiquetas.get("form_model", robot.shape_labels),
+        "color_labels": etiquetas.get("color_model", robot.color_labels),
+        "cargando": True,
+    })
+
+@api_bp.route("/estado_modelos", methods=["GET"])
+def estado_modelos():
+    """Versión publicada de los modelos y estado de la carga en segundo plano."""
+    return jsonify(robot.models.estado())
\ No newline at end of file
@@ -0,0 +1,57 @@
+# app/routes_socket.py
+import logging
+from app.hardware import robot
+
+try:
+    from flask_socketio import SocketIO
+except ImportError:  # Sin Flask-SocketIO el jog sigue disponible por HTTP (/control_brazo/mover_servos_global)
+    SocketIO = None
+
+# "threading" funciona con el servidor de Flask (WebSocket vía simple-websocket) y con waitress (long-polling).
+# Sin cors_allowed_origins solo se aceptan conexiones del mismo origen: el jog mueve el brazo.
+socketio = SocketIO(async_mode="threading") if SocketIO else None
+
+
+def init_socketio(app):
+    """Registra Socket.IO en la app. Devuelve None si Flask-SocketIO no está instalado."""
+    if socketio is None:
+        logging.warning("Flask-SocketIO no disponible: el jog usará HTTP.")
+        return None
+    socketio.init_app(app)
+    if robot.jog:
+        # Los demás clientes ven la posición que de verdad se envió al brazo
+        robot.jog.al_enviar = lambda servos, velocidad: socketio.emit(
+            "state_updated", {"servos": servos, "velocidad": velocidad})
+    return socketio
+
+
+def jog(data):
+    """
+    Jog por WebSocket. Acepta {"servo": n, "angulo": a} (un slider) o {"servos": [6 ángulos]},
+    más "velocidad" opcional. No mueve el brazo directamente: ControlJog fusiona y limita.
+    """
+    if not (robot.serial_io and robot.serial_io.is_open):
+        return {"ok": False, "error": "No hay conexion"}
+    if not isinstance(data, dict) or robot.jog is None:
+        return {"ok": False, "error": "Datos incorrectos."}
+
+    if "servos" in data:
+        servos = data["servos"]
+        if not isinstance(servos, list) or len(servos) != 6:
+            return {"ok": False, "error": "Datos incorrectos."}
+        angulos = {i + 1: s for i, s in enumerate(servos)}
+    elif "servo" in data and "angulo" in data:
+        angulos = {data["servo"]: data["angulo"]}
+    else:
+        return {"ok": False, "error": "Datos incorrectos."}
+
+    velocidad = data.get("velocidad")
+    if velocidad is not None and (not isinstance(velocidad, (int, float)) or not 1 <= velocidad <= 100):
+        return {"ok": False, "error": "Velocidad fuera de rango."}
+    if not robot.jog.pedir(angulos, velocidad):
+        return {"ok": False, "error": "Servo o ángulo fuera de rango."}
+    return {"ok": True}
+
+
+if socketio:
+    socketio.on_event("jog", jog)
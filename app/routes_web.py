@@ -14,77 +14,76 @@ web_bp = Blueprint('web', __name__)
 
 def gen_raw_frames():
     """Genera video crudo sin procesamiento (para camera_feed)."""
+    # Lector del servicio de captura compartido: no abre el dispositivo,
+    # así que puede convivir con el hilo de ejecución automática.
     cap = robot.get_camera()
-    # Si la cámara está ocupada por otro hilo (ej. ejecución automática),
-    # intentamos usar el frame global si existe.
-    if not cap or not cap.isOpened():
-        while True:
-            if robot.current_frame is not None:
-                yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + robot.current_frame + b'\r\n')
-            time.sleep(0.1)
+    if cap is None:
         return
 
-    while True:
-        success, frame = cap.read()
-        if not success:
-            time.sleep(0.1)
-            continue
-        
-        # Actualizar estado global para otros consumidores
-        _, buffer = cv2.imencode('.jpg', frame)
-        robot.current_frame = buffer.tobytes() 
-
-        yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-    
-    cap.release()
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                time.sleep(0.1)
+                continue
+
+            _, buffer = cv2.imencode('.jpg', frame)
+            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+    finally:
+        cap.release()
 
 def gen_overlay_frames():
     """
     Genera video con superposición de datos (FPS, detecciones).
     Replica la lógica de 'gen_frames' del app.py original.
     """
-    # Intentamos obtener cámara, si falla, usamos el frame global
-    # (Esto permite ver el video incluso si el robot está ejecutando su ciclo en background)
+    # El lector comparte los frames con el hilo de ejecución (sin recodificar JPEG)
     local_cap = robot.get_camera()
     
-    while True:
-        frame = None
-        
-        # 1. Obtener imagen
-        if local_cap and local_cap.isOpened():
-            success, read_frame = local_cap.read()
-            if success:
-                frame = read_frame
-        
-        # Si no tenemos cámara local (quizás ocupada por el hilo de ejecución), usamos el global
-        if frame is None and robot.current_frame:
-            nparr = np.frombuffer(robot.current_frame, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if frame is None:
-            # Generar imagen negra de espera
-            frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(frame, "ESPERANDO CAMARA...", (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            time.sleep(0.5)
-        else:
-            # 2. Superponer Información (Paridad con app.py)
-            # Si hay una clasificación reciente, la pintamos
-            if robot.last_classification and robot.last_classification != "vacio":
-                cv2.putText(frame, robot.last_classification, (10, 60), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            
-            # Si hay modelos cargados o no
-            if not (robot.shape_model and robot.color_model):
-                cv2.putText(frame, "Modelos NO cargados", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+    try:
+        while True:
+            frame = None
             
-            # FPS (calculados en hardware o localmente)
-            cv2.putText(frame, f"FPS: {robot.fps:.1f}", (500, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-
-        # 3. Codificar y Enviar
-        ret, buffer = cv2.imencode('.jpg', frame)
-        yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+            # 1. Obtener imagen
+            if local_cap and local_cap.isOpened():
+                success, read_frame = local_cap.read()
+                if success:
+                    # Copia: el frame del buffer es compartido con otros consumidores
+                    frame = read_frame.copy()
+
+            if frame is None:
+                # Generar imagen negra de espera
+                frame = np.zeros((480, 640, 3), dtype=np.uint8)
+                cv2.putText(frame, "ESPERANDO CAMARA...", (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                time.sleep(0.5)
+            else:
+                # 2. Superponer Información (Paridad con app.py)
+                # Si hay una clasificación reciente, la pintamos
+                if robot.last_classification and robot.last_classification != "vacio":
+                    cv2.putText(frame, robot.last_classification, (10, 60), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                
+                # Si hay modelos cargados o no
+                if not (robot.shape_model and robot.color_model):
+                    cv2.putText(frame, "Modelos NO cargados", (10, 30), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                
+                # Zonas de interés configuradas (lo único que analiza el reconocimiento)
+                alto, ancho = frame.shape[:2]
+                for x, y, w, h in robot.get_rois():
+                    cv2.rectangle(frame, (int(x * ancho), int(y * alto)),
+                                  (int((x + w) * ancho), int((y + h) * alto)), (0, 255, 255), 2)
+                
+                # FPS (calculados por el hilo de captura)
+                cv2.putText(frame, f"FPS: {robot.fps:.1f}", (500, 30), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+
+            # 3. Codificar y Enviar
+            ret, buffer = cv2.imencode('.jpg', frame)
+            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+    finally:
+        if local_cap:
+            local_cap.release()
 
 # --- Rutas de Streaming ---
 
@@ -120,9 +119,8 @@ def opciones():
             except: 
                 logic_config = []
     
-    # 2. Asegurar que labels estén cargados en memoria
-    if not robot.shape_labels or not robot.color_labels:
-        robot.load_models()
+    # 2. Pedir la carga si aún no se hizo (en segundo plano: la página no espera)
+    robot.ensure_models()
 
     # 3. Renderizar con contexto completo
     return render_template("opciones.html", 
@@ -150,8 +148,8 @@ def verificar_reconocimiento():
     # Paridad: Verifica si hay modelos y pasa lista completa de etiquetas
     if not (robot.shape_model and robot.color_model):
         # En el original retornaba un error 400 string, aquí podemos renderizar o dar error
-        # Para ser amigable, renderizamos igual pero las listas estarán vacías si falla la carga
-        robot.load_models()
+        # Para ser amigable, renderizamos igual; las listas estarán vacías mientras se cargan
+        robot.ensure_models()
     
     combined_labels = robot.shape_labels + robot.color_labels
     return render_template("verificar_reconocimiento.html", labels=combined_labels)
@@ -175,9 +173,8 @@ def configurar_logica():
     # Listar movimientos sin la extensión .txt
     movs = [f.replace(".txt", "") for f in os.listdir(mov_path) if f.endswith(".txt")]
     
-    # Asegurar labels
-    if not robot.shape_labels: 
-        robot.load_models()
+    # Asegurar labels (carga en segundo plano)
+    robot.ensure_models()
 
     return render_template("configurar_logica.html", 
                            form_labels=robot.shape_labels, 
@@ -0,0 +1,58 @@
+# archivo: benchmarks/bench_color_hsv.py
+"""
+Microbenchmark de la detección de color HSV: implementación por rangos
+(inRange + erode + dilate por cada rango) frente a ClasificadorColorLUT.
+Además de la latencia, informa en cuántos frames coincide el color decidido.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_color_hsv --frames 300
+    python -m benchmarks.bench_color_hsv --imagenes uploads/mis_fotos
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modulos.reconocimiento import (detectar_color_hsv, detectar_color_hsv_rangos,
+                                    corregir_iluminacion)
+from benchmarks.utilidades import cargar_frames
+
+
+def medir(funcion, imagenes_hsv):
+    resultados, latencias = [], []
+    for hsv in imagenes_hsv:
+        inicio = time.perf_counter()
+        resultados.append(funcion(None, hsv=hsv))
+        latencias.append(time.perf_counter() - inicio)
+    return resultados, np.array(latencias) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detección de color HSV")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--imagenes", default=None, help="Carpeta con imágenes .jpg/.png")
+    args = parser.parse_args()
+
+    # Ambas variantes reciben la misma imagen HSV ya corregida: solo se mide la clasificación
+    imagenes_hsv = [cv2.cvtColor(corregir_iluminacion(f), cv2.COLOR_BGR2HSV)
+                    for f in cargar_frames(args.imagenes, args.frames)]
+
+    medir(detectar_color_hsv, imagenes_hsv[:5])  # Calentamiento (reserva de buffers)
+    ref, lat_ref = medir(detectar_color_hsv_rangos, imagenes_hsv)
+    lut, lat_lut = medir(detectar_color_hsv, imagenes_hsv)
+    coincidencias = sum(a == b for a, b in zip(ref, lut))
+
+    print(f"{'variante':<10}{'media ms':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for nombre, lat in (("rangos", lat_ref), ("lut", lat_lut)):
+        print(f"{nombre:<10}{lat.mean():>10.3f}{np.percentile(lat, 50):>9.3f}{np.percentile(lat, 95):>9.3f}")
+    print(f"\nSpeedup: {lat_ref.mean() / lat_lut.mean():.2f}x")
+    print(f"Coincidencia: {coincidencias}/{len(ref)} frames ({100.0 * coincidencias / len(ref):.1f} %)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# archivo: benchmarks/bench_cuantizacion.py
+"""
+Informe lado a lado del modelo flotante (model_unquant.tflite) frente al cuantizado
+(model.tflite) de cada carpeta de modelos: latencia, coincidencia de la clase
+predicha y diferencia de probabilidades sobre los mismos frames.
+
+Con --dataset se calcula además la precisión de ambos: la carpeta debe contener una
+subcarpeta por clase con el nombre de la etiqueta (p. ej. dataset/circulo/*.jpg).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_cuantizacion --imagenes uploads/lote1 --frames 200
+    python -m benchmarks.bench_cuantizacion --dataset uploads/validacion_formas --modelos model_form
+"""
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modulos.inferencia import SesionInferencia, cargar_interprete, MODELO_FLOTANTE, MODELO_CUANTIZADO
+from modulos.etiquetas import IndiceEtiquetas
+from modulos.reconocimiento import PreprocesadorFrame
+from benchmarks.utilidades import cargar_frames
+
+
+def cargar_sesion(carpeta, archivo, hilos):
+    ruta = os.path.join(carpeta, archivo)
+    if not os.path.exists(ruta):
+        return None
+    interprete = cargar_interprete(ruta, hilos)
+    return SesionInferencia(interprete, archivo) if interprete is not None else None
+
+
+def cargar_dataset(carpeta, indice):
+    """Lista de (entrada RGB 224x224, posición de la clase) a partir de subcarpetas por clase."""
+    preprocesador = PreprocesadorFrame()
+    muestras = []
+    for posicion, etiqueta in enumerate(indice):
+        subcarpeta = os.path.join(carpeta, etiqueta.nombre)
+        if not os.path.isdir(subcarpeta):
+            continue
+        for frame in cargar_frames(subcarpeta, len(os.listdir(subcarpeta))):
+            muestras.append((preprocesador.procesar(frame).rgb.copy(), posicion))
+    return muestras
+
+
+def comparar(flotante, cuantizado, entradas):
+    """Latencias y salidas de ambos modelos sobre las mismas entradas."""
+    salidas = {"flotante": [], "cuantizado": []}
+    latencias = {"flotante": [], "cuantizado": []}
+    for sesion in (flotante, cuantizado):
+        sesion.predecir(entradas[0])  # Calentamiento
+    for entrada in entradas:
+        for clave, sesion in (("flotante", flotante), ("cuantizado", cuantizado)):
+            salidas[clave].append(sesion.predecir(entrada).copy())
+            latencias[clave].append(sesion.ultima_latencia * 1000)
+    return {k: np.array(v) for k, v in salidas.items()}, {k: np.array(v) for k, v in latencias.items()}
+
+
+def informe_modelo(carpeta, entradas, dataset, hilos):
+    flotante = cargar_sesion(carpeta, MODELO_FLOTANTE, hilos)
+    cuantizado = cargar_sesion(carpeta, MODELO_CUANTIZADO, hilos)
+    if flotante is None or cuantizado is None:
+        return None
+    salidas, latencias = comparar(flotante, cuantizado, entradas)
+    clases_f = salidas["flotante"].argmax(axis=1)
+    clases_q = salidas["cuantizado"].argmax(axis=1)
+    informe = {
+        "carpeta": carpeta,
+        "tipo_entrada_cuantizado": str(cuantizado.tipo_entrada),
+        "latencia_ms": {k: {"media": round(float(v.mean()), 3), "p95": round(float(np.percentile(v, 95)), 3)}
+                        for k, v in latencias.items()},
+        "speedup": round(float(latencias["flotante"].mean() / latencias["cuantizado"].mean()), 2),
+        "coincidencia_clase": round(float((clases_f == clases_q).mean()), 4),
+        "diferencia_prob_media": round(float(np.abs(salidas["flotante"] - salidas["cuantizado"]).mean()), 4),
+        "diferencia_prob_max": round(float(np.abs(salidas["flotante"] - salidas["cuantizado"]).max()), 4),
+        "precision": None,
+    }
+    if dataset:
+        etiquetas = os.path.join(carpeta, "labels.txt")
+        with open(etiquetas, encoding="utf-8") as f:
+            indice = IndiceEtiquetas(f.read().splitlines(), "color" if "color" in carpeta else "forma")
+        muestras = cargar_dataset(dataset, indice)
+        if muestras:
+            esperadas = np.array([m[1] for m in muestras])
+            salidas_ds, _ = comparar(flotante, cuantizado, [m[0] for m in muestras])
+            informe["precision"] = {k: round(float((v.argmax(axis=1) == esperadas).mean()), 4)
+                                    for k, v in salidas_ds.items()}
+            informe["muestras_dataset"] = len(muestras)
+    return informe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelo flotante vs cuantizado")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--imagenes", default=None, help="Vídeo o carpeta de imágenes (por defecto, sintéticos)")
+    parser.add_argument("--dataset", default=None, help="Carpeta con una subcarpeta por clase")
+    parser.add_argument("--modelos", nargs="+", default=["model_form", "model_color"], help="Carpetas dentro de uploads/")
+    parser.add_argument("--hilos", type=int, default=2)
+    parser.add_argument("--json", default=None, help="Ruta del informe JSON")
+    args = parser.parse_args()
+
+    preprocesador = PreprocesadorFrame()
+    entradas = [preprocesador.procesar(f).rgb.copy() for f in cargar_frames(args.imagenes, args.frames)]
+
+    informes = []
+    print(f"{'modelo':<14}{'float ms':>10}{'int ms':>9}{'speedup':>9}{'coincide':>10}{'dif. media':>12}{'precisión f/q':>16}")
+    for nombre in args.modelos:
+        informe = informe_modelo(os.path.join("uploads", nombre), entradas, args.dataset, args.hilos)
+        if informe is None:
+            print(f"{nombre:<14}faltan {MODELO_FLOTANTE} y/o {MODELO_CUANTIZADO}")
+            continue
+        informes.append(informe)
+        precision = informe["precision"]
+        texto_precision = f"{precision['flotante']:.3f}/{precision['cuantizado']:.3f}" if precision else "-"
+        print(f"{nombre:<14}{informe['latencia_ms']['flotante']['media']:>10.2f}"
+              f"{informe['latencia_ms']['cuantizado']['media']:>9.2f}{informe['speedup']:>8.2f}x"
+              f"{informe['coincidencia_clase']:>10.3f}{informe['diferencia_prob_media']:>12.4f}{texto_precision:>16}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informes, f, indent=2)
+    return 0 if informes else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# archivo: benchmarks/bench_inferencia.py
+"""
+Compara la latencia de clasificación forma+color en modo secuencial (comportamiento
+original) frente al modo paralelo y al pool de intérpretes.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_inferencia --frames 200 --hilos 1 2 4 --pool 1 2
+    python -m benchmarks.bench_inferencia --imagenes uploads/mis_fotos
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modulos.inferencia import (SesionInferencia, EjecutorInferencia, PoolInferencia,
+                                cargar_interprete, MODO_SECUENCIAL, MODO_PARALELO)
+from modulos.reconocimiento import PreprocesadorFrame
+from benchmarks.utilidades import cargar_frames
+
+MODELO_FORMA = os.path.join("uploads", "model_form", "model_unquant.tflite")
+MODELO_COLOR = os.path.join("uploads", "model_color", "model_unquant.tflite")
+
+
+def crear_par(hilos):
+    return (SesionInferencia(cargar_interprete(MODELO_FORMA, hilos), "forma"),
+            SesionInferencia(cargar_interprete(MODELO_COLOR, hilos), "color"))
+
+
+def medir_ejecutor(modo, hilos, entradas):
+    sesion_forma, sesion_color = crear_par(hilos)
+    ejecutor = EjecutorInferencia(modo)
+    ejecutor.predecir_par(sesion_forma, sesion_color, entradas[0])  # Calentamiento
+    latencias = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        ejecutor.predecir_par(sesion_forma, sesion_color, entrada)
+        latencias.append(time.perf_counter() - inicio)
+    ejecutor.cerrar()
+    return np.array(latencias) * 1000
+
+
+def medir_pool(tamano, hilos, entradas):
+    pool = PoolInferencia(lambda: crear_par(hilos), tamano)
+    ejecutor = EjecutorInferencia(MODO_SECUENCIAL)
+    inicio = time.perf_counter()
+    futuros = [pool.enviar(ejecutor.predecir_par, entrada) for entrada in entradas]
+    for futuro in futuros:
+        futuro.result()
+    total = time.perf_counter() - inicio
+    pool.cerrar()
+    return len(entradas) / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inferencia forma/color")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--imagenes", default=None, help="Carpeta con imágenes .jpg/.png")
+    parser.add_argument("--hilos", type=int, nargs="+", default=[1, 2, 4], help="num_threads por modelo")
+    parser.add_argument("--pool", type=int, nargs="+", default=[1, 2], help="Tamaños de pool a medir")
+    args = parser.parse_args()
+
+    if not (os.path.exists(MODELO_FORMA) and os.path.exists(MODELO_COLOR)):
+        print(f"Faltan los modelos en {MODELO_FORMA} / {MODELO_COLOR}")
+        return 1
+
+    # El preprocesado es común a todos los modos: se hace una vez y se copian las entradas
+    preprocesador = PreprocesadorFrame()
+    entradas = [preprocesador.procesar(f).rgb.copy() for f in cargar_frames(args.imagenes, args.frames)]
+
+    print(f"{'modo':<12}{'hilos':>6}{'media ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'speedup':>9}")
+    for hilos in args.hilos:
+        base = medir_ejecutor(MODO_SECUENCIAL, hilos, entradas)
+        paralelo = medir_ejecutor(MODO_PARALELO, hilos, entradas)
+        for modo, lat in ((MODO_SECUENCIAL, base), (MODO_PARALELO, paralelo)):
+            print(f"{modo:<12}{hilos:>6}{lat.mean():>10.2f}{np.percentile(lat, 50):>9.2f}"
+                  f"{np.percentile(lat, 95):>9.2f}{base.mean() / lat.mean():>8.2f}x")
+
+    print()
+    print(f"{'pool':<12}{'hilos':>6}{'frames/s':>10}")
+    for tamano in args.pool:
+        for hilos in args.hilos:
+            print(f"{tamano:<12}{hilos:>6}{medir_pool(tamano, hilos, entradas):>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
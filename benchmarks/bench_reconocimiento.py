@@ -0,0 +1,262 @@
+# archivo: benchmarks/bench_reconocimiento.py
+"""
+Benchmark del pipeline de reconocimiento por etapas, pensado para comparar versiones
+en la flota de Raspberry Pi.
+
+Etapas medidas en cada frame:
+    iluminacion  corregir_iluminacion (CLAHE sobre L)
+    entrada      resize 224x224 + RGB + normalización en el tensor de cada modelo
+    forma        invocación del modelo de formas
+    color        invocación del modelo de colores
+    hsv          conversión a HSV + detectar_color_hsv (tablas LUT)
+    total        reconocimiento_de_objetos completo (pasada separada, da los FPS)
+    lote         con --lote N, ms por imagen de forma+color enviando N imágenes por
+                 invocación (cv2.dnn y ONNX Runtime procesan el lote de una vez)
+
+Se comparan las combinaciones de --backends (por defecto, todos los disponibles en la
+máquina), --hilos (num_threads del backend), --modos (secuencial/paralelo) y ROI
+desactivada/activada, todas sobre los mismos frames. La memoria pico se mide en una
+pasada aparte con tracemalloc (memoria de NumPy/Python) y ru_maxrss (proceso).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_reconocimiento --ruta uploads/lote1 --frames 200
+    python -m benchmarks.bench_reconocimiento --hilos 1 2 4 --json resultados.json
+    python -m benchmarks.bench_reconocimiento --backends tflite opencv --lote 4
+    python -m benchmarks.bench_reconocimiento --json - > resultados.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import tracemalloc
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modulos.inferencia import (EjecutorInferencia, crear_sesion, buscar_modelo, backends_disponibles,
+                                backend_tflite, MODO_SECUENCIAL, MODO_PARALELO, BACKENDS)
+from modulos.etiquetas import IndiceEtiquetas
+from modulos.reconocimiento import (reconocimiento_de_objetos, corregir_iluminacion, recortar_roi,
+                                    detectar_color_hsv, TAMANO_ENTRADA)
+from benchmarks.utilidades import cargar_frames
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CARPETA_FORMA = os.path.join("uploads", "model_form")
+CARPETA_COLOR = os.path.join("uploads", "model_color")
+ETAPAS = ("iluminacion", "entrada", "forma", "color", "hsv", "total")
+ROI_POR_DEFECTO = [0.25, 0.25, 0.5, 0.5]
+
+
+def cargar_modelos(hilos, backend):
+    """(sesion_forma, indice_forma, sesion_color, indice_color) o None si faltan modelos."""
+    resultado = []
+    for carpeta, nombre in ((CARPETA_FORMA, "forma"), (CARPETA_COLOR, "color")):
+        modelo = buscar_modelo(carpeta, preferir_cuantizado=False, backend=backend)
+        etiquetas = os.path.join(carpeta, "labels.txt")
+        if modelo is None or not os.path.exists(etiquetas):
+            return None
+        sesion = crear_sesion(modelo, nombre, backend, hilos)
+        if sesion is None:
+            return None
+        with open(etiquetas, encoding="utf-8") as f:
+            resultado += [sesion, IndiceEtiquetas(f.read().splitlines(), nombre)]
+    return tuple(resultado)
+
+
+def percentiles(muestras):
+    if not muestras:
+        return None
+    ms = np.array(muestras) * 1000
+    return {
+        "media_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def medir_etapas(frames, modelos, roi):
+    """Tiempos por etapa reproduciendo el pipeline paso a paso."""
+    tiempos = {etapa: [] for etapa in ETAPAS if etapa != "total"}
+    # Sin modelos la normalización se hace sobre un buffer propio para medir igualmente la etapa
+    buffer = np.empty((TAMANO_ENTRADA[1], TAMANO_ENTRADA[0], 3), dtype=np.float32)
+    for frame in frames:
+        recorte = recortar_roi(frame, roi)
+
+        t0 = time.perf_counter()
+        corregido = corregir_iluminacion(recorte)
+        t1 = time.perf_counter()
+        rgb = cv2.cvtColor(cv2.resize(corregido, TAMANO_ENTRADA), cv2.COLOR_BGR2RGB)
+        if modelos:
+            modelos[0].escribir_entrada(rgb)
+            modelos[2].escribir_entrada(rgb)
+        else:
+            np.divide(rgb, 255.0, out=buffer, dtype=np.float32, casting="unsafe")
+        t2 = time.perf_counter()
+        tiempos["iluminacion"].append(t1 - t0)
+        tiempos["entrada"].append(t2 - t1)
+
+        if modelos:
+            t0 = time.perf_counter()
+            modelos[0].invocar()
+            t1 = time.perf_counter()
+            modelos[2].invocar()
+            t2 = time.perf_counter()
+            tiempos["forma"].append(t1 - t0)
+            tiempos["color"].append(t2 - t1)
+
+        t0 = time.perf_counter()
+        detectar_color_hsv(recorte, hsv=cv2.cvtColor(corregido, cv2.COLOR_BGR2HSV))
+        tiempos["hsv"].append(time.perf_counter() - t0)
+    return tiempos
+
+
+def medir_total(frames, modelos, roi, modo):
+    """Latencia de reconocimiento_de_objetos y FPS del pipeline completo."""
+    if not modelos:
+        return [], 0.0
+    sesion_forma, indice_forma, sesion_color, indice_color = modelos
+    ejecutor = EjecutorInferencia(modo)
+    latencias = []
+    inicio = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        reconocimiento_de_objetos(frame, sesion_forma, indice_forma, sesion_color, indice_color,
+                                  ejecutor=ejecutor, roi=roi)
+        latencias.append(time.perf_counter() - t0)
+    fps = len(frames) / (time.perf_counter() - inicio)
+    ejecutor.cerrar()
+    return latencias, fps
+
+
+def medir_lote(frames, modelos, tamano):
+    """Milisegundos por imagen de forma+color enviando `tamano` imágenes por invocación."""
+    entradas = [cv2.cvtColor(cv2.resize(corregir_iluminacion(f), TAMANO_ENTRADA), cv2.COLOR_BGR2RGB)
+                for f in frames]
+    lotes = [entradas[i:i + tamano] for i in range(0, len(entradas), tamano)]
+    inicio = time.perf_counter()
+    for lote in lotes:
+        modelos[0].predecir_lote(lote)
+        modelos[2].predecir_lote(lote)
+    return round((time.perf_counter() - inicio) * 1000 / len(entradas), 3)
+
+
+def medir_memoria(frames, modelos, roi, modo):
+    tracemalloc.start()
+    if modelos:
+        medir_total(frames, modelos, roi, modo)
+    else:
+        medir_etapas(frames, None, roi)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memoria = {"tracemalloc_pico_kb": round(pico / 1024, 1), "rss_max_kb": None}
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        memoria["rss_max_kb"] = rss // 1024 if sys.platform == "darwin" else rss
+    return memoria
+
+
+def ejecutar_configuracion(frames, backend, hilos, modo, roi, lote):
+    modelos = cargar_modelos(hilos, backend) if backend else None
+    # Calentamiento: primeras invocaciones y reserva de buffers fuera de la medida
+    medir_etapas(frames[:3], modelos, roi)
+    tiempos = medir_etapas(frames, modelos, roi)
+    latencias, fps = medir_total(frames, modelos, roi, modo)
+    tiempos["total"] = latencias
+    if not modelos:
+        # Sin modelos el "total" es la suma de las etapas medidas
+        suma = np.sum([tiempos[e] for e in ("iluminacion", "entrada", "hsv")], axis=0)
+        fps = len(frames) / float(suma.sum())
+    return {
+        "backend": backend,
+        "hilos": hilos,
+        "modo": modo,
+        "roi": roi,
+        "modelos": modelos is not None,
+        "etapas": {etapa: percentiles(tiempos[etapa]) for etapa in ETAPAS},
+        "fps": round(fps, 2),
+        "lote": {"tamano": lote, "ms_por_imagen": medir_lote(frames, modelos, lote)} if modelos and lote > 1 else None,
+        "memoria": medir_memoria(frames, modelos, roi, modo),
+    }
+
+
+def imprimir_tabla(resultados, salida):
+    cabecera = f"{'backend':<12}{'hilos':>5} {'modo':<11} {'roi':<4}" + "".join(f"{e + ' p50':>15}" for e in ETAPAS)
+    print(cabecera + f"{'fps':>8}{'lote ms':>9}{'pico KB':>10}", file=salida)
+    for r in resultados:
+        celdas = "".join(f"{r['etapas'][e]['p50_ms'] if r['etapas'][e] else '-':>15}" for e in ETAPAS)
+        lote = r['lote']['ms_por_imagen'] if r['lote'] else '-'
+        print(f"{r['backend'] or '-':<12}{r['hilos']:>5} {r['modo']:<11} {'si' if r['roi'] else 'no':<4}{celdas}"
+              f"{r['fps']:>8}{lote:>9}{r['memoria']['tracemalloc_pico_kb']:>10}", file=salida)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del reconocimiento")
+    parser.add_argument("--ruta", default=None, help="Vídeo o carpeta de imágenes (por defecto, sintéticos)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=None,
+                        help="Backends a comparar (por defecto, todos los disponibles)")
+    parser.add_argument("--hilos", type=int, nargs="+", default=[1, 2, 4], help="num_threads por modelo")
+    parser.add_argument("--lote", type=int, default=1, help="Tamaño de lote a medir además del frame a frame")
+    parser.add_argument("--modos", nargs="+", choices=[MODO_SECUENCIAL, MODO_PARALELO],
+                        default=[MODO_SECUENCIAL, MODO_PARALELO])
+    parser.add_argument("--roi", type=float, nargs=4, default=ROI_POR_DEFECTO,
+                        metavar=("X", "Y", "ANCHO", "ALTO"), help="ROI (fracciones 0-1) de la variante con ROI")
+    parser.add_argument("--sin-roi", action="store_true", help="Medir solo la variante sin ROI")
+    parser.add_argument("--json", default=None, help="Ruta del informe JSON ('-' = salida estándar)")
+    args = parser.parse_args()
+
+    frames = cargar_frames(args.ruta, args.frames)
+    # Con el JSON en la salida estándar la tabla va a stderr para no mezclarlos
+    tabla = sys.stderr if args.json == "-" else sys.stdout
+    backends = []
+    for backend in args.backends or backends_disponibles():
+        if cargar_modelos(1, backend) is None:
+            print(f"[{backend}] modelos no encontrados o backend no disponible, se omite.", file=tabla)
+        else:
+            backends.append(backend)
+    if not backends:
+        print("Sin modelos en uploads/: solo se miden las etapas sin CNN.", file=tabla)
+        # Backend, hilos y modo solo afectan a las CNN: una configuración por ROI basta
+        backends, args.hilos, args.modos = [None], args.hilos[:1], args.modos[:1]
+
+    rois = [None] if args.sin_roi else [None, list(args.roi)]
+    resultados = [ejecutar_configuracion(frames, backend, hilos, modo, roi, args.lote)
+                  for backend, hilos, modo, roi in itertools.product(backends, args.hilos, args.modos, rois)]
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "maquina": platform.node(),
+        "plataforma": platform.platform(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "backends_disponibles": backends_disponibles(),
+        "tflite": backend_tflite() if "tflite" in backends else None,
+        "fuente": args.ruta or "sinteticos",
+        "frames": len(frames),
+        "resolucion": list(frames[0].shape[1::-1]),
+        "configuraciones": resultados,
+    }
+    imprimir_tabla(resultados, tabla)
+    if args.json == "-":
+        json.dump(informe, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+        print(f"Informe guardado en {args.json}", file=tabla)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# archivo: benchmarks/bench_reproduccion.py
+"""
+Mide el throughput de reconocimiento sin cámara, reproduciendo un vídeo o una carpeta
+de imágenes con FuenteReproduccion.
+
+- Directo (por defecto): el bucle lee de la fuente; con --ritmo maximo se clasifica
+  cada frame de la grabación tan rápido como sea posible.
+- --captura: la fuente pasa por CapturaCamara como una cámara real, de modo que se
+  miden también los frames descartados cuando la clasificación no da abasto.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_reproduccion --ruta uploads/lote1 --ritmo maximo
+    python -m benchmarks.bench_reproduccion --ruta grabacion.mp4 --ritmo tiempo_real --captura
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modulos.camara import CapturaCamara, FuenteReproduccion, RITMO_TIEMPO_REAL, RITMO_MAXIMO
+from modulos.inferencia import SesionInferencia, EjecutorInferencia, cargar_interprete
+from modulos.etiquetas import IndiceEtiquetas
+from modulos.reconocimiento import reconocimiento_de_objetos, PreprocesadorFrame, detectar_color_hsv
+
+CARPETA_FORMA = os.path.join("uploads", "model_form")
+CARPETA_COLOR = os.path.join("uploads", "model_color")
+
+
+def cargar_modelo(carpeta, nombre, tipo):
+    modelo = os.path.join(carpeta, "model_unquant.tflite")
+    etiquetas = os.path.join(carpeta, "labels.txt")
+    if not (os.path.exists(modelo) and os.path.exists(etiquetas)):
+        return None, None
+    interprete = cargar_interprete(modelo, 2)
+    if interprete is None:
+        return None, None
+    with open(etiquetas, encoding="utf-8") as f:
+        return SesionInferencia(interprete, nombre), IndiceEtiquetas(f.read().splitlines(), tipo)
+
+
+def crear_clasificador():
+    """Pipeline completo si están los modelos; si no, solo preprocesado + HSV."""
+    sesion_forma, indice_forma = cargar_modelo(CARPETA_FORMA, "forma", "forma")
+    sesion_color, indice_color = cargar_modelo(CARPETA_COLOR, "color", "color")
+    if sesion_forma and sesion_color:
+        ejecutor = EjecutorInferencia()
+        return "completo", lambda frame: reconocimiento_de_objetos(
+            frame, sesion_forma, indice_forma, sesion_color, indice_color, ejecutor=ejecutor)
+    print("Modelos no encontrados en uploads/: se mide solo preprocesado + HSV.")
+    preprocesador = PreprocesadorFrame()
+    def solo_hsv(frame):
+        procesado = preprocesador.procesar(frame)
+        return detectar_color_hsv(frame, hsv=procesado.hsv)
+    return "preprocesado+hsv", solo_hsv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput de reconocimiento con cámara virtual")
+    parser.add_argument("--ruta", required=True, help="Vídeo o carpeta de imágenes")
+    parser.add_argument("--ritmo", choices=[RITMO_TIEMPO_REAL, RITMO_MAXIMO], default=RITMO_MAXIMO)
+    parser.add_argument("--frames", type=int, default=0, help="Máximo de frames (0 = toda la grabación)")
+    parser.add_argument("--captura", action="store_true", help="Pasar la fuente por CapturaCamara")
+    args = parser.parse_args()
+
+    fuente = FuenteReproduccion(args.ruta, args.ritmo, bucle=False)
+    if not fuente.isOpened():
+        print(f"No se puede reproducir {args.ruta}")
+        return 1
+    modo, clasificar = crear_clasificador()
+
+    captura = None
+    cap = fuente
+    if args.captura:
+        captura = CapturaCamara(lambda: fuente, nombre="reproduccion")
+        captura.iniciar()
+        cap = captura.lector()
+
+    latencias = []
+    inicio = time.perf_counter()
+    while not args.frames or len(latencias) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        t0 = time.perf_counter()
+        clasificar(frame)
+        latencias.append(time.perf_counter() - t0)
+    total = time.perf_counter() - inicio
+    if captura:
+        captura.detener()
+
+    if not latencias:
+        print("No se leyó ningún frame.")
+        return 1
+    lat = np.array(latencias) * 1000
+    print(f"modo={modo} ritmo={args.ritmo} fuente_fps={fuente.fps:.1f} captura={args.captura}")
+    print(f"frames clasificados: {len(latencias)} / entregados por la fuente: {fuente.frames_entregados}")
+    print(f"throughput: {len(latencias) / total:.1f} frames/s")
+    print(f"latencia ms: media {lat.mean():.2f}  p50 {np.percentile(lat, 50):.2f}  p95 {np.percentile(lat, 95):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# archivo: benchmarks/utilidades.py
+import sys
+import numpy as np
+import cv2
+
+from modulos.camara import FuenteReproduccion, RITMO_MAXIMO
+
+
+def frames_sinteticos(cantidad, semilla=0, tamano=(640, 480)):
+    """
+    Frames 640x480 que imitan la banda: fondo gris con ruido y 0-2 piezas circulares
+    de color aleatorio. Son deterministas para poder comparar entre ejecuciones.
+    """
+    rng = np.random.default_rng(semilla)
+    ancho, alto = tamano
+    frames = []
+    for _ in range(cantidad):
+        frame = np.full((alto, ancho, 3), rng.integers(60, 200), np.float32)
+        frame = (frame + rng.normal(0, 12, frame.shape)).clip(0, 255).astype(np.uint8)
+        for _ in range(rng.integers(0, 3)):
+            color = [int(v) for v in rng.integers(0, 256, 3)]
+            centro = (int(rng.integers(0, ancho)), int(rng.integers(0, alto)))
+            cv2.circle(frame, centro, int(rng.integers(5, 120)), color, -1)
+        frames.append(frame)
+    return frames
+
+
+def cargar_frames(ruta, cantidad):
+    """
+    `cantidad` frames de un vídeo o carpeta de imágenes (repetidos si hace falta) o
+    frames sintéticos si no hay ruta o no se puede leer.
+    """
+    if ruta:
+        fuente = FuenteReproduccion(ruta, RITMO_MAXIMO, bucle=True)
+        frames = []
+        while fuente.isOpened() and len(frames) < cantidad:
+            ret, frame = fuente.read()
+            if not ret:
+                break
+            frames.append(frame)
+        fuente.release()
+        if frames:
+            return frames
+        print(f"Sin imágenes en {ruta}, usando frames sintéticos.", file=sys.stderr)
+    return frames_sinteticos(cantidad)
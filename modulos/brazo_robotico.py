@@ -9,6 +9,7 @@ class BrazoRobotico:
         Inicializa los ángulos de los 6 servos en 90°.
         """
         self.serial_connection = None
+        self.lector = None  # LectorSerie: acks y fin de movimiento del firmware
         self.angulos_servos = {1: 90.0, 2: 90.0, 3: 90.0, 4: 90.0, 5: 90.0, 6: 90.0}
         self.velocidad_actual = 50  # Valor inicial de velocidad (1-100)
         self.controlling_logical = [0, 1, 2, 4, 3, 5, 6]  # Para servos físicos 1 a 6, el servo lógico que los controla
@@ -21,7 +22,27 @@ class BrazoRobotico:
         self.serial_connection = connection
         print("Conexión serial asignada a BrazoRobotico.")
 
-    def mover_servos(self, nuevos_angulos, velocidad):
+    def set_lector(self, lector):
+        """
+        Asigna el lector de respuestas del puerto (modulos/lector_serie.py).
+        Con él, quien mueve el brazo puede esperar al fin real de cada movimiento.
+        """
+        self.lector = lector
+
+    def _enviar(self, comando, clave=None):
+        """
+        Con PuertoSerie el comando pasa por su cola (y sustituye a otro con la misma
+        clave aún sin enviar) y se devuelve el Comando encolado; con un serial.Serial
+        directo se escribe tal cual y se devuelve la marca del lector tomada justo antes.
+        Lo devuelto es la marca para lector.esperar_fin (True si no hay lector).
+        """
+        if hasattr(self.serial_connection, "enviar"):
+            return self.serial_connection.enviar(comando.strip(), clave=clave)
+        marca = self.lector.marca() if self.lector and self.lector.activo else True
+        self.serial_connection.write(comando.encode('utf-8'))
+        return marca
+
+    def mover_servos(self, nuevos_angulos, velocidad, fusionable=False):
         """
         Envía un único comando global para mover todos los servos.
         
@@ -29,16 +50,18 @@ class BrazoRobotico:
         
         :param nuevos_angulos: dict con claves 1..6 y valores en [0, 180]
         :param velocidad: int de 1 a 100
+        :param fusionable: True para el jog manual: si el comando anterior aún no salió, se sustituye
+        :return: la marca del envío para lector.esperar_fin (verdadera), o False si no se envió
         """
         if not self.serial_connection or not self.serial_connection.is_open:
             print("No hay conexión serial abierta para mover los servos.")
-            return
+            return False
 
         # Validar que los ángulos estén en rango
         for servo in nuevos_angulos:
             if nuevos_angulos[servo] < 0 or nuevos_angulos[servo] > 180:
                 print(f"Error: Ángulo {nuevos_angulos[servo]} fuera de rango para servo {servo}.")
-                return
+                return False
 
         # Actualizar el estado interno
         self.angulos_servos = nuevos_angulos.copy()
@@ -46,8 +69,9 @@ class BrazoRobotico:
         # Construir y enviar el comando global con el mapeo
         angles_for_command = [nuevos_angulos[self.controlling_logical[i]] for i in range(1, 7)]
         comando = "A," + ",".join(map(str, angles_for_command)) + f",{velocidad}\n"
-        self.serial_connection.write(comando.encode('utf-8'))
+        enviado = self._enviar(comando, clave="A" if fusionable else None)
         print(f"Comando enviado: {comando.strip()}")
+        return enviado
 
     def mover_servo_individual(self, servo_num, angulo, velocidad=None):
         """
@@ -70,13 +94,13 @@ class BrazoRobotico:
             intended_angles[servo_num] = angulo
             angles_for_command = [intended_angles[self.controlling_logical[i]] for i in range(1, 7)]
             comando = "A," + ",".join(map(str, angles_for_command)) + f",{velocidad}\n"
-            self.serial_connection.write(comando.encode('utf-8'))
+            self._enviar(comando, clave="A")
             self.velocidad_actual = velocidad
             print(f"Comando global individual: servo {servo_num} actualizado a {angulo} con velocidad {velocidad}.")
         else:
             physical_servo = self.physical_servo_for_logical[servo_num]
             comando = f"S,{physical_servo},{angulo}\n"
-            self.serial_connection.write(comando.encode('utf-8'))
+            self._enviar(comando, clave=f"S{physical_servo}")
             print(f"Servo {servo_num} (físico {physical_servo}) movido individualmente a {angulo}.")
 
         # Actualizar el estado interno
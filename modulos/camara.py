@@ -0,0 +1,292 @@
+# archivo: modulos/camara.py
+import os
+import time
+import glob
+import logging
+import threading
+import cv2
+from collections import deque, namedtuple
+
+# Frame publicado por el hilo de captura: número de secuencia, instante de captura y
+# la imagen BGR tal cual la entrega OpenCV (sin codificar a JPEG).
+FrameCapturado = namedtuple("FrameCapturado", ["seq", "timestamp", "frame"])
+
+TAMANO_BUFFER = 4           # Frames recientes que se conservan en el anillo
+ESPERA_REINTENTO = 1.0      # Segundos antes de reabrir la cámara tras un fallo
+FALLOS_ANTES_DE_REABRIR = 30
+
+RITMO_TIEMPO_REAL = "tiempo_real"  # Los frames se entregan a los FPS de la grabación
+RITMO_MAXIMO = "maximo"            # Sin esperas: tan rápido como lo pida el consumidor
+FPS_CARPETA = 30.0                 # FPS supuestos al reproducir una carpeta de imágenes
+EXTENSIONES_IMAGEN = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+
+
+class CapturaCamara:
+    """
+    Servicio de captura compartido: un único hilo lee la cámara y publica los frames
+    en un buffer circular. Cualquier número de consumidores (bucle de ejecución,
+    feeds MJPEG, captura de dataset) leen el frame más reciente sin reabrir el
+    dispositivo ni recodificar la imagen.
+    """
+
+    def __init__(self, abrir_fuente, nombre="camara", tamano_buffer=TAMANO_BUFFER):
+        """
+        :param abrir_fuente: callable que devuelve un objeto tipo cv2.VideoCapture ya
+                             abierto (o None si no hay cámara disponible).
+        """
+        self.nombre = nombre
+        self._abrir_fuente = abrir_fuente
+        self._fuente = None
+        self._buffer = deque(maxlen=tamano_buffer)
+        self._condicion = threading.Condition()
+        self._seq = 0
+        self.sesion = 0  # Aumenta en cada iniciar(): la secuencia vuelve a empezar
+        self._hilo = None
+        self._activo = False
+        self.fps = 0.0
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self):
+        """Abre la fuente y arranca el hilo de captura (idempotente)."""
+        with self._condicion:
+            if self._activo:
+                return self._fuente is not None
+            self._fuente = self._abrir_fuente()
+            if self._fuente is None:
+                logging.warning(f"[{self.nombre}] No se pudo abrir ninguna cámara.")
+                return False
+            # Sin frames de la sesión anterior: esperar_nuevo/leer no deben devolver uno viejo
+            self._buffer.clear()
+            self._seq = 0
+            self.sesion += 1
+            self._activo = True
+            self._hilo = threading.Thread(target=self._bucle_captura, name=f"captura-{self.nombre}", daemon=True)
+            self._hilo.start()
+            logging.info(f"[{self.nombre}] Hilo de captura iniciado.")
+            return True
+
+    def detener(self):
+        """Detiene el hilo de captura y libera el dispositivo."""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify_all()
+        if self._hilo and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=2.0)
+        if self._fuente is not None:
+            self._fuente.release()
+            self._fuente = None
+
+    @property
+    def activo(self):
+        return self._activo
+
+    def _bucle_captura(self):
+        fallos = 0
+        t_anterior = time.time()
+        while self._activo:
+            fuente = self._fuente
+            ret, frame = fuente.read() if fuente is not None else (False, None)
+            if not ret and getattr(fuente, "agotada", False):
+                # Reproducción sin bucle terminada: los lectores verán el fin del flujo
+                logging.info(f"[{self.nombre}] Fin de la reproducción.")
+                with self._condicion:
+                    self._activo = False
+                    self._condicion.notify_all()
+                break
+            if not ret or frame is None:
+                fallos += 1
+                if fallos >= FALLOS_ANTES_DE_REABRIR:
+                    logging.warning(f"[{self.nombre}] Cámara sin respuesta, reintentando apertura...")
+                    self._reabrir()
+                    fallos = 0
+                else:
+                    time.sleep(0.01)
+                continue
+            fallos = 0
+
+            ahora = time.time()
+            dt = ahora - t_anterior
+            t_anterior = ahora
+            if dt > 0:
+                # Media móvil exponencial para que el valor mostrado no oscile
+                self.fps = 0.9 * self.fps + 0.1 * (1.0 / dt) if self.fps else 1.0 / dt
+
+            with self._condicion:
+                self._seq += 1
+                self._buffer.append(FrameCapturado(self._seq, ahora, frame))
+                self._condicion.notify_all()
+
+        logging.info(f"[{self.nombre}] Hilo de captura finalizado.")
+
+    def _reabrir(self):
+        if self._fuente is not None:
+            self._fuente.release()
+        self._fuente = None
+        time.sleep(ESPERA_REINTENTO)
+        if self._activo:
+            self._fuente = self._abrir_fuente()
+
+    # --- Lectura para consumidores ---
+
+    def ultimo(self):
+        """Devuelve el FrameCapturado más reciente o None si aún no hay imagen."""
+        with self._condicion:
+            return self._buffer[-1] if self._buffer else None
+
+    def esperar_nuevo(self, seq_anterior=0, timeout=1.0):
+        """
+        Bloquea hasta que exista un frame con secuencia mayor que `seq_anterior`.
+        Devuelve el FrameCapturado más reciente o None si vence el timeout.
+        """
+        limite = time.time() + timeout
+        with self._condicion:
+            while self._activo and (not self._buffer or self._buffer[-1].seq <= seq_anterior):
+                restante = limite - time.time()
+                if restante <= 0:
+                    return None
+                self._condicion.wait(restante)
+            if not self._buffer or self._buffer[-1].seq <= seq_anterior:
+                return None
+            return self._buffer[-1]
+
+    def lector(self):
+        """Crea un consumidor independiente con interfaz compatible con cv2.VideoCapture."""
+        return LectorCamara(self)
+
+
+class LectorCamara:
+    """
+    Vista de un consumidor sobre CapturaCamara. Imita la interfaz mínima de
+    cv2.VideoCapture (read / isOpened / release) para que el código existente no
+    cambie, pero nunca abre el dispositivo: solo lee el buffer compartido.
+
+    Cada lector recuerda la última secuencia entregada, de modo que read() espera
+    a un frame nuevo en lugar de devolver el mismo dos veces. El frame devuelto es
+    compartido entre consumidores: quien vaya a dibujar sobre él debe copiarlo.
+    """
+
+    def __init__(self, captura, timeout=2.0):
+        self._captura = captura
+        self._timeout = timeout
+        self._ultimo_seq = 0
+        self._sesion = captura.sesion
+        self._abierto = True
+        self.timestamp = 0.0
+
+    def isOpened(self):
+        return self._abierto and self._captura.activo
+
+    def read(self):
+        if not self._abierto:
+            return False, None
+        if self._sesion != self._captura.sesion:
+            # La captura se reinició y su secuencia volvió a empezar
+            self._sesion, self._ultimo_seq = self._captura.sesion, 0
+        capturado = self._captura.esperar_nuevo(self._ultimo_seq, self._timeout)
+        if capturado is None:
+            return False, None
+        self._ultimo_seq = capturado.seq
+        self.timestamp = capturado.timestamp
+        return True, capturado.frame
+
+    def release(self):
+        # Solo desconecta a este consumidor; el hilo de captura sigue activo para el resto.
+        self._abierto = False
+
+
+class FuenteReproduccion:
+    """
+    Cámara virtual que reproduce un vídeo o una carpeta de imágenes (p. ej. una
+    carpeta de uploads/ capturada desde la web). Tiene la interfaz de
+    cv2.VideoCapture (read / isOpened / release / get), así que sirve tanto como
+    fuente de CapturaCamara como directamente como `cap` de iniciar_ejecucion.
+
+    - ritmo "tiempo_real": read() espera hasta el instante del frame según los FPS
+      de la grabación (o `fps`), como una cámara real.
+    - ritmo "maximo": sin esperas; el consumidor marca el ritmo (medidas de throughput).
+    - bucle: al terminar vuelve a empezar; si es False, read() devuelve (False, None)
+      y `agotada` pasa a True.
+    """
+
+    def __init__(self, ruta, ritmo=RITMO_TIEMPO_REAL, bucle=True, fps=None):
+        if ritmo not in (RITMO_TIEMPO_REAL, RITMO_MAXIMO):
+            raise ValueError(f"Ritmo de reproducción desconocido: {ritmo}")
+        self.ruta = ruta
+        self.ritmo = ritmo
+        self.bucle = bucle
+        self.agotada = False
+        self.frames_entregados = 0
+        self._video = None
+        self._imagenes = None
+        self._posicion = 0
+
+        if os.path.isdir(ruta):
+            rutas = []
+            for extension in EXTENSIONES_IMAGEN:
+                rutas.extend(glob.glob(os.path.join(ruta, extension)))
+            self._imagenes = sorted(rutas)
+            fps_origen = FPS_CARPETA
+        else:
+            self._video = cv2.VideoCapture(ruta)
+            fps_origen = self._video.get(cv2.CAP_PROP_FPS) if self._video.isOpened() else 0
+        self.fps = float(fps or fps_origen or FPS_CARPETA)
+        self._periodo = 1.0 / self.fps
+        self._siguiente = None
+
+    def isOpened(self):
+        if self._imagenes is not None:
+            return len(self._imagenes) > 0
+        return self._video is not None and self._video.isOpened()
+
+    def _leer_siguiente(self):
+        if self._imagenes is not None:
+            # Las imágenes ilegibles se saltan; se da como máximo una vuelta completa
+            for _ in range(len(self._imagenes)):
+                if self._posicion >= len(self._imagenes):
+                    if not self.bucle:
+                        return None
+                    self._posicion = 0
+                frame = cv2.imread(self._imagenes[self._posicion])
+                self._posicion += 1
+                if frame is not None:
+                    return frame
+            return None
+        ret, frame = self._video.read()
+        if not ret and self.bucle:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._video.read()
+        return frame if ret else None
+
+    def read(self):
+        if self.agotada or not self.isOpened():
+            return False, None
+        frame = self._leer_siguiente()
+        if frame is None:
+            self.agotada = True
+            return False, None
+
+        if self.ritmo == RITMO_TIEMPO_REAL:
+            ahora = time.monotonic()
+            if self._siguiente is None or ahora - self._siguiente > self._periodo:
+                # Primer frame o consumidor retrasado: se reinicia el reloj sin acumular deuda
+                self._siguiente = ahora
+            elif self._siguiente > ahora:
+                time.sleep(self._siguiente - ahora)
+            self._siguiente += self._periodo
+
+        self.frames_entregados += 1
+        return True, frame
+
+    def get(self, propiedad):
+        if propiedad == cv2.CAP_PROP_FPS:
+            return self.fps
+        if propiedad == cv2.CAP_PROP_FRAME_COUNT:
+            if self._imagenes is not None:
+                return float(len(self._imagenes))
+        return self._video.get(propiedad) if self._video is not None else 0.0
+
+    def release(self):
+        if self._video is not None:
+            self._video.release()
+        self._imagenes = None if self._imagenes is None else []
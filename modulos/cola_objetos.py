@@ -0,0 +1,105 @@
+# archivo: modulos/cola_objetos.py
+import time
+import threading
+from collections import deque, OrderedDict
+
+MEMORIA_PISTAS = 256  # Ids de pista recordados para no encolar dos veces el mismo objeto
+
+
+class ObjetoEnCola:
+    """Objeto confirmado y pendiente de recoger."""
+
+    __slots__ = ("pista", "resultado", "regla", "posicion", "instante")
+
+    def __init__(self, pista, resultado, regla, instante=None):
+        self.pista = pista            # Pista de SeguidorCentroides (sigue actualizándose) o None
+        self.resultado = resultado    # ResultadoReconocimiento confirmado
+        self.regla = regla            # Regla de logica_config.json que le corresponde
+        self.posicion = pista.posicion if pista is not None else None  # Al confirmarlo; la recogida usa la pista viva
+        self.instante = time.time() if instante is None else instante
+
+    def __str__(self):
+        return f"#{self.pista.id} {self.resultado}" if self.pista is not None else str(self.resultado)
+
+
+class ColaObjetos:
+    """
+    Cola FIFO entre el hilo de visión (productor) y el del brazo (consumidor).
+
+    Cada objeto se identifica por su pista de seguimiento, así que aunque se vea en
+    muchos frames solo se encola una vez. Los objetos sin pista no se deduplican.
+    También se recuerdan las pistas descartadas (sin regla configurada) para no
+    volver a clasificarlas.
+    """
+
+    def __init__(self, memoria=MEMORIA_PISTAS):
+        self._cola = deque()
+        self._condicion = threading.Condition()
+        self._vistas = OrderedDict()  # id_pista -> True, acotado a `memoria`
+        self._memoria = memoria
+        self._cerrada = False
+        # Métricas
+        self.encolados = 0
+        self.atendidos = 0
+        self.descartados = 0
+
+    def _recordar(self, id_pista):
+        self._vistas[id_pista] = True
+        while len(self._vistas) > self._memoria:
+            self._vistas.popitem(last=False)
+
+    def ya_vista(self, id_pista):
+        with self._condicion:
+            return id_pista in self._vistas
+
+    def agregar(self, objeto):
+        """Encola `objeto`; devuelve False si su pista ya se había encolado o descartado."""
+        with self._condicion:
+            if objeto.pista is not None:
+                if objeto.pista.id in self._vistas:
+                    return False
+                self._recordar(objeto.pista.id)
+            self._cola.append(objeto)
+            self.encolados += 1
+            self._condicion.notify()
+            return True
+
+    def descartar(self, id_pista):
+        """Marca una pista como resuelta sin encolarla (p. ej. objeto sin regla)."""
+        with self._condicion:
+            if id_pista not in self._vistas:
+                self._recordar(id_pista)
+                self.descartados += 1
+
+    def obtener(self, timeout=None):
+        """Primer objeto de la cola, esperando hasta `timeout`; None si no hay o está cerrada."""
+        with self._condicion:
+            if not self._cola and not self._cerrada:
+                self._condicion.wait(timeout)
+            if not self._cola:
+                return None
+            self.atendidos += 1
+            return self._cola.popleft()
+
+    def cerrar(self):
+        """Despierta al consumidor: no llegarán más objetos."""
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify_all()
+
+    @property
+    def cerrada(self):
+        return self._cerrada
+
+    def __len__(self):
+        with self._condicion:
+            return len(self._cola)
+
+    def estadisticas(self):
+        with self._condicion:
+            return {
+                "en_cola": len(self._cola),
+                "encolados": self.encolados,
+                "atendidos": self.atendidos,
+                "descartados": self.descartados,
+            }
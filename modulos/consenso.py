@@ -0,0 +1,87 @@
+# archivo: modulos/consenso.py
+import time
+from collections import deque
+
+UMBRAL_CONSENSO = 1.5    # Confianza acumulada necesaria para confirmar un objeto
+VENTANA_CONSENSO = 10    # Frames recientes que se tienen en cuenta
+MARGEN_CONSENSO = 0.5    # Fracción mínima de la evidencia de la ventana que debe tener el ganador
+
+
+class ConsensoTemporal:
+    """
+    Votación temporal sobre los resultados de reconocimiento_de_objetos.
+
+    Cada frame aporta a su clave (forma, color) la confianza conjunta de las CNN
+    (ResultadoReconocimiento.confianza); los frames vacíos aportan 1.0 a "sin objeto".
+    Un objeto se confirma en cuanto su evidencia en la ventana supera `umbral` y
+    representa al menos `margen` del total.
+
+    Una racha de banda vacía anterior al objeto se descarta con su primer resultado:
+    solo cuentan los vacíos intercalados mientras se observa, que son los que indican
+    un objeto dudoso. Así un objeto nítido (~0.9 por frame) se confirma en dos frames
+    aunque la banda llevara tiempo vacía, uno dudoso necesita más, y un parpadeo
+    aislado no reinicia la cuenta como hacía la exigencia de N resultados idénticos seguidos.
+    """
+
+    def __init__(self, umbral=UMBRAL_CONSENSO, ventana=VENTANA_CONSENSO, margen=MARGEN_CONSENSO):
+        self.umbral = umbral
+        self.margen = margen
+        self._votos = deque(maxlen=ventana)  # (clave | None, peso, resultado)
+        self._inicio = None
+        # Métricas
+        self.confirmados = 0
+        self.ultimo_frames = 0       # Frames que necesitó la última confirmación
+        self.ultimo_tiempo = 0.0     # Segundos desde el primer voto no vacío hasta confirmar
+
+    def agregar(self, resultado, ahora=None):
+        """
+        Añade el resultado de un frame. Devuelve el ResultadoReconocimiento confirmado
+        (el más reciente de la clase ganadora) o None si todavía no hay consenso.
+        """
+        ahora = time.time() if ahora is None else ahora
+        if resultado.vacio:
+            self._votos.append((None, 1.0, resultado))
+            if all(clave is None for clave, _, _ in self._votos):
+                self._inicio = None
+            return None
+
+        if self._inicio is None:
+            # Primer objeto tras una racha vacía: esos votos no son dudas sobre este objeto
+            self._votos.clear()
+            self._inicio = ahora
+        self._votos.append((resultado.clave, resultado.confianza, resultado))
+
+        total = sum(peso for _, peso, _ in self._votos)
+        ganador, puntos = max(self.evidencia().items(), key=lambda item: item[1])
+        if puntos < self.umbral or puntos < self.margen * total:
+            return None
+
+        confirmado = next(r for clave, _, r in reversed(self._votos) if clave == ganador)
+        self.confirmados += 1
+        self.ultimo_frames = sum(1 for clave, _, _ in self._votos if clave is not None)
+        self.ultimo_tiempo = ahora - self._inicio
+        self.reiniciar()
+        return confirmado
+
+    def evidencia(self):
+        """Evidencia acumulada por clave en la ventana actual (para logs y depuración)."""
+        evidencia = {}
+        for clave, peso, _ in self._votos:
+            if clave is not None:
+                evidencia[clave] = evidencia.get(clave, 0.0) + peso
+        return evidencia
+
+    def clonar(self):
+        """Consenso vacío con la misma configuración (uno por objeto seguido)."""
+        return ConsensoTemporal(self.umbral, self._votos.maxlen, self.margen)
+
+    def reiniciar(self):
+        self._votos.clear()
+        self._inicio = None
+
+    def estadisticas(self):
+        return {
+            "confirmados": self.confirmados,
+            "ultimo_frames": self.ultimo_frames,
+            "ultimo_tiempo_ms": round(self.ultimo_tiempo * 1000, 1),
+        }
@@ -0,0 +1,68 @@
+# archivo: modulos/deteccion_cambios.py
+import time
+import cv2
+
+TAMANO_REDUCIDO = (80, 60)   # Resolución de trabajo (ancho, alto): ~5000 píxeles
+UMBRAL_PIXEL = 25            # Diferencia de gris para considerar que un píxel cambió
+UMBRAL_AREA = 0.02           # Fracción de píxeles cambiados que dispara la inferencia
+EDAD_MAXIMA = 2.0            # Segundos tras los que se fuerza una inferencia aunque no haya cambios
+
+
+class DetectorCambios:
+    """
+    Compuerta barata delante de las CNN.
+
+    Compara una versión reducida y en gris del frame actual contra la del último frame
+    que sí se clasificó. Si la escena no ha cambiado, el resultado anterior sigue
+    siendo válido y no hace falta volver a invocar los modelos; así, con la banda
+    vacía, la Raspberry Pi solo hace un resize y una resta por frame.
+    """
+
+    def __init__(self, tamano=TAMANO_REDUCIDO, umbral_pixel=UMBRAL_PIXEL,
+                 umbral_area=UMBRAL_AREA, edad_maxima=EDAD_MAXIMA):
+        self.tamano = tamano
+        self.umbral_pixel = umbral_pixel
+        self.umbral_area = umbral_area
+        self.edad_maxima = edad_maxima
+        self._referencia = None
+        self._t_referencia = 0.0
+        self.frames_evaluados = 0
+        self.inferencias_omitidas = 0
+        self.ultimo_cambio = 0.0  # Fracción de píxeles cambiados en la última evaluación
+
+    def _reducir(self, frame):
+        reducido = cv2.resize(frame, self.tamano, interpolation=cv2.INTER_AREA)
+        gris = cv2.cvtColor(reducido, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gris, (5, 5), 0)
+
+    def hay_cambio(self, frame, ahora=None):
+        """
+        Devuelve True si hay que clasificar este frame (y lo toma como nueva referencia),
+        o False si la escena es igual a la del último frame clasificado.
+        """
+        ahora = time.time() if ahora is None else ahora
+        gris = self._reducir(frame)
+        self.frames_evaluados += 1
+
+        if self._referencia is not None and (ahora - self._t_referencia) < self.edad_maxima:
+            diferencia = cv2.absdiff(gris, self._referencia)
+            _, mascara = cv2.threshold(diferencia, self.umbral_pixel, 255, cv2.THRESH_BINARY)
+            self.ultimo_cambio = cv2.countNonZero(mascara) / float(mascara.size)
+            if self.ultimo_cambio < self.umbral_area:
+                self.inferencias_omitidas += 1
+                return False
+
+        self._referencia = gris
+        self._t_referencia = ahora
+        return True
+
+    def reiniciar(self):
+        """Olvida la referencia: el siguiente frame se clasificará siempre."""
+        self._referencia = None
+
+    def estadisticas(self):
+        return {
+            "frames_evaluados": self.frames_evaluados,
+            "inferencias_omitidas": self.inferencias_omitidas,
+            "ultimo_cambio": round(self.ultimo_cambio, 4),
+        }
@@ -1,10 +1,19 @@
 # web/modulos/ejecucion.py
 import time
+import queue
+import threading
 import cv2
 import os
 import json
 import logging
-from .reconocimiento import reconocimiento_de_objetos
+from .reconocimiento import reconocimiento_de_objetos, recortar_roi, roi_envolvente, RESULTADO_VACIO
+from .etiquetas import clave_etiqueta
+from .consenso import ConsensoTemporal
+from .cola_objetos import ColaObjetos, ObjetoEnCola
+from .movimientos import BibliotecaMovimientos, INTERVALO_REVISION
+from .perfil_movimiento import predecir, LATENCIA_COMANDO
+from .maquina_estados import (MaquinaEstados, INACTIVO, DETECTANDO, CONFIRMANDO, RECOGIENDO,
+                              LIMPIANDO, VERIFICANDO)
 from .banda_transportadora import BandaTransportadora
 from .brazo_robotico import BrazoRobotico
 
@@ -22,76 +31,91 @@ console.setFormatter(formatter)
 logging.getLogger().addHandler(console)
 
 # Constantes de configuración
-VELOCIDAD_CONVERSION = 60.0
-BUFFER_SEGURIDAD = 0.2
-TIEMPO_ESPERA_ENTRE_MOVIMIENTOS = 1
-TIEMPO_LIMPIEZA = 2.0  # Tiempo para despejar el área
-MUESTRAS_VERIFICACION_VACIO = 5  # Muestras para confirmar vacío
-UMBRAL_CONSISTENCIA_DETECCION = 3  # Detecciones consistentes requeridas
+FRAMES_VACIOS_LIMPIEZA = 5  # Frames vacíos seguidos que dan la zona por despejada
+TIEMPO_MAXIMO_LIMPIEZA = 5.0  # Límite de la limpieza; si se agota se avisa y se continúa
+PAUSA_LIMPIEZA = 0.1  # Espera máxima por frame durante la limpieza (para poder detener)
+MARGEN_CAJA_PISTA = 0.25  # Margen alrededor de la caja de un objeto seguido al clasificarlo
+PAUSA_DISPARO = 0.02  # Resolución de la espera de una recogida al vuelo
+MARGEN_FIN_MOVIMIENTO = 0.5  # Segundos sobre la duración prevista antes de dar por perdido el FIN del firmware
 RUTA_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # web/
 RUTA_LOGICA = os.path.join(RUTA_BASE, "logica_config.json")
 RUTA_MOVIMIENTOS = os.path.join(RUTA_BASE, "movimientos")
 
-# Bandera global
-stop_execution = False
+# Estado de la ejecución en curso: lo consultan las rutas y lo usa detener_ejecucion
+maquina = MaquinaEstados()
+# Movimientos compilados en memoria, invalidados por mtime
+biblioteca = BibliotecaMovimientos(RUTA_MOVIMIENTOS)
 
 def calcular_tiempo_movimiento(current_angles, nuevos_angulos, velocidad):
-    """Calcula tiempo de movimiento con precisión dinámica"""
-    if velocidad <= 0 or not nuevos_angulos:
+    """Duración exacta de un movimiento global según el perfil del firmware (perfil_movimiento.py)"""
+    if not nuevos_angulos:
         return 0.0
-    
-    deltas = [abs(nuevos_angulos[servo] - current_angles.get(servo, 0)) for servo in nuevos_angulos]
-    max_delta = max(deltas) if deltas else 0
-    
-    velocidad_efectiva = (velocidad / 100.0) * VELOCIDAD_CONVERSION
-    return (max_delta / velocidad_efectiva) + BUFFER_SEGURIDAD if velocidad_efectiva > 0 else 0.0
+    origen = [current_angles.get(servo, 0) for servo in range(1, 7)]
+    destino = [nuevos_angulos.get(servo, origen[servo - 1]) for servo in range(1, 7)]
+    duraciones, _ = predecir(origen, [destino], [velocidad])
+    return float(duraciones[0])
 
 def detener_ejecucion():
-    global stop_execution
-    stop_execution = True
+    maquina.detener()
     logging.info("Detención solicitada por usuario")
 
-def procesar_movimiento(movimiento_path, brazo):
-    """Ejecuta movimientos con sincronización inteligente"""
+def estado_ejecucion():
+    """Estado actual y tiempo acumulado en cada estado."""
+    return maquina.estadisticas()
+
+def esperar_paso(brazo, marca, tiempo_estimado, parada):
+    """
+    Espera a que termine el paso recién enviado. Con lector serie se espera al
+    `FIN: MOVIMIENTO` del firmware (la duración prevista solo sirve de límite); sin
+    lector, o con un firmware que no lo envía, se espera la duración prevista.
+    Devuelve False si se pidió la detención.
+    """
+    lector = brazo.lector
+    if not marca or marca is True or lector is None or lector.sin_fin:
+        return not parada.wait(tiempo_estimado + LATENCIA_COMANDO)
+    terminado = lector.esperar_fin(marca, tiempo_estimado + MARGEN_FIN_MOVIMIENTO, parada)
+    if terminado is None:
+        return False
+    if not terminado and not lector.sin_fin:
+        logging.info("Advertencia: no llegó el fin de movimiento del brazo; se continúa")
+    return True
+
+def procesar_movimiento(movimiento_path, brazo, parada=None):
+    """
+    Ejecuta movimientos sincronizados con el fin real de cada paso (compilados y
+    cacheados por BibliotecaMovimientos). `parada` permite cancelarlo; por defecto
+    es la de la ejecución en curso.
+    """
+    if parada is None:
+        parada = maquina.parada
     try:
-        if not os.path.exists(movimiento_path):
+        movimiento = biblioteca.obtener(movimiento_path)
+        if movimiento is None:
             logging.info(f"Error: Archivo de movimiento no encontrado: {movimiento_path}")
             return
 
-        with open(movimiento_path, "r") as file:
-            lineas = [l.strip() for l in file.readlines() if l.strip()]
-
-        if not lineas:
+        if not len(movimiento):
             logging.info(f"Advertencia: Archivo de movimiento vacío: {movimiento_path}")
             return
 
         logging.info(f"Ejecutando movimiento: {os.path.basename(movimiento_path)}")
-        
-        for num_linea, linea in enumerate(lineas, 1):
-            if stop_execution:
+        tiempos = movimiento.tiempos(brazo.angulos_servos).tolist()
+
+        for num_paso, ((angulos_objetivo, velocidad), tiempo) in enumerate(zip(movimiento.pasos(), tiempos), 1):
+            if parada.is_set():
                 logging.info("Ejecución interrumpida durante movimiento")
                 break
 
             try:
-                datos = json.loads(linea)
-                velocidad = datos['velocidad']
-                servos = datos['servos']
-                
-                if len(servos) != 6:
-                    logging.info(f"Error en línea {num_linea}: Formato incorrecto")
-                    continue
-
-                angulos_objetivo = {i+1: servos[i] for i in range(6)}
-                angulos_actuales = brazo.angulos_servos.copy()
-                
-                tiempo = calcular_tiempo_movimiento(angulos_actuales, angulos_objetivo, velocidad)
                 logging.info(f"Moviendo servos a nueva posición")
-                
-                brazo.mover_servos(angulos_objetivo, velocidad)
-                time.sleep(max(tiempo, 0.1))
+                # La marca es el propio envío: su fin no se confunde con el de otro comando en vuelo
+                marca = brazo.mover_servos(angulos_objetivo, velocidad)
+                if not esperar_paso(brazo, marca, tiempo, parada):
+                    logging.info("Ejecución interrumpida durante movimiento")
+                    break
 
             except Exception as e:
-                logging.info(f"Error en línea {num_linea}: {str(e)}")
+                logging.info(f"Error en paso {num_paso}: {str(e)}")
                 continue
 
         logging.info("Movimiento finalizado correctamente")
@@ -99,114 +123,458 @@ def procesar_movimiento(movimiento_path, brazo):
     except Exception as e:
         logging.info(f"Error procesando movimiento: {str(e)}")
 
-def iniciar_ejecucion(form_interpreter, color_interpreter, form_labels, color_labels, cap, banda, brazo):
-    global stop_execution
-    stop_execution = False
+def esperar_disparo(seguimiento, pista, disparo, adelanto=None):
+    """
+    Espera al instante de lanzar una recogida al vuelo (o, con `adelanto=0`, a que el
+    objeto llegue a la línea de recogida). El hilo de visión sigue actualizando el
+    seguimiento, así que cada vuelta refina la predicción de llegada.
+    Devuelve False si se detuvo la ejecución.
+    """
+    while time.time() < disparo:
+        if not maquina.esperar(min(PAUSA_DISPARO, disparo - time.time())):
+            return False
+        if seguimiento.visible(pista):
+            disparo = seguimiento.instante_disparo(pista, adelanto=adelanto) or disparo
+    return not maquina.detenida
+
+def ejecutar_regla(regla, brazo):
+    ruta_movimiento = biblioteca.ruta(regla['movement'])
+    if biblioteca.obtener(ruta_movimiento) is not None:
+        procesar_movimiento(ruta_movimiento, brazo)
+    else:
+        logging.info(f"Error: Movimiento no existe: {regla['movement']}")
+
+def caja_con_margen(caja, margen=MARGEN_CAJA_PISTA):
+    """Amplía la caja [x, y, ancho, alto] (fracciones del frame) sin salirse del frame."""
+    x, y, w, h = caja
+    x0, y0 = max(x - w * margen, 0.0), max(y - h * margen, 0.0)
+    x1, y1 = min(x + w * (1 + margen), 1.0), min(y + h * (1 + margen), 1.0)
+    return [x0, y0, x1 - x0, y1 - y0]
+
+def en_zona(posicion, zona):
+    if not zona:
+        return True
+    x, y, w, h = zona
+    return x <= posicion[0] <= x + w and y <= posicion[1] <= y + h
+
+def compilar_reglas(logica):
+    """
+    Indexa las reglas de logica_config.json por (forma, color) normalizados, la misma
+    clave que ResultadoReconocimiento.clave, para buscarlas en O(1) en cada detección.
+    """
+    reglas = {}
+    for regla in logica:
+        clave = (clave_etiqueta(regla["shape"], "forma"), clave_etiqueta(regla["color"], "color"))
+        # Como el recorrido lineal original, ante reglas duplicadas gana la primera
+        reglas.setdefault(clave, regla)
+    return reglas
+
+class TablaReglas:
+    """
+    logica_config.json compilado con compilar_reglas y recargado si el archivo cambia.
+    El mtime se comprueba como mucho cada INTERVALO_REVISION segundos; si la nueva
+    versión no se puede leer se conserva la anterior.
+    """
+
+    def __init__(self, ruta, intervalo=INTERVALO_REVISION):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._mtime = os.path.getmtime(ruta)
+        with open(ruta, "r", encoding="utf-8") as f:
+            self._reglas = compilar_reglas(json.load(f))
+        self._revisado = time.monotonic()
+
+    def _revisar(self):
+        ahora = time.monotonic()
+        if ahora - self._revisado < self.intervalo:
+            return
+        self._revisado = ahora
+        try:
+            mtime = os.path.getmtime(self.ruta)
+            if mtime == self._mtime:
+                return
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                self._reglas = compilar_reglas(json.load(f))
+            self._mtime = mtime
+            logging.info(f"Reglas recargadas: {len(self._reglas)}")
+        except (OSError, ValueError, KeyError) as e:
+            logging.info(f"Advertencia: no se pudo recargar {os.path.basename(self.ruta)}: {str(e)}")
+
+    def get(self, clave):
+        self._revisar()
+        return self._reglas.get(clave)
+
+    def __len__(self):
+        return len(self._reglas)
+
+
+class EjecucionClasificacion:
+    """
+    Ejecución como máquina de estados (ver modulos/maquina_estados.py) con dos hilos:
+
+    - Visión: lee la cámara, sigue y clasifica, y entrega los objetos confirmados al
+      hilo de movimiento por una ColaObjetos. Mientras el brazo trabaja solo mantiene
+      el seguimiento, y en CLEARING/VERIFYING envía por `_verificaciones` si la zona
+      está vacía en cada frame.
+    - Movimiento: atiende la cola y pasa por PICKING -> CLEARING <-> VERIFYING hasta
+      ver la zona vacía (ver _despejar); en modo multiobjeto solo hay PICKING.
+
+    Todas las esperas son cancelables (MaquinaEstados.esperar o colas con timeout),
+    así que detener_ejecucion corta cualquier fase de inmediato.
+    """
+
+    def __init__(self, clasificar, cap, banda, brazo, reglas, compuerta=None, zona=None,
+                 consenso=None, seguimiento=None, consensos_pista=None,
+                 frames_limpieza=FRAMES_VACIOS_LIMPIEZA, tiempo_max_limpieza=TIEMPO_MAXIMO_LIMPIEZA):
+        self.clasificar = clasificar
+        self.cap = cap
+        self.banda = banda
+        self.brazo = brazo
+        self.reglas = reglas
+        self.compuerta = compuerta
+        self.zona = zona
+        self.consenso = consenso or ConsensoTemporal()
+        self.seguimiento = seguimiento
+        self.consensos_pista = {} if consensos_pista is None else consensos_pista
+        self.frames_limpieza = frames_limpieza
+        self.tiempo_max_limpieza = tiempo_max_limpieza
+        self.multiobjeto = seguimiento is not None and seguimiento.multiobjeto
+        self.cola = ColaObjetos()
+        if seguimiento is not None:
+            seguimiento.cola = self.cola
+        self._verificaciones = queue.Queue()
+        self._brazo_libre = threading.Event()
+        self._brazo_libre.set()
+        self._resultado = RESULTADO_VACIO
+        self._contador_vacios = 0
+
+    def ejecutar(self):
+        """Arranca el hilo de visión y atiende la cola en el hilo actual hasta la detención."""
+        vision = threading.Thread(target=self._vision, name="vision-ejecucion", daemon=True)
+        vision.start()
+        try:
+            self._movimiento()
+        finally:
+            maquina.detener()
+            vision.join(timeout=2.0)
+
+    # --- Hilo de visión ---
+
+    def _vision(self):
+        try:
+            while not maquina.detenida:
+                ret, frame = self.cap.read()
+                if not ret:
+                    logging.info("Error: Fallo de captura de cámara")
+                    break
+                if self.multiobjeto:
+                    self._observar_multiobjeto(frame)
+                else:
+                    self._observar(frame)
+        except Exception as e:
+            logging.info(f"Error en visión: {str(e)}")
+        finally:
+            self.cola.cerrar()
+
+    def _observar(self, frame):
+        """Un objeto cada vez: consenso global y entrega al confirmar."""
+        estado = maquina.estado
+        if estado in (LIMPIANDO, VERIFICANDO):
+            self._verificaciones.put(self.clasificar(frame).vacio)
+            return
+        if estado not in (DETECTANDO, CONFIRMANDO):
+            # El brazo está trabajando: solo se mantiene el seguimiento (recogida al vuelo)
+            if self.seguimiento is not None:
+                self.seguimiento.actualizar(frame)
+            return
+
+        # Compuerta de movimiento: si la escena no cambió desde el último frame
+        # clasificado, su resultado sigue vigente y no se invocan las CNN. Mientras
+        # se confirma un objeto se clasifica siempre: cada voto es una inferencia nueva.
+        nuevo = (self.compuerta is None or bool(self.consenso.evidencia())
+                 or self.compuerta.hay_cambio(recortar_roi(frame, self.zona)))
+        if nuevo:
+            self._resultado = self.clasificar(frame)
+        resultado = self._resultado
+        if self.seguimiento is not None:
+            self.seguimiento.actualizar(frame, vacio=resultado.vacio)
+        if not nuevo:
+            # Ya votado: repetirlo haría que una sola inferencia alcanzara el umbral
+            return
+
+        confirmado = self.consenso.agregar(resultado)
+        if resultado.vacio:
+            if not self.consenso.evidencia():
+                maquina.cambiar(DETECTANDO, desde=CONFIRMANDO)
+            self._contador_vacios += 1
+            if self._contador_vacios % 30 == 0:
+                logging.info("Esperando objeto...")
+            return
+        if confirmado is None:
+            maquina.cambiar(CONFIRMANDO, desde=DETECTANDO)
+            logging.info(f"Detección preliminar: {resultado} (confianza {resultado.confianza:.2f})")
+            return
+
+        logging.info(f"Objeto confirmado en {self.consenso.ultimo_frames} frames "
+                     f"({self.consenso.ultimo_tiempo * 1000:.0f} ms)")
+        regla = self.reglas.get(confirmado.clave)
+        if not regla:
+            logging.info(f"Objeto no configurado: {confirmado}")
+            maquina.cambiar(DETECTANDO, desde=CONFIRMANDO)
+            return
+        pista = self.seguimiento.objetivo() if self.seguimiento is not None else None
+        # La visión deja de buscar objetos hasta que el hilo de movimiento termine con este
+        if maquina.cambiar(RECOGIENDO, desde=(DETECTANDO, CONFIRMANDO)):
+            self.cola.agregar(ObjetoEnCola(pista, confirmado, regla))
+
+    def _observar_multiobjeto(self, frame):
+        """Sigue todos los objetos y clasifica cada pista de la zona con su propio consenso."""
+        # Hasta tener fondo, el reconocimiento decide cuándo la banda está vacía;
+        # después basta con que la segmentación no encuentre nada
+        vacio = self.seguimiento.tiene_fondo or self.clasificar(frame).vacio
+        pistas = self.seguimiento.actualizar(frame, vacio=vacio)
+        vigentes = {p.id for p in pistas}
+        for id_pista in [i for i in self.consensos_pista if i not in vigentes]:
+            del self.consensos_pista[id_pista]
+
+        # Con el brazo en movimiento solo se sigue: el propio brazo entra en la imagen
+        if not self._brazo_libre.is_set():
+            return
+
+        candidatas = [p for p in pistas
+                      if not (p.perdidos or self.cola.ya_vista(p.id) or not en_zona(p.posicion, self.zona))]
+        # Todas las pistas del frame de una vez: con pool de inferencia se clasifican a la vez
+        resultados = self.clasificar(frame, [caja_con_margen(p.deteccion.caja) for p in candidatas],
+                                     todas=True) if candidatas else []
+        for pista, resultado in zip(candidatas, resultados):
+            consenso = self.consensos_pista.setdefault(pista.id, self.consenso.clonar())
+            confirmado = consenso.agregar(resultado)
+            if confirmado is None:
+                continue
+            regla = self.reglas.get(confirmado.clave)
+            if not regla:
+                logging.info(f"Objeto no configurado: {confirmado}")
+                self.cola.descartar(pista.id)
+                continue
+            objeto = ObjetoEnCola(pista, confirmado, regla)
+            if self.cola.agregar(objeto):
+                logging.info(f"Objeto en cola: {objeto} ({len(self.cola)} pendientes)")
+
+        if any(c.evidencia() for c in self.consensos_pista.values()):
+            maquina.cambiar(CONFIRMANDO, desde=DETECTANDO)
+        else:
+            maquina.cambiar(DETECTANDO, desde=CONFIRMANDO)
+
+    # --- Hilo de movimiento ---
+
+    def _movimiento(self):
+        while not maquina.detenida:
+            objeto = self.cola.obtener(timeout=0.5)
+            if objeto is None:
+                if self.cola.cerrada:
+                    break
+                continue
+            try:
+                self._atender(objeto)
+            except Exception as e:
+                logging.info(f"Error general: {str(e)}")
+            self._reanudar()
+
+    def _atender(self, objeto):
+        maquina.cambiar(RECOGIENDO)
+        pista = objeto.pista
+        if self.multiobjeto and not self.seguimiento.activa(pista):
+            logging.info(f"Objeto perdido antes de recogerlo: {objeto}")
+            return
+
+        forma, color = objeto.resultado.clave
+        logging.info(f"Procesando objeto: forma={forma}, color={color}"
+                     + (f" ({len(self.cola)} pendientes)" if self.multiobjeto else ""))
+
+        # Recogida al vuelo: si se conoce la velocidad de la banda y el objeto
+        # llega a tiempo a la línea de recogida, no se para la banda
+        disparo = None
+        if pista is not None and self.seguimiento.al_vuelo:
+            disparo = self.seguimiento.instante_disparo(pista)
+        if disparo is not None:
+            logging.info(f"Recogida al vuelo en {disparo - time.time():.2f} s "
+                         f"(banda {self.seguimiento.velocidad_banda:.3f} /s)")
+            if not esperar_disparo(self.seguimiento, pista, disparo):
+                return
+            self.seguimiento.recogidas_al_vuelo += 1
+        else:
+            # La banda se para con el objeto en la línea de recogida, donde lo esperan los
+            # movimientos de las reglas, y no allí donde esté al sacarlo de la cola
+            parada = self.seguimiento.instante_disparo(pista, adelanto=0) if pista is not None else None
+            if parada is not None:
+                logging.info(f"Parada en la línea de recogida en {parada - time.time():.2f} s")
+                if not esperar_disparo(self.seguimiento, pista, parada, adelanto=0):
+                    return
+            self.banda.desactivar()
+            logging.info("Banda desactivada")
+            if self.seguimiento is not None:
+                self.seguimiento.recogidas_con_parada += 1
+
+        self._brazo_libre.clear()
+        try:
+            ejecutar_regla(objeto.regla, self.brazo)
+        finally:
+            self._brazo_libre.set()
+
+        if self.multiobjeto:
+            if disparo is None:
+                self.banda.activar()
+                logging.info("Banda activada")
+            return
+        # Limpieza post-procesamiento (al vuelo la banda nunca se detuvo)
+        if disparo is None:
+            self.banda.activar()
+            logging.info("Banda activada para limpieza")
+        self._despejar()
+
+    def _vaciar_verificaciones(self):
+        try:
+            while True:
+                self._verificaciones.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _despejar(self):
+        """
+        Limpieza verificada por visión: con la banda en marcha se observa la zona en
+        cada frame (CLEARING) y, en cuanto aparece un frame vacío, se cuentan vacíos
+        seguidos (VERIFYING). Termina al llegar a `frames_limpieza` o, como mucho, a
+        los `tiempo_max_limpieza` segundos, con un aviso.
+        """
+        self._vaciar_verificaciones()
+        maquina.cambiar(LIMPIANDO)
+        logging.info("Limpiando área de trabajo...")
+        inicio = time.time()
+        limite = inicio + self.tiempo_max_limpieza
+        vacios = 0
+        while vacios < self.frames_limpieza:
+            restante = limite - time.time()
+            if restante <= 0:
+                logging.info(f"Advertencia: El objeto podría permanecer en el área "
+                             f"(sin {self.frames_limpieza} frames vacíos seguidos en {self.tiempo_max_limpieza:.1f} s)")
+                return
+            try:
+                vacio = self._verificaciones.get(timeout=min(restante, PAUSA_LIMPIEZA))
+            except queue.Empty:
+                vacio = None
+            if maquina.detenida:
+                return
+            if vacio is None:
+                continue
+            if vacio:
+                vacios += 1
+                maquina.cambiar(VERIFICANDO, desde=LIMPIANDO)
+            else:
+                vacios = 0
+                maquina.cambiar(LIMPIANDO, desde=VERIFICANDO)
+        logging.info(f"Área despejada en {time.time() - inicio:.2f} s")
+
+    def _reanudar(self):
+        """Vuelve a DETECTING tras atender un objeto."""
+        if not self.multiobjeto:
+            self._vaciar_verificaciones()
+            self.consenso.reiniciar()
+            if self.compuerta:
+                self.compuerta.reiniciar()
+            if self.seguimiento is not None:
+                self.seguimiento.reiniciar()
+            self._resultado = RESULTADO_VACIO
+        maquina.cambiar(DETECTANDO)
+
+def iniciar_ejecucion(form_interpreter, color_interpreter, form_labels, color_labels, cap, banda, brazo,
+                      ejecutor=None, compuerta=None, rois=None, cascada=None, consenso=None, modelos=None,
+                      seguimiento=None, frames_limpieza=FRAMES_VACIOS_LIMPIEZA,
+                      tiempo_max_limpieza=TIEMPO_MAXIMO_LIMPIEZA):
+    """
+    Ejecución de clasificación y selección (ver EjecucionClasificacion). Con `modelos` (GestorModelos) las
+    sesiones y etiquetas se leen de la versión publicada al empezar cada frame, de modo
+    que una recarga de modelos se aplica entre dos frames sin detener la ejecución.
+    Con `seguimiento` (SeguimientoBanda) se siguen los objetos y se estima la velocidad
+    de la banda; si además tiene `al_vuelo`, el movimiento se lanza sin parar la banda, y
+    con `multiobjeto` se atienden varios objetos a la vez desde una cola.
+    """
+    maquina.iniciar()
+    # Votación temporal: sustituye a las N detecciones idénticas separadas por sleeps
+    consenso = consenso or ConsensoTemporal()
+
+    # Zonas de interés de la cámara: se clasifican en orden y gana la primera no vacía
+    zonas = rois or [None]
+    zona_compuerta = roi_envolvente(rois)
+
+    version = [modelos.actual.version if modelos else None]
+    consensos_pista = {}  # Modo multiobjeto: un consenso por pista
+
+    def clasificar(frame, regiones=None, todas=False):
+        """
+        Resultado de la primera región (`regiones` o los ROI) con objeto, o con `todas`
+        la lista de resultados de cada región. Si la versión de los modelos tiene pool,
+        las regiones se clasifican a la vez, cada una con su propio par de intérpretes.
+        """
+        sesion_forma, indice_forma = form_interpreter, form_labels
+        sesion_color, indice_color = color_interpreter, color_labels
+        pool = None
+        if modelos is not None:
+            # Una sola lectura por frame: forma, color y etiquetas de la misma versión
+            conjunto = modelos.actual
+            if conjunto.version != version[0]:
+                logging.info(f"Modelos cambiados a la versión {conjunto.version}")
+                version[0] = conjunto.version
+                consenso.reiniciar()  # Los votos de la versión anterior ya no son comparables
+                consensos_pista.clear()
+            if not conjunto.listo:
+                return RESULTADO_VACIO
+            sesion_forma, indice_forma = conjunto.sesion_forma, conjunto.indice_forma
+            sesion_color, indice_color = conjunto.sesion_color, conjunto.indice_color
+            pool = conjunto.pool
+        regiones = regiones or zonas
+
+        def clasificar_region(forma, color, roi, ejecutor_par=None):
+            return reconocimiento_de_objetos(
+                frame, forma, indice_forma, color, indice_color,
+                ejecutor=ejecutor_par, roi=roi, cascada=cascada
+            )
+
+        if pool is not None and len(regiones) > 1:
+            # El paralelismo está entre regiones: dentro de cada par, forma y color en secuencia
+            futuros = [pool.enviar(clasificar_region, roi) for roi in regiones]
+            resultados = [futuro.result() for futuro in futuros]
+            if todas:
+                return resultados
+            return next((r for r in resultados if not r.vacio), RESULTADO_VACIO)
+        if todas:
+            return [clasificar_region(sesion_forma, sesion_color, roi, ejecutor) for roi in regiones]
+        for roi in regiones:
+            resultado = clasificar_region(sesion_forma, sesion_color, roi, ejecutor)
+            if not resultado.vacio:
+                return resultado
+        return RESULTADO_VACIO
 
     logging.info("Iniciando ejecución")
 
     if not banda or not banda.serial_connection.is_open:
         logging.info("Error: Banda no inicializada")
+        maquina.cambiar(INACTIVO)
         return
 
     try:
         banda.activar()
         logging.info("Banda activada")
-        logica = json.load(open(RUTA_LOGICA, "r"))
-        contador_vacios = 0
-        contador_detecciones = 0
-        objeto_en_proceso = False
-        ultimo_objeto = None
-
-        while not stop_execution:
-            ret, frame = cap.read()
-            if not ret:
-                logging.info("Error: Fallo de captura de cámara")
-                break
-
-            if objeto_en_proceso:
-                continue
-
-            resultado = reconocimiento_de_objetos(
-                frame, form_interpreter, form_labels, color_interpreter, color_labels
-            )
-
-            if resultado == "vacio_vacio":
-                contador_vacios += 1
-                contador_detecciones = 0
-                if contador_vacios % 30 == 0:
-                    logging.info("Esperando objeto...")
-                time.sleep(0.1)
-                continue
-            else:
-                if resultado == ultimo_objeto:
-                    contador_detecciones += 1
-                else:
-                    contador_detecciones = 1
-                    ultimo_objeto = resultado
-
-                if contador_detecciones < UMBRAL_CONSISTENCIA_DETECCION:
-                    logging.info(f"Detección preliminar: {resultado}")
-                    time.sleep(0.1)
-                    continue
-
-                try:
-                    forma, color = resultado.split('_')
-                    regla = next((r for r in logica if r["shape"] == forma and r["color"] == color), None)
-                    
-                    if not regla:
-                        logging.info(f"Objeto no configurado: {resultado}")
-                        contador_detecciones = 0
-                        ultimo_objeto = None
-                        continue
-
-                    objeto_en_proceso = True
-                    logging.info(f"Procesando objeto: forma={forma}, color={color}")
-                    banda.desactivar()
-                    logging.info("Banda desactivada")
-
-                    ruta_movimiento = os.path.join(RUTA_MOVIMIENTOS, f"{regla['movement']}.txt")
-                    if os.path.exists(ruta_movimiento):
-                        procesar_movimiento(ruta_movimiento, brazo)
-                    else:
-                        logging.info(f"Error: Movimiento no existe: {regla['movement']}")
-
-                    # Limpieza post-procesamiento
-                    logging.info("Limpiando área de trabajo...")
-                    banda.activar()
-                    logging.info("Banda activada para limpieza")
-                    inicio_limpieza = time.time()
-                    
-                    while (time.time() - inicio_limpieza) < TIEMPO_LIMPIEZA:
-                        ret, _ = cap.read()  # Limpiar buffer de cámara
-                        time.sleep(0.1)
-
-                    # Verificación de vacío
-                    verificaciones_vacio = 0
-                    for _ in range(MUESTRAS_VERIFICACION_VACIO):
-                        ret, frame = cap.read()
-                        if reconocimiento_de_objetos(frame, form_interpreter, form_labels, color_interpreter, color_labels) == "vacio_vacio":
-                            verificaciones_vacio += 1
-                        time.sleep(0.2)
-
-                    if verificaciones_vacio < MUESTRAS_VERIFICACION_VACIO:
-                        logging.info(f"Advertencia: El objeto podría permanecer en el área ({verificaciones_vacio}/{MUESTRAS_VERIFICACION_VACIO} vacíos)")
-
-                    objeto_en_proceso = False
-                    contador_detecciones = 0
-                    ultimo_objeto = None
-                    time.sleep(TIEMPO_ESPERA_ENTRE_MOVIMIENTOS)
-
-                except ValueError:
-                    logging.info(f"Error: Formato inválido en resultado: {resultado}")
-                    objeto_en_proceso = False
-                except Exception as e:
-                    logging.info(f"Error general: {str(e)}")
-                    objeto_en_proceso = False
+        reglas = TablaReglas(RUTA_LOGICA)
+        # Todos los movimientos compilados antes de arrancar: ninguno se lee de disco al recoger
+        biblioteca.precargar()
+        EjecucionClasificacion(clasificar, cap, banda, brazo, reglas, compuerta, zona_compuerta,
+                               consenso, seguimiento, consensos_pista,
+                               frames_limpieza, tiempo_max_limpieza).ejecutar()
 
     except Exception as e:
         logging.info(f"Error en ejecución principal: {str(e)}")
     finally:
         banda.desactivar()
         logging.info("Banda desactivada")
-        logging.info("Ejecución finalizada")
\ No newline at end of file
+        maquina.cambiar(INACTIVO)
+        logging.info("Ejecución finalizada")
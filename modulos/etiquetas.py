@@ -0,0 +1,74 @@
+# archivo: modulos/etiquetas.py
+from collections import namedtuple
+
+# Etiqueta de un modelo ya parseada:
+#   id     -> prefijo numérico de Teachable Machine ("0", "1", ...)
+#   nombre -> nombre de la clase ("circulo", "azul", ...)
+#   texto  -> línea original de labels.txt
+#   vacia  -> True si representa la clase "vacio" (no hay objeto)
+Etiqueta = namedtuple("Etiqueta", ["id", "nombre", "texto", "vacia"])
+
+
+def parsear_etiqueta(texto, tipo="forma"):
+    """
+    Separa una línea de labels.txt en (id, nombre) con las mismas reglas que usaba el
+    reconocimiento: las formas se separan por espacio ("0 circulo") y los colores por
+    "_" o espacio ("1_azul" / "1 azul").
+    """
+    texto = texto.strip()
+    if tipo == "color" and '_' in texto:
+        partes = texto.split('_', 1)
+    else:
+        partes = texto.split(' ', 1)
+    if len(partes) == 2:
+        id_, nombre = partes
+    elif tipo == "color":
+        id_, nombre = "0", "desconocido"
+    else:
+        id_, nombre = partes[0], "desconocido"
+    return Etiqueta(id_, nombre, texto, "vacio" in texto.lower())
+
+
+def clave_etiqueta(texto, tipo="forma"):
+    """Forma normalizada "id nombre" de una etiqueta, usada como clave de las reglas."""
+    etiqueta = parsear_etiqueta(texto, tipo)
+    return f"{etiqueta.id} {etiqueta.nombre}"
+
+
+class IndiceEtiquetas:
+    """
+    Etiquetas de un modelo parseadas una sola vez (al cargar los modelos), para que el
+    reconocimiento no tenga que partir cadenas en cada frame.
+
+    - `indice[i]` devuelve la Etiqueta de la salida i del modelo.
+    - `buscar_nombre(nombre)` encuentra la etiqueta por nombre (sin distinguir mayúsculas).
+    - `prefijo_por_nombre` mapea nombre -> id, p. ej. {"azul": "1"}.
+    """
+
+    def __init__(self, lineas, tipo="forma"):
+        self.tipo = tipo
+        self.etiquetas = [parsear_etiqueta(linea, tipo) for linea in lineas]
+        self._por_nombre = {}
+        for etiqueta in self.etiquetas:
+            # Si hay nombres repetidos se conserva el primero, como el recorrido lineal original
+            self._por_nombre.setdefault(etiqueta.nombre.lower(), etiqueta)
+        self.prefijo_por_nombre = {nombre: e.id for nombre, e in self._por_nombre.items()}
+
+    def __len__(self):
+        return len(self.etiquetas)
+
+    def __getitem__(self, indice):
+        return self.etiquetas[indice]
+
+    def __iter__(self):
+        return iter(self.etiquetas)
+
+    def buscar_nombre(self, nombre):
+        return self._por_nombre.get(nombre.lower())
+
+
+def asegurar_indice(etiquetas, tipo="forma"):
+    """Acepta un IndiceEtiquetas o una lista de textos (compatibilidad; se parsea en cada llamada)."""
+    if isinstance(etiquetas, IndiceEtiquetas):
+        return etiquetas
+    return IndiceEtiquetas(etiquetas or [], tipo)
@@ -0,0 +1,552 @@
+# archivo: modulos/inferencia.py
+import os
+import sys
+import time
+import queue
+import platform
+import weakref
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+
+# --- Selección del Backend de IA ---
+# La importación es perezosa: TensorFlow completo tarda varios segundos en cargarse en
+# Windows y no hace falta si todos los modelos usan OpenCV-DNN u ONNX Runtime.
+BACKEND_AUTO = "auto"
+BACKEND_TFLITE = "tflite"
+BACKEND_OPENCV = "opencv"
+BACKEND_ONNX = "onnxruntime"
+BACKENDS = (BACKEND_TFLITE, BACKEND_OPENCV, BACKEND_ONNX)
+
+_modulo_tflite = None
+_backend_tflite = None
+_tflite_buscado = False
+_lock_importacion = threading.Lock()
+
+
+def backend_tflite():
+    """Importa (una sola vez) tflite_runtime o TensorFlow y devuelve su nombre, o None."""
+    global _modulo_tflite, _backend_tflite, _tflite_buscado
+    with _lock_importacion:
+        if _tflite_buscado:
+            return _backend_tflite
+        _tflite_buscado = True
+        candidatos = ("tensorflow", "tflite_runtime") if platform.system() == "Windows" else ("tflite_runtime", "tensorflow")
+        for candidato in candidatos:
+            try:
+                if candidato == "tflite_runtime":
+                    import tflite_runtime.interpreter as tflite
+                    _modulo_tflite = tflite
+                else:
+                    import tensorflow as tf
+                    _modulo_tflite = tf.lite
+                _backend_tflite = candidato
+                break
+            except ImportError:
+                continue
+        if _backend_tflite is None:
+            print("ADVERTENCIA: No se encontró backend de TensorFlow/TFlite.", file=sys.stderr)
+        return _backend_tflite
+
+
+def backends_disponibles():
+    """Backends que se pueden usar en esta máquina (sin importar TensorFlow todavía)."""
+    disponibles = []
+    if importlib.util.find_spec("tflite_runtime") or importlib.util.find_spec("tensorflow"):
+        disponibles.append(BACKEND_TFLITE)
+    if hasattr(cv2, "dnn"):
+        disponibles.append(BACKEND_OPENCV)
+    if importlib.util.find_spec("onnxruntime"):
+        disponibles.append(BACKEND_ONNX)
+    return disponibles
+
+MODO_SECUENCIAL = "secuencial"
+MODO_PARALELO = "paralelo"
+
+# Nombres de exportación de Teachable Machine (TensorFlow Lite) y del modelo convertido a ONNX
+MODELO_FLOTANTE = "model_unquant.tflite"
+MODELO_CUANTIZADO = "model.tflite"
+MODELO_ONNX = "model.onnx"
+
+
+def buscar_modelo(carpeta, preferir_cuantizado=True, backend=BACKEND_TFLITE):
+    """
+    Ruta del modelo de `carpeta` para `backend`. Con TFLite, el cuantizado (int8/uint8,
+    varias veces más rápido en la Raspberry Pi) si existe y se prefiere, si no el
+    flotante; con OpenCV-DNN u ONNX Runtime, model.onnx. None si no hay ninguno.
+    """
+    if backend in (BACKEND_OPENCV, BACKEND_ONNX):
+        orden = (MODELO_ONNX,)
+    elif preferir_cuantizado:
+        orden = (MODELO_CUANTIZADO, MODELO_FLOTANTE)
+    else:
+        orden = (MODELO_FLOTANTE, MODELO_CUANTIZADO)
+    for nombre in orden:
+        ruta = os.path.join(carpeta, nombre)
+        if os.path.exists(ruta):
+            return ruta
+    return None
+
+
+def cargar_interprete(path, num_threads=None):
+    """
+    Crea y asigna un intérprete TFLite con el backend disponible.
+    `num_threads` limita los hilos internos de XNNPACK/TFLite (None = valor por defecto).
+    Lanza la excepción del backend si el modelo no se puede cargar.
+    """
+    if backend_tflite() is None:
+        return None
+    interpreter = _modulo_tflite.Interpreter(model_path=path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def crear_sesion(path, nombre="", backend=BACKEND_AUTO, num_threads=None):
+    """
+    Carga el modelo de `path` con el backend indicado y devuelve su sesión.
+    Con "auto" se decide por la extensión: .tflite -> TFLite; .onnx -> ONNX Runtime si
+    está instalado, si no OpenCV-DNN. Devuelve None si el backend no está disponible y
+    propaga la excepción si el modelo no se puede cargar.
+    """
+    if backend == BACKEND_AUTO:
+        if path.endswith(".tflite"):
+            backend = BACKEND_TFLITE
+        else:
+            backend = BACKEND_ONNX if importlib.util.find_spec("onnxruntime") else BACKEND_OPENCV
+    if backend == BACKEND_TFLITE:
+        interpreter = cargar_interprete(path, num_threads)
+        return SesionInferencia(interpreter, nombre) if interpreter is not None else None
+    if backend == BACKEND_OPENCV:
+        return SesionOpenCV(path, nombre, num_threads)
+    if backend == BACKEND_ONNX:
+        if not importlib.util.find_spec("onnxruntime"):
+            return None
+        return SesionOnnx(path, nombre, num_threads)
+    raise ValueError(f"Backend de inferencia desconocido: {backend}")
+
+
+class SesionBase:
+    """
+    Interfaz común de las sesiones de inferencia (TFLite, OpenCV-DNN, ONNX Runtime):
+    escribir_entrada + invocar (o predecir) con una imagen RGB uint8, métricas de
+    latencia y predecir_lote para varias imágenes.
+    """
+
+    backend = None
+    cuantizado = False
+
+    def __init__(self, nombre=""):
+        self.nombre = nombre
+        # Métricas de latencia (segundos)
+        self.reiniciar_metricas()
+
+    def _registrar_latencia(self, inicio, imagenes=1):
+        # Con lotes se registra la latencia por imagen para que las métricas sean comparables
+        self.ultima_latencia = (time.perf_counter() - inicio) / imagenes
+        self.invocaciones += imagenes
+        # Media móvil exponencial para que el valor reportado sea estable
+        if self.invocaciones == imagenes:
+            self.latencia_media = self.ultima_latencia
+        else:
+            self.latencia_media = 0.9 * self.latencia_media + 0.1 * self.ultima_latencia
+
+    def reiniciar_metricas(self):
+        self.ultima_latencia = 0.0
+        self.latencia_media = 0.0
+        self.invocaciones = 0
+
+    def predecir(self, imagen):
+        self.escribir_entrada(imagen)
+        return self.invocar()
+
+    def predecir_salidas(self, imagen):
+        """Vectores de todas las salidas del modelo (modelos multicabeza)."""
+        self.escribir_entrada(imagen)
+        return self.invocar_salidas()
+
+    def predecir_lote(self, imagenes):
+        """Salidas (N x clases) de varias imágenes; por defecto, una invocación por imagen."""
+        return np.stack([self.predecir(imagen).copy() for imagen in imagenes])
+
+    def estadisticas(self):
+        return {
+            "nombre": self.nombre,
+            "backend": self.backend,
+            "cuantizado": self.cuantizado,
+            "invocaciones": self.invocaciones,
+            "ultima_latencia_ms": round(self.ultima_latencia * 1000, 2),
+            "latencia_media_ms": round(self.latencia_media * 1000, 2),
+        }
+
+
+class SesionInferencia(SesionBase):
+    """
+    Envoltorio reutilizable sobre un intérprete TFLite ya asignado (allocate_tensors).
+
+    - Los índices, forma y tipo de los tensores se leen una sola vez.
+    - La entrada se escribe directamente sobre el buffer interno del intérprete
+      (sin expand_dims ni arrays float32 intermedios).
+    - Cada invocación registra su latencia para poder monitorizar el bucle.
+    - Modelos cuantizados (int8/uint8): la entrada se cuantiza con la escala y el punto
+      cero del tensor y la salida se decuantiza, así que quien llama siempre trabaja con
+      imágenes en [0, 1] y probabilidades float32 comparables con los umbrales.
+    """
+
+    backend = BACKEND_TFLITE
+
+    def __init__(self, interpreter, nombre=""):
+        super().__init__(nombre)
+        self.interpreter = interpreter
+
+        entrada = interpreter.get_input_details()[0]
+        salidas = interpreter.get_output_details()
+        salida = salidas[0]
+        self.indice_entrada = entrada['index']
+        self.indice_salida = salida['index']
+        self.forma_entrada = tuple(entrada['shape'])
+        self.tipo_entrada = np.dtype(entrada['dtype'])
+        self.tipo_salida = np.dtype(salida['dtype'])
+        self.cuantizado = self.tipo_entrada.kind in "iu"
+        escala_entrada, cero_entrada = entrada.get('quantization', (0.0, 0))
+        escala_salida, cero_salida = salida.get('quantization', (0.0, 0))
+        self._cuantizacion_entrada = (float(escala_entrada), int(cero_entrada))
+        self._cuantizacion_salida = (float(escala_salida), int(cero_salida))
+        # Todas las salidas (índice, tipo, cuantización) para los modelos multicabeza
+        self._salidas = [(d['index'], np.dtype(d['dtype']),
+                          tuple(d.get('quantization', (0.0, 0)))) for d in salidas]
+        # Píxel uint8 -> valor cuantizado: tabla de 256 entradas calculada una sola vez
+        self._tabla_entrada = None
+        if self.cuantizado:
+            self._tabla_entrada = self.cuantizar(np.arange(256, dtype=np.float32) / 255.0)
+        # interpreter.tensor() devuelve una función que entrega una vista del buffer interno.
+        # La vista no debe conservarse durante invoke(), por eso se pide en cada escritura.
+        self._vista_entrada = interpreter.tensor(self.indice_entrada)
+
+    @property
+    def tamano_entrada(self):
+        """(ancho, alto) esperado por el modelo, en el formato que usa cv2.resize."""
+        return (int(self.forma_entrada[2]), int(self.forma_entrada[1]))
+
+    def escribir_entrada(self, imagen):
+        """
+        Copia la imagen en el tensor de entrada del intérprete.
+
+        :param imagen: RGB uint8 (alto x ancho x 3), que se normaliza a [0, 1] en el
+                       propio buffer, o un tensor float ya normalizado (1 x alto x ancho x 3).
+        """
+        if imagen.dtype == np.uint8:
+            if imagen.shape[1::-1] != self.tamano_entrada:
+                imagen = cv2.resize(imagen, self.tamano_entrada)
+            buffer = self._vista_entrada()
+            if self.cuantizado:
+                np.take(self._tabla_entrada, imagen, out=buffer[0])
+            else:
+                np.divide(imagen, 255.0, out=buffer[0], dtype=np.float32, casting="unsafe")
+        else:
+            buffer = self._vista_entrada()
+            if self.cuantizado:
+                buffer[...] = self.cuantizar(imagen).reshape(buffer.shape)
+            else:
+                buffer[...] = imagen.reshape(buffer.shape)
+        del buffer
+
+    def cuantizar(self, valores):
+        """Valores reales (p. ej. píxeles en [0, 1]) -> tipo entero de la entrada del modelo."""
+        escala, cero = self._cuantizacion_entrada
+        if escala == 0:
+            # Sin parámetros de cuantización: se asume que el modelo espera píxeles 0-255
+            escala, cero = 1.0 / 255.0, 0
+        limites = np.iinfo(self.tipo_entrada)
+        q = np.round(np.asarray(valores, dtype=np.float32) / escala + cero)
+        return np.clip(q, limites.min, limites.max).astype(self.tipo_entrada)
+
+    def decuantizar(self, salida, tipo=None, cuantizacion=None):
+        """Salida entera del modelo -> float32 (probabilidades en [0, 1])."""
+        tipo = self.tipo_salida if tipo is None else tipo
+        if tipo.kind not in "iu":
+            return salida
+        escala, cero = self._cuantizacion_salida if cuantizacion is None else cuantizacion
+        if escala == 0:
+            escala, cero = 1.0 / np.iinfo(tipo).max, 0
+        return (salida.astype(np.float32) - cero) * escala
+
+    def invocar(self):
+        """Ejecuta el modelo y devuelve el vector de salida (copia) del primer tensor."""
+        inicio = time.perf_counter()
+        self.interpreter.invoke()
+        self._registrar_latencia(inicio)
+        return self.decuantizar(self.interpreter.get_tensor(self.indice_salida)[0])
+
+    def invocar_salidas(self):
+        inicio = time.perf_counter()
+        self.interpreter.invoke()
+        self._registrar_latencia(inicio)
+        return [self.decuantizar(self.interpreter.get_tensor(indice)[0], tipo, cuantizacion)
+                for indice, tipo, cuantizacion in self._salidas]
+
+
+class SesionOpenCV(SesionBase):
+    """
+    Modelo ONNX (o TensorFlow .pb) ejecutado con cv2.dnn, sin dependencias extra.
+
+    La disposición de la entrada (NCHW, la habitual de OpenCV, o NHWC, la de los
+    modelos Keras convertidos) se detecta al cargar con una inferencia de prueba, que
+    sirve también de calentamiento. predecir_lote envía todas las imágenes en un único
+    blob, que es como cv2.dnn aprovecha mejor los núcleos.
+    """
+
+    backend = BACKEND_OPENCV
+
+    def __init__(self, path, nombre="", num_threads=None, tamano=(224, 224)):
+        super().__init__(nombre)
+        self.net = cv2.dnn.readNet(path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        if num_threads:
+            # Afecta a todo OpenCV del proceso, igual que el resto de cv2
+            cv2.setNumThreads(num_threads)
+        self._tamano = tamano
+        self._blob = None
+        self.nhwc = False
+        prueba = np.zeros((tamano[1], tamano[0], 3), dtype=np.uint8)
+        try:
+            self.predecir(prueba)
+        except cv2.error:
+            self.nhwc = True
+            self.predecir(prueba)
+        self.reiniciar_metricas()
+
+    @property
+    def tamano_entrada(self):
+        return self._tamano
+
+    def _crear_blob(self, imagenes):
+        # Las imágenes ya vienen en RGB, por eso swapRB=False
+        blob = cv2.dnn.blobFromImages(imagenes, 1.0 / 255.0, self._tamano, swapRB=False)
+        return np.ascontiguousarray(blob.transpose(0, 2, 3, 1)) if self.nhwc else blob
+
+    def escribir_entrada(self, imagen):
+        if imagen.dtype == np.uint8:
+            self._blob = self._crear_blob([imagen])
+        else:
+            # Tensor float ya normalizado (1 x alto x ancho x 3)
+            blob = imagen.reshape(1, self._tamano[1], self._tamano[0], 3).astype(np.float32)
+            self._blob = blob if self.nhwc else np.ascontiguousarray(blob.transpose(0, 3, 1, 2))
+
+    def invocar(self):
+        inicio = time.perf_counter()
+        self.net.setInput(self._blob)
+        salida = self.net.forward()
+        self._registrar_latencia(inicio)
+        return salida.reshape(salida.shape[0], -1)[0]
+
+    def invocar_salidas(self):
+        inicio = time.perf_counter()
+        self.net.setInput(self._blob)
+        salidas = self.net.forward(self.net.getUnconnectedOutLayersNames())
+        self._registrar_latencia(inicio)
+        return [salida.reshape(salida.shape[0], -1)[0] for salida in salidas]
+
+    def predecir_lote(self, imagenes):
+        inicio = time.perf_counter()
+        self.net.setInput(self._crear_blob(list(imagenes)))
+        salida = self.net.forward()
+        self._registrar_latencia(inicio, len(imagenes))
+        return salida.reshape(salida.shape[0], -1)
+
+
+class SesionOnnx(SesionBase):
+    """Modelo ONNX ejecutado con ONNX Runtime (CPU), importado solo si se usa."""
+
+    backend = BACKEND_ONNX
+
+    def __init__(self, path, nombre="", num_threads=None):
+        super().__init__(nombre)
+        import onnxruntime
+        opciones = onnxruntime.SessionOptions()
+        if num_threads:
+            opciones.intra_op_num_threads = num_threads
+        self.sesion = onnxruntime.InferenceSession(path, opciones, providers=["CPUExecutionProvider"])
+        entrada = self.sesion.get_inputs()[0]
+        self._nombre_entrada = entrada.name
+        forma = entrada.shape
+        # Dimensiones simbólicas (lote variable) aparecen como texto o None
+        self.nhwc = forma[-1] == 3
+        alto, ancho = (forma[1], forma[2]) if self.nhwc else (forma[2], forma[3])
+        self._tamano = (ancho if isinstance(ancho, int) else 224, alto if isinstance(alto, int) else 224)
+        self._lote_variable = not isinstance(forma[0], int)
+        self._entrada = np.empty((1, self._tamano[1], self._tamano[0], 3), dtype=np.float32)
+
+    @property
+    def tamano_entrada(self):
+        return self._tamano
+
+    def _normalizar(self, imagen, destino):
+        if imagen.dtype == np.uint8:
+            if imagen.shape[1::-1] != self._tamano:
+                imagen = cv2.resize(imagen, self._tamano)
+            np.divide(imagen, 255.0, out=destino, dtype=np.float32, casting="unsafe")
+        else:
+            destino[...] = imagen.reshape(destino.shape)
+
+    def _tensor(self, entradas):
+        return entradas if self.nhwc else np.ascontiguousarray(entradas.transpose(0, 3, 1, 2))
+
+    def escribir_entrada(self, imagen):
+        self._normalizar(imagen, self._entrada[0])
+
+    def invocar(self):
+        inicio = time.perf_counter()
+        salida = self.sesion.run(None, {self._nombre_entrada: self._tensor(self._entrada)})[0]
+        self._registrar_latencia(inicio)
+        return salida.reshape(salida.shape[0], -1)[0]
+
+    def invocar_salidas(self):
+        inicio = time.perf_counter()
+        salidas = self.sesion.run(None, {self._nombre_entrada: self._tensor(self._entrada)})
+        self._registrar_latencia(inicio)
+        return [salida.reshape(salida.shape[0], -1)[0] for salida in salidas]
+
+    def predecir_lote(self, imagenes):
+        if not self._lote_variable:
+            return super().predecir_lote(imagenes)
+        entradas = np.empty((len(imagenes), self._tamano[1], self._tamano[0], 3), dtype=np.float32)
+        for destino, imagen in zip(entradas, imagenes):
+            self._normalizar(imagen, destino)
+        inicio = time.perf_counter()
+        salida = self.sesion.run(None, {self._nombre_entrada: self._tensor(entradas)})[0]
+        self._registrar_latencia(inicio, len(imagenes))
+        return salida.reshape(salida.shape[0], -1)
+
+
+class SesionCombinada:
+    """
+    Modelo multicabeza que da forma y color en una sola invocación (un único backbone
+    en memoria). Admite dos salidas (una por cabeza) o una sola salida con los dos
+    vectores concatenados [forma..., color...].
+
+    Qué salida es cada cabeza se decide al crearla con una inferencia de prueba, que
+    sirve también de calentamiento: por número de clases y, si coinciden, por orden.
+    """
+
+    def __init__(self, sesion, clases_forma, clases_color):
+        self.sesion = sesion
+        self.nombre = sesion.nombre
+        self.clases_forma = clases_forma
+        self.clases_color = clases_color
+        ancho, alto = sesion.tamano_entrada
+        salidas = sesion.predecir_salidas(np.zeros((alto, ancho, 3), dtype=np.uint8))
+        sesion.reiniciar_metricas()
+        tamanos = [len(s) for s in salidas]
+        if len(salidas) == 1 and tamanos[0] == clases_forma + clases_color:
+            self._indices = None
+        elif len(salidas) == 2 and sorted(tamanos) == sorted([clases_forma, clases_color]):
+            forma = tamanos.index(clases_forma)
+            self._indices = (forma, 1 - forma)
+        else:
+            raise ValueError(f"Las salidas del modelo {tamanos} no encajan con {clases_forma} "
+                             f"formas y {clases_color} colores")
+
+    @property
+    def tamano_entrada(self):
+        return self.sesion.tamano_entrada
+
+    def predecir(self, imagen):
+        """Devuelve (salida_forma, salida_color) de una única invocación."""
+        salidas = self.sesion.predecir_salidas(imagen)
+        if self._indices is None:
+            return salidas[0][:self.clases_forma], salidas[0][self.clases_forma:]
+        return salidas[self._indices[0]], salidas[self._indices[1]]
+
+    def reiniciar_metricas(self):
+        self.sesion.reiniciar_metricas()
+
+    def estadisticas(self):
+        return {**self.sesion.estadisticas(), "combinado": True}
+
+
+# Sesiones creadas al vuelo para intérpretes "sueltos" (compatibilidad con llamadas antiguas)
+_sesiones_implicitas = weakref.WeakKeyDictionary()
+
+def obtener_sesion(modelo):
+    """Devuelve una SesionInferencia para `modelo`, que puede ser ya una sesión o un intérprete."""
+    if modelo is None or isinstance(modelo, SesionBase):
+        return modelo
+    sesion = _sesiones_implicitas.get(modelo)
+    if sesion is None:
+        sesion = SesionInferencia(modelo)
+        _sesiones_implicitas[modelo] = sesion
+    return sesion
+
+
+class EjecutorInferencia:
+    """
+    Ejecuta el par de modelos forma/color sobre la misma imagen.
+
+    En modo "paralelo" el modelo de color se invoca en un hilo auxiliar mientras el de
+    forma corre en el hilo llamador; TFLite libera el GIL durante invoke(), así que en
+    la Raspberry Pi (4 núcleos) ambas inferencias se solapan. Cada sesión escribe en su
+    propio buffer de entrada, por lo que la imagen compartida solo se lee.
+    """
+
+    def __init__(self, modo=MODO_PARALELO):
+        self.modo = modo
+        self._hilo_color = None
+        if modo == MODO_PARALELO:
+            self._hilo_color = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inferencia-color")
+
+    @property
+    def paralelo(self):
+        return self._hilo_color is not None
+
+    def predecir_par(self, sesion_forma, sesion_color, imagen):
+        """Devuelve (salida_forma, salida_color) para la misma imagen."""
+        if not self.paralelo:
+            return sesion_forma.predecir(imagen), sesion_color.predecir(imagen)
+        futuro_color = self._hilo_color.submit(sesion_color.predecir, imagen)
+        salida_forma = sesion_forma.predecir(imagen)
+        return salida_forma, futuro_color.result()
+
+    def cerrar(self):
+        if self._hilo_color:
+            self._hilo_color.shutdown(wait=False)
+            self._hilo_color = None
+
+
+class PoolInferencia:
+    """
+    Pool de pares de intérpretes para tener varias inferencias en vuelo a la vez.
+    La ejecución lo usa para clasificar a la vez las regiones de un frame (varias
+    zonas de interés o varias pistas en modo multiobjeto).
+
+    `fabrica` es un callable que devuelve un nuevo par (sesion_forma, sesion_color);
+    cada par se usa por un único hilo a la vez. `enviar()` devuelve un Future, de modo
+    que el productor puede seguir leyendo frames mientras los anteriores se clasifican.
+    """
+
+    def __init__(self, fabrica, tamano=2):
+        self.tamano = tamano
+        self.pares = [fabrica() for _ in range(tamano)]
+        self._libres = queue.Queue()
+        for par in self.pares:
+            self._libres.put(par)
+        self._hilos = ThreadPoolExecutor(max_workers=tamano, thread_name_prefix="pool-inferencia")
+
+    def enviar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta `funcion(sesion_forma, sesion_color, *args, **kwargs)` con un par libre
+        del pool y devuelve el Future correspondiente.
+        """
+        return self._hilos.submit(self._ejecutar, funcion, args, kwargs)
+
+    def _ejecutar(self, funcion, args, kwargs):
+        par = self._libres.get()
+        try:
+            return funcion(par[0], par[1], *args, **kwargs)
+        finally:
+            self._libres.put(par)
+
+    def cerrar(self):
+        self._hilos.shutdown(wait=True)
@@ -0,0 +1,89 @@
+# archivo: modulos/jog.py
+import time
+import logging
+import threading
+
+INTERVALO_JOG = 0.05    # Mínimo entre dos comandos de jog al brazo (20 Hz; un "A,..." tarda ~26 ms a 9600 baudios)
+ESPERA_INACTIVO = 5.0   # El hilo termina tras este tiempo sin peticiones y se relanza con la siguiente
+
+
+class ControlJog:
+    """
+    Jog manual con frecuencia limitada y "gana el último valor" por servo.
+
+    Los clientes piden ángulos sueltos (`pedir({servo: ángulo})`) tan rápido como se
+    mueva el slider. Las peticiones se fusionan por servo y un hilo envía como mucho
+    un comando global cada `intervalo`, con la posición más reciente de cada uno:
+    el brazo sigue al último valor del slider en lugar de a una cola de valores viejos.
+    """
+
+    def __init__(self, brazo, intervalo=INTERVALO_JOG):
+        self.brazo = brazo
+        self.intervalo = intervalo
+        self.al_enviar = None   # callable(servos [6], velocidad) tras cada envío (p. ej. avisar a otros clientes)
+        self._condicion = threading.Condition()
+        self._objetivo = {}     # servo -> último ángulo pedido y aún no enviado
+        self._velocidad = None
+        self._hilo = None
+        self._ultimo_envio = 0.0
+        self.recibidos = 0
+        self.enviados = 0
+
+    def pedir(self, angulos, velocidad=None):
+        """
+        Registra una petición de jog. Devuelve False si algún servo o ángulo no es válido.
+
+        :param angulos: dict {servo 1..6: ángulo 0..180}
+        :param velocidad: 1..100, o None para mantener la última
+        """
+        try:
+            angulos = {int(servo): float(angulo) for servo, angulo in angulos.items()}
+        except (TypeError, ValueError):
+            return False
+        if not angulos or any(s not in range(1, 7) or not 0 <= a <= 180 for s, a in angulos.items()):
+            return False
+        with self._condicion:
+            self._objetivo.update({s: int(a) if a.is_integer() else a for s, a in angulos.items()})
+            if velocidad is not None:
+                self._velocidad = velocidad
+            self.recibidos += 1
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="jog", daemon=True)
+                self._hilo.start()
+            self._condicion.notify_all()
+        return True
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                if not self._objetivo:
+                    self._condicion.wait(ESPERA_INACTIVO)
+                    if not self._objetivo:
+                        self._hilo = None
+                        return
+                espera = self._ultimo_envio + self.intervalo - time.time()
+                if espera > 0:
+                    # Mientras tanto siguen llegando valores que sustituyen a los pendientes
+                    self._condicion.wait(espera)
+                    continue
+                cambios, self._objetivo = self._objetivo, {}
+                velocidad = self._velocidad or self.brazo.velocidad_actual
+                self._ultimo_envio = time.time()
+            try:
+                destino = dict(self.brazo.angulos_servos)
+                destino.update(cambios)
+                if self.brazo.mover_servos(destino, velocidad, fusionable=True):
+                    self.enviados += 1
+                    if self.al_enviar:
+                        self.al_enviar([destino[i] for i in range(1, 7)], velocidad)
+            except Exception as e:
+                logging.info(f"Error en jog: {e}")
+
+    def estadisticas(self):
+        with self._condicion:
+            return {
+                "recibidos": self.recibidos,
+                "enviados": self.enviados,
+                "pendientes": len(self._objetivo),
+                "intervalo_s": self.intervalo,
+            }
@@ -0,0 +1,132 @@
+# archivo: modulos/lector_serie.py
+import time
+import logging
+import threading
+from collections import deque
+
+# Respuestas del firmware (Servo_Motor.ino)
+ACK_GLOBAL = "OK: MOVIMIENTO GLOBAL"
+ACK_SERVO = "OK: SERVO"
+FIN_MOVIMIENTO = "FIN: MOVIMIENTO"   # Todos los perfiles de movimiento han terminado
+PREFIJO_MOTOR = "MOTOR:"
+SISTEMA_LISTO = "SISTEMA LISTO"
+
+TIMEOUT_ACK = 0.5          # Segundos para que el firmware confirme la recepción de un comando
+LINEAS_RECIENTES = 50      # Últimas líneas recibidas que se guardan para diagnóstico
+
+
+class LectorSerie:
+    """
+    Hilo que lee las respuestas del Arduino y las convierte en eventos.
+
+    Hasta ahora nadie leía el puerto: las respuestas se acumulaban en el buffer y el
+    final de cada movimiento se estimaba con un sleep. Con el lector, procesar_movimiento
+    espera a `FIN: MOVIMIENTO` del firmware. Si el firmware es anterior y nunca lo envía,
+    `sin_fin` pasa a True tras la primera espera agotada y se vuelve a los tiempos estimados.
+    """
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._activo = False
+        self.acks = 0
+        self.fines = 0
+        self._fines_en_ack = 0   # Valor de `fines` cuando llegó el último ack
+        self.fin_visto = False
+        self.sin_fin = False
+        self.ultimo_motor = None
+        self.lineas = deque(maxlen=LINEAS_RECIENTES)
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._activo = True
+            self._hilo = threading.Thread(target=self._bucle_lectura, name="lector-serie", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._activo = False
+        if self._hilo and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=2.0)
+        self._hilo = None
+
+    def _bucle_lectura(self):
+        while self._activo:
+            try:
+                if not self.conexion.is_open:
+                    break
+                linea = self.conexion.readline()
+            except Exception as e:
+                logging.info(f"Error leyendo el puerto serie: {e}")
+                break
+            if linea:
+                self._procesar(linea.decode("utf-8", errors="replace").strip())
+        self._activo = False
+        with self._condicion:
+            self._condicion.notify_all()
+
+    def _procesar(self, linea):
+        if not linea:
+            return
+        with self._condicion:
+            self.lineas.append((time.time(), linea))
+            if linea == ACK_GLOBAL or linea.startswith(ACK_SERVO):
+                self.acks += 1
+                self._fines_en_ack = self.fines
+            elif linea == FIN_MOVIMIENTO:
+                self.fines += 1
+                self.fin_visto = True
+                self.sin_fin = False
+            elif linea.startswith(PREFIJO_MOTOR):
+                self.ultimo_motor = linea[len(PREFIJO_MOTOR):].strip()
+            elif linea == SISTEMA_LISTO:
+                logging.info("Arduino: sistema listo")
+            self._condicion.notify_all()
+
+    def marca(self):
+        """Estado de los contadores justo antes de enviar un comando de movimiento."""
+        with self._condicion:
+            return self.acks, self.fines
+
+    def esperar_fin(self, marca, timeout, parada=None):
+        """
+        Espera al final del movimiento enviado tras `marca`: primero su ack y después
+        un FIN posterior a ese ack. Devuelve True si terminó, False si se agotó el
+        tiempo y None si se activó `parada`.
+        """
+        limite = time.time() + timeout
+        acks, fines = marca
+        with self._condicion:
+            # El FIN que cuenta es el posterior al ack de este comando
+            limite_ack = min(limite, time.time() + TIMEOUT_ACK)
+            while self.acks <= acks and self._activo and time.time() < limite_ack:
+                if parada is not None and parada.is_set():
+                    return None
+                self._condicion.wait(0.05)
+            base = self._fines_en_ack if self.acks > acks else fines
+            while self.fines <= base:
+                if parada is not None and parada.is_set():
+                    return None
+                restante = limite - time.time()
+                if restante <= 0 or not self._activo:
+                    if not self.fin_visto and not self.sin_fin:
+                        self.sin_fin = True
+                        logging.info("Advertencia: el firmware no envía FIN: MOVIMIENTO; se usan tiempos estimados")
+                    return False
+                self._condicion.wait(min(restante, 0.05))
+            return True
+
+    @property
+    def activo(self):
+        return self._activo
+
+    def estadisticas(self):
+        with self._condicion:
+            return {
+                "activo": self._activo,
+                "acks": self.acks,
+                "fines": self.fines,
+                "fin_soportado": self.fin_visto,
+                "motor": self.ultimo_motor,
+                "ultimas_lineas": [l for _, l in list(self.lineas)[-10:]],
+            }
@@ -0,0 +1,89 @@
+# archivo: modulos/maquina_estados.py
+import time
+import logging
+import threading
+
+# Estados de la ejecución (los nombres son los que se ven en /estado_ejecucion)
+INACTIVO = "IDLE"            # Sin ejecución en curso
+DETECTANDO = "DETECTING"     # Banda en marcha, sin candidato
+CONFIRMANDO = "CONFIRMING"   # Hay un candidato acumulando votos de consenso
+RECOGIENDO = "PICKING"       # El brazo está recogiendo (o esperando el instante de recogida al vuelo)
+LIMPIANDO = "CLEARING"       # Banda en marcha para despejar la zona tras una recogida con parada
+VERIFICANDO = "VERIFYING"    # La visión comprueba que la zona quedó vacía
+
+ESTADOS = (INACTIVO, DETECTANDO, CONFIRMANDO, RECOGIENDO, LIMPIANDO, VERIFICANDO)
+
+
+class MaquinaEstados:
+    """
+    Estado compartido por los hilos de visión y de movimiento de la ejecución.
+
+    - `cambiar(nuevo, desde=...)` es un compare-and-set: cada hilo solo avanza el
+      estado si sigue siendo el que esperaba, sin carreras entre ambos.
+    - `esperar(segundos)` sustituye a time.sleep: vuelve en cuanto se pide la
+      detención, así detener_ejecucion tiene efecto inmediato.
+    - Se acumula el tiempo pasado en cada estado para ver dónde se va el ciclo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parada = threading.Event()
+        self._estado = INACTIVO
+        self._desde = time.time()
+        self.tiempos = {estado: 0.0 for estado in ESTADOS}
+        self.entradas = {estado: 0 for estado in ESTADOS}
+
+    @property
+    def estado(self):
+        return self._estado
+
+    @property
+    def detenida(self):
+        return self.parada.is_set()
+
+    def cambiar(self, nuevo, desde=None):
+        """
+        Pasa a `nuevo`. Con `desde` (estado o tupla de estados) solo cambia si el actual
+        es uno de ellos. Devuelve True si el estado cambió o ya era `nuevo`.
+        """
+        if isinstance(desde, str):
+            desde = (desde,)
+        with self._lock:
+            if self._estado == nuevo:
+                return True
+            if desde is not None and self._estado not in desde:
+                return False
+            ahora = time.time()
+            self.tiempos[self._estado] += ahora - self._desde
+            self._estado, self._desde = nuevo, ahora
+            self.entradas[nuevo] += 1
+        logging.debug(f"Estado de ejecución: {nuevo}")
+        return True
+
+    def esperar(self, segundos):
+        """Espera cancelable. Devuelve False si se pidió la detención."""
+        return not self.parada.wait(max(segundos, 0))
+
+    def iniciar(self):
+        """Prepara una ejecución nueva: limpia la detención y las métricas."""
+        with self._lock:
+            self.parada.clear()
+            self.tiempos = {estado: 0.0 for estado in ESTADOS}
+            self.entradas = {estado: 0 for estado in ESTADOS}
+            self._desde = time.time()
+        self.cambiar(DETECTANDO)
+
+    def detener(self):
+        self.parada.set()
+
+    def estadisticas(self):
+        with self._lock:
+            ahora = time.time()
+            tiempos = dict(self.tiempos)
+            tiempos[self._estado] += ahora - self._desde
+            return {
+                "estado": self._estado,
+                "en_estado_s": round(ahora - self._desde, 2),
+                "tiempos_s": {estado: round(t, 2) for estado, t in tiempos.items()},
+                "entradas": dict(self.entradas),
+            }
@@ -0,0 +1,165 @@
+# archivo: modulos/modelos.py
+import time
+import logging
+import threading
+import numpy as np
+
+from .etiquetas import IndiceEtiquetas
+
+
+class ConjuntoModelos:
+    """
+    Instantánea inmutable de los modelos en uso: sesiones, etiquetas e índices de una
+    misma versión. Quien la lee al empezar un frame tiene forma, color y etiquetas
+    coherentes entre sí aunque en ese momento se esté publicando una versión nueva.
+    """
+
+    def __init__(self, version=0, sesion_forma=None, sesion_color=None,
+                 etiquetas_forma=None, etiquetas_color=None, rutas=(None, None),
+                 ruta_combinada=None, pool=None):
+        self.version = version
+        self.sesion_forma = sesion_forma
+        self.sesion_color = sesion_color
+        self.etiquetas_forma = list(etiquetas_forma or [])
+        self.etiquetas_color = list(etiquetas_color or [])
+        self.indice_forma = IndiceEtiquetas(self.etiquetas_forma, "forma")
+        self.indice_color = IndiceEtiquetas(self.etiquetas_color, "color")
+        self.rutas = rutas
+        self.ruta_combinada = ruta_combinada
+        self.pool = pool   # PoolInferencia de esta versión, o None
+        self.cargado_en = time.time()
+
+    @property
+    def listo(self):
+        return self.sesion_forma is not None and self.sesion_color is not None
+
+    @property
+    def combinado(self):
+        return self.ruta_combinada is not None
+
+    def sesiones(self):
+        """Sesiones distintas del conjunto y de su pool (el modelo combinado ocupa los dos puestos)."""
+        pares = [(self.sesion_forma, self.sesion_color)] + (self.pool.pares if self.pool else [])
+        sesiones = []
+        for par in pares:
+            sesiones += [s for s in dict.fromkeys(par) if s]
+        return sesiones
+
+    def resumen(self):
+        return {
+            "version": self.version,
+            "listo": self.listo,
+            "combinado": self.combinado,
+            "tamano_pool": self.pool.tamano if self.pool else 1,
+            "rutas": [r for r in ((self.ruta_combinada,) if self.combinado else self.rutas) if r],
+            "formas": self.etiquetas_forma,
+            "colores": self.etiquetas_color,
+            "cargado_en": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.cargado_en)),
+        }
+
+
+def calentar(conjunto):
+    """
+    Inferencia de prueba con una imagen negra en cada sesión: la primera invocación
+    reserva memoria y prepara los kernels, y no debe pagarla el primer objeto real.
+    """
+    for sesion in conjunto.sesiones():
+        ancho, alto = sesion.tamano_entrada
+        sesion.predecir(np.zeros((alto, ancho, 3), dtype=np.uint8))
+        sesion.reiniciar_metricas()
+
+
+class GestorModelos:
+    """
+    Carga los modelos en un hilo de fondo y los publica de forma atómica.
+
+    - `actual` es siempre un ConjuntoModelos completo: los lectores nunca esperan ni
+      ven una carga a medias. El bucle de ejecución lo lee una vez por frame, así que
+      el cambio de versión ocurre entre dos frames.
+    - `solicitar_carga()` no bloquea; varias peticiones durante una carga se agrupan
+      en una sola recarga posterior.
+    - Cada conjunto nuevo se calienta antes de publicarse. Si la carga falla se
+      conserva la versión anterior.
+    """
+
+    def __init__(self, construir):
+        """
+        :param construir: callable(version) -> ConjuntoModelos que hace la carga real.
+        """
+        self._construir = construir
+        self._lock = threading.Lock()
+        self._terminado = threading.Condition(self._lock)
+        self._hilo = None
+        self._pendiente = False
+        self._versiones = 0
+        self.actual = ConjuntoModelos()
+        self.ultimo_error = None
+        self.ultima_duracion = 0.0
+
+    @property
+    def cargando(self):
+        return self._hilo is not None
+
+    def solicitar_carga(self):
+        """Programa una (re)carga en segundo plano y devuelve inmediatamente."""
+        with self._lock:
+            self._pendiente = True
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._trabajar, name="carga-modelos", daemon=True)
+                self._hilo.start()
+
+    def asegurar_carga(self):
+        """Pide la primera carga si todavía no hay nada cargado ni en curso."""
+        if self.actual.version == 0 and not self.cargando:
+            self.solicitar_carga()
+
+    def esperar(self, timeout=None):
+        """Bloquea hasta que no quede ninguna carga pendiente (solo para arranque o scripts)."""
+        limite = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while self._hilo is not None:
+                restante = None if limite is None else limite - time.time()
+                if restante is not None and restante <= 0:
+                    return False
+                self._terminado.wait(restante)
+        return True
+
+    def _trabajar(self):
+        while True:
+            with self._lock:
+                if not self._pendiente:
+                    self._hilo = None
+                    self._terminado.notify_all()
+                    return
+                self._pendiente = False
+                self._versiones += 1
+                version = self._versiones
+            self._cargar_version(version)
+
+    def _cargar_version(self, version):
+        inicio = time.time()
+        try:
+            conjunto = self._construir(version)
+            if conjunto.listo:
+                calentar(conjunto)
+        except Exception as e:
+            self.ultimo_error = str(e)
+            logging.error(f"Error cargando modelos (versión {version}): {e}")
+            return
+        self.ultima_duracion = time.time() - inicio
+        if conjunto.listo or not self.actual.listo:
+            # Publicación atómica: una única asignación de referencia
+            self.actual = conjunto
+            self.ultimo_error = None if conjunto.listo else "Modelos no disponibles"
+            logging.info(f"Modelos versión {version} publicados ({self.ultima_duracion:.1f} s)")
+        else:
+            self.ultimo_error = "La nueva versión no se pudo cargar; se mantiene la anterior"
+            logging.warning(f"Modelos versión {version} incompletos; se mantiene la versión {self.actual.version}")
+
+    def estado(self):
+        return {
+            **self.actual.resumen(),
+            "cargando": self.cargando,
+            "ultimo_error": self.ultimo_error,
+            "ultima_duracion_s": round(self.ultima_duracion, 2),
+        }
@@ -0,0 +1,144 @@
+# archivo: modulos/movimientos.py
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+
+from .perfil_movimiento import predecir, perfil, a_fisico, a_logico
+
+INTERVALO_REVISION = 1.0  # Segundos mínimos entre comprobaciones de mtime de un mismo archivo
+
+
+class Movimiento:
+    """
+    Movimiento grabado ya compilado: una fila de `angulos` (N x 6) y una `velocidades`
+    por línea válida del .txt. La duración y la velocidad de pico de cada paso salen
+    del perfil del firmware (perfil_movimiento.py) y se calculan una vez al cargar;
+    solo el primer paso depende de dónde esté el brazo al empezar.
+    """
+
+    __slots__ = ("nombre", "angulos", "velocidades", "mtime", "_duraciones", "_picos")
+
+    def __init__(self, nombre, angulos, velocidades, mtime=0.0):
+        self.nombre = nombre
+        self.angulos = angulos
+        self.velocidades = velocidades
+        self.mtime = mtime
+        if len(angulos) > 1:
+            duraciones, picos = perfil(a_fisico(angulos[:-1]), a_fisico(angulos[1:]), velocidades[1:])
+            self._duraciones, self._picos = duraciones.max(axis=1), a_logico(picos)
+        else:
+            self._duraciones, self._picos = np.zeros(0), np.zeros((0, 6), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.angulos)
+
+    def prediccion(self, angulos_actuales):
+        """(duración de cada paso en s, velocidad de pico por servo) partiendo de `angulos_actuales` ({1..6: ángulo})."""
+        if not len(self.angulos):
+            return self._duraciones, self._picos
+        actual = [angulos_actuales.get(i + 1, 0) for i in range(6)]
+        duracion, pico = predecir(actual, self.angulos[:1], self.velocidades[:1])
+        return np.concatenate([duracion, self._duraciones]), np.concatenate([pico, self._picos])
+
+    def tiempos(self, angulos_actuales):
+        """Duración exacta de cada paso partiendo de `angulos_actuales` ({1..6: ángulo})."""
+        return self.prediccion(angulos_actuales)[0]
+
+    def pasos(self):
+        """(ángulos {1..6: valor}, velocidad) por paso, con tipos nativos para el comando serie."""
+        filas, velocidades = self.angulos.tolist(), self.velocidades.tolist()
+        if self.angulos.dtype.kind == "f":
+            # Como en el .txt: los valores enteros se envían sin decimales
+            filas = [[int(a) if a.is_integer() else a for a in fila] for fila in filas]
+        if self.velocidades.dtype.kind == "f":
+            velocidades = [int(v) if v.is_integer() else v for v in velocidades]
+        for fila, velocidad in zip(filas, velocidades):
+            yield {i + 1: angulo for i, angulo in enumerate(fila)}, velocidad
+
+
+def _tipo_compacto(valores):
+    """int16 si todos los valores son enteros (lo habitual), float32 si no."""
+    return np.int16 if all(float(v).is_integer() for v in valores) else np.float32
+
+
+def compilar_movimiento(ruta):
+    """Lee un .txt de movimiento (una línea JSON por posición) y lo compila."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        lineas = [l.strip() for l in f if l.strip()]
+
+    angulos, velocidades = [], []
+    for num_linea, linea in enumerate(lineas, 1):
+        try:
+            datos = json.loads(linea)
+            servos = datos['servos']
+            if len(servos) != 6:
+                logging.info(f"Error en línea {num_linea} de {os.path.basename(ruta)}: Formato incorrecto")
+                continue
+            angulos.append([float(s) for s in servos])
+            velocidades.append(float(datos['velocidad']))
+        except Exception as e:
+            logging.info(f"Error en línea {num_linea} de {os.path.basename(ruta)}: {str(e)}")
+
+    planos = [a for fila in angulos for a in fila]
+    return Movimiento(
+        os.path.splitext(os.path.basename(ruta))[0],
+        np.array(angulos, dtype=_tipo_compacto(planos)).reshape(-1, 6),
+        np.array(velocidades, dtype=_tipo_compacto(velocidades)),
+        os.path.getmtime(ruta),
+    )
+
+
+class BibliotecaMovimientos:
+    """
+    Caché de movimientos compilados, invalidada por mtime.
+
+    Cada archivo se comprueba como mucho una vez cada `intervalo` segundos, así que
+    durante la ejecución empezar un movimiento no cuesta E/S salvo que se haya editado.
+    """
+
+    def __init__(self, carpeta, intervalo=INTERVALO_REVISION):
+        self.carpeta = carpeta
+        self.intervalo = intervalo
+        self._cache = {}  # ruta -> (Movimiento, instante de la última comprobación)
+        self._lock = threading.Lock()
+        self.recargas = 0
+
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta, f"{nombre}.txt")
+
+    def obtener(self, ruta):
+        """Movimiento compilado de `ruta`, o None si el archivo no existe."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._cache.get(ruta)
+            if entrada is not None and ahora - entrada[1] < self.intervalo:
+                return entrada[0]
+        try:
+            mtime = os.path.getmtime(ruta)
+        except OSError:
+            with self._lock:
+                self._cache.pop(ruta, None)
+            return None
+        if entrada is not None and entrada[0].mtime == mtime:
+            movimiento = entrada[0]
+        else:
+            movimiento = compilar_movimiento(ruta)
+            self.recargas += 1
+        with self._lock:
+            self._cache[ruta] = (movimiento, ahora)
+        return movimiento
+
+    def obtener_nombre(self, nombre):
+        return self.obtener(self.ruta(nombre))
+
+    def precargar(self):
+        """Compila todos los movimientos de la carpeta (al empezar la ejecución)."""
+        if not os.path.isdir(self.carpeta):
+            return 0
+        nombres = [f for f in os.listdir(self.carpeta) if f.endswith(".txt")]
+        for nombre in nombres:
+            self.obtener(os.path.join(self.carpeta, nombre))
+        return len(nombres)
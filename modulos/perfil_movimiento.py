@@ -0,0 +1,89 @@
+# archivo: modulos/perfil_movimiento.py
+import numpy as np
+
+# Réplica de iniciarMovimiento() de Servo_Motor.ino. Los valores deben coincidir con el firmware.
+VEL_MAX_SERVO = np.array([375.0, 460.0, 400.0, 400.0, 375.0, 375.0], dtype=np.float32)  # deg/s
+ACEL_MAX_SERVO = np.array([300.0, 300.0, 300.0, 300.0, 300.0, 300.0], dtype=np.float32)  # deg/s²
+SERVOS_VELOCIDAD_COMPLETA = (2, 3)  # Índices físicos que el firmware mueve siempre a velocidad 100
+DURACION_MINIMA_MS = 100
+# Servo lógico (1..6) que recibe cada servo físico en el comando "A,..." (BrazoRobotico.controlling_logical)
+LOGICO_POR_FISICO = (1, 2, 4, 3, 5, 6)
+# Tiempo de envío de un comando "A,..." a 9600 baudios más una vuelta del loop del Arduino
+LATENCIA_COMANDO = 0.05
+
+
+def velocidad_firmware(velocidad):
+    """Velocidad tal como la interpreta el firmware: atoi() y luego constrain(1, 100)."""
+    return np.clip(np.trunc(np.asarray(velocidad, dtype=np.float32)), 1, 100).astype(np.float32)
+
+
+def a_fisico(angulos_logicos):
+    """Reordena ángulos lógicos (..., 6) al orden físico del firmware y los limita a [0, 180]."""
+    angulos = np.asarray(angulos_logicos, dtype=np.float32)
+    return np.clip(angulos[..., [l - 1 for l in LOGICO_POR_FISICO]], 0.0, 180.0)
+
+
+def a_logico(valores_fisicos):
+    """Inverso de a_fisico para resultados por servo (..., 6)."""
+    valores = np.asarray(valores_fisicos)
+    orden = np.argsort(LOGICO_POR_FISICO)
+    return valores[..., orden]
+
+
+def perfil(origen, destino, velocidad):
+    """
+    Duración y velocidad de pico de cada servo, igual que iniciarMovimiento().
+
+    :param origen: ángulos físicos (N, 6) al empezar cada paso
+    :param destino: ángulos físicos (N, 6) objetivo
+    :param velocidad: velocidad 1..100 de cada paso (N,)
+    :return: (duraciones en s (N, 6), velocidades de pico en deg/s (N, 6))
+    """
+    origen = np.asarray(origen, dtype=np.float32)
+    destino = np.asarray(destino, dtype=np.float32)
+    escala = np.broadcast_to(velocidad_firmware(velocidad)[..., None], destino.shape).copy()
+    escala[..., list(SERVOS_VELOCIDAD_COMPLETA)] = 100.0
+    escala /= np.float32(100.0)
+
+    vmax = VEL_MAX_SERVO * escala
+    a = ACEL_MAX_SERVO * escala
+    d = np.abs(destino - origen)
+
+    t_acc = vmax / a
+    d_acc = np.float32(0.5) * a * t_acc * t_acc
+    triangular = d < 2 * d_acc
+    t_tri = np.sqrt(d / a)
+    t_total = np.where(triangular, 2 * t_tri, 2 * t_acc + (d - 2 * d_acc) / vmax)
+
+    # El firmware guarda la duración en ms enteros (truncando) con un mínimo de 100 ms
+    duracion_ms = np.maximum(np.floor(t_total * np.float32(1000.0)), DURACION_MINIMA_MS)
+    pico = np.where(triangular, a * t_tri, vmax)
+    return duracion_ms.astype(np.float64) / 1000.0, pico
+
+
+def predecir(inicio, angulos, velocidades):
+    """
+    Predicción de un movimiento completo: cada paso empieza donde terminó el anterior
+    (se envía al llegar el FIN del firmware).
+
+    :param inicio: ángulos lógicos (6,) del brazo antes del primer paso
+    :param angulos: ángulos lógicos (N, 6) de los pasos
+    :param velocidades: velocidad (N,) de cada paso
+    :return: (duración de cada paso en s (N,), velocidad de pico por servo lógico (N, 6))
+    """
+    destino = a_fisico(angulos).reshape(-1, 6)
+    if not len(destino):
+        return np.zeros(0), np.zeros((0, 6), dtype=np.float32)
+    origen = np.concatenate([a_fisico(inicio).reshape(1, 6), destino[:-1]])
+    duraciones, picos = perfil(origen, destino, velocidades)
+    return duraciones.max(axis=1), a_logico(picos)
+
+
+def resumen_prediccion(duraciones, picos):
+    """Diccionario para la API con la predicción de un movimiento."""
+    return {
+        "duracion_total_s": round(float(np.sum(duraciones)), 3),
+        "duraciones_s": [round(float(t), 3) for t in duraciones],
+        "velocidad_pico": [[round(float(v), 1) for v in fila] for fila in picos],
+        "velocidad_pico_max": [round(float(v), 1) for v in (picos.max(axis=0) if len(picos) else np.zeros(6))],
+    }
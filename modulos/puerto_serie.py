@@ -0,0 +1,269 @@
+# archivo: modulos/puerto_serie.py
+import time
+import heapq
+import logging
+import itertools
+import threading
+from collections import deque
+
+import numpy as np
+
+from .lector_serie import LectorSerie, ACK_GLOBAL
+
+# Prioridades de la cola de escritura (menor = antes)
+PRIORIDAD_BANDA = 0    # Banda, incluida la parada. FIFO entre ellos: adelantar la parada a un P anterior dejaría la banda en marcha
+PRIORIDAD_BRAZO = 1    # Movimientos del brazo
+PRIORIDAD_OTROS = 2    # Cualquier otra línea (sin respuesta del firmware)
+
+# Comandos con respuesta esperada en vuelo a la vez: el buffer de entrada del Arduino es de
+# 64 bytes y un "A,..." ocupa ~25, así que no se le envía más de lo que puede guardar.
+VENTANA_COMANDOS = 2
+TIMEOUT_RESPUESTA = 1.0  # Segundos sin respuesta tras los que un comando se da por perdido
+MUESTRAS_METRICAS = 200
+
+RESPUESTAS_BANDA = {"P": "MOTOR: START", "S": "MOTOR: STOP", "D": "MOTOR: DERECHA", "I": "MOTOR: IZQUIERDA"}
+
+
+def prioridad_comando(comando):
+    if comando in RESPUESTAS_BANDA:
+        return PRIORIDAD_BANDA
+    if comando.startswith(("A,", "S,")):
+        return PRIORIDAD_BRAZO
+    return PRIORIDAD_OTROS
+
+
+def respuesta_esperada(comando):
+    """Línea con la que el firmware confirma `comando`, o None si no responde."""
+    if comando in RESPUESTAS_BANDA:
+        return RESPUESTAS_BANDA[comando]
+    if comando.startswith("A,"):
+        return ACK_GLOBAL
+    if comando.startswith("S,"):
+        try:
+            servo = int(comando.split(",")[1])
+        except (IndexError, ValueError):
+            return None
+        return f"OK: SERVO {servo}" if 1 <= servo <= 6 else None
+    return None
+
+
+class Comando:
+    """
+    Un comando encolado en PuertoSerie. Es lo que devuelve `enviar()` y sirve de marca
+    para `esperar_fin`: `fines_en_ack` se rellena cuando llega la respuesta de este
+    comando concreto, no la de otro que estuviera en vuelo.
+    """
+
+    __slots__ = ("texto", "clave", "encolado", "enviado", "esperada", "fines_en_ack", "perdido")
+
+    def __init__(self, texto, clave=None):
+        self.texto = texto
+        self.clave = clave
+        self.encolado = time.time()
+        self.enviado = None
+        self.esperada = respuesta_esperada(texto)
+        self.fines_en_ack = None   # Valor de `fines` del lector al llegar su respuesta
+        self.perdido = False       # Sustituido en cola, error de escritura o sin respuesta
+
+
+class PuertoSerie(LectorSerie):
+    """
+    Único dueño del puerto serie del Arduino: brazo y banda escriben a través de él.
+
+    - Un hilo escritor saca los comandos de una cola con prioridad (banda y su parada
+      antes que el brazo; FIFO dentro de cada prioridad) y no deja más de `ventana`
+      comandos sin confirmar en vuelo.
+    - El hilo lector (LectorSerie) empareja cada `OK:`/`MOTOR:` con el comando
+      pendiente más antiguo que espera esa respuesta y mide el tiempo de ida y vuelta.
+    - `enviar(..., clave=...)`: un comando con la misma clave que otro aún en cola
+      lo sustituye (el jog manual solo necesita la última posición).
+    - `enviar()` devuelve el Comando; `esperar_fin(comando, ...)` espera al FIN posterior
+      a la respuesta de ese comando.
+    - `write(bytes)` mantiene la interfaz de serial.Serial para el código existente.
+    """
+
+    def __init__(self, conexion, ventana=VENTANA_COMANDOS):
+        super().__init__(conexion)
+        self.ventana = ventana
+        self._cola = []      # heap de (prioridad, secuencia, Comando)
+        self._claves = {}    # clave -> Comando de la cola aún sin enviar
+        self._secuencia = itertools.count()
+        self._pendientes = deque()  # Comandos enviados que esperan respuesta, en orden
+        self._escritor = None
+        self.enviados = 0
+        self.fusionados = 0
+        self.perdidos = 0
+        self.profundidad_max = 0
+        self._en_cola = 0
+        self._rtt = deque(maxlen=MUESTRAS_METRICAS)
+        self._espera_cola = deque(maxlen=MUESTRAS_METRICAS)
+
+    @property
+    def is_open(self):
+        return self._activo and self.conexion.is_open
+
+    def iniciar(self):
+        super().iniciar()
+        if self._escritor is None:
+            self._escritor = threading.Thread(target=self._bucle_escritura, name="escritor-serie", daemon=True)
+            self._escritor.start()
+
+    def detener(self):
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify_all()
+        if self._escritor and self._escritor is not threading.current_thread():
+            self._escritor.join(timeout=2.0)
+        self._escritor = None
+        super().detener()
+
+    def enviar(self, comando, prioridad=None, clave=None):
+        """
+        Encola `comando` (sin salto de línea). Devuelve el Comando encolado, o None si
+        el puerto ya no está activo.
+        """
+        comando = comando.strip()
+        if not comando:
+            return None
+        if prioridad is None:
+            prioridad = prioridad_comando(comando)
+        nuevo = Comando(comando, clave)
+        with self._condicion:
+            if not self._activo:
+                return None
+            anterior = self._claves.pop(clave, None) if clave is not None else None
+            if anterior is not None:
+                anterior.perdido = True
+                self._en_cola -= 1
+                self.fusionados += 1
+            heapq.heappush(self._cola, (prioridad, next(self._secuencia), nuevo))
+            if clave is not None:
+                self._claves[clave] = nuevo
+            self._en_cola += 1
+            self.profundidad_max = max(self.profundidad_max, self._en_cola)
+            self._condicion.notify_all()
+        return nuevo
+
+    def write(self, datos):
+        """Compatibilidad con serial.Serial.write: cada línea se encola como un comando."""
+        texto = datos.decode("utf-8", errors="replace") if isinstance(datos, bytes) else str(datos)
+        for linea in texto.splitlines():
+            self.enviar(linea)
+        return len(datos)
+
+    def _siguiente(self):
+        """Saca el siguiente Comando válido de la cola (con el lock tomado)."""
+        while self._cola:
+            _, _, comando = heapq.heappop(self._cola)
+            if comando.perdido:
+                continue
+            if comando.clave is not None and self._claves.get(comando.clave) is comando:
+                del self._claves[comando.clave]
+            self._en_cola -= 1
+            return comando
+        return None
+
+    def _perder(self, comando):
+        comando.perdido = True
+        self.perdidos += 1
+        logging.info(f"Advertencia: sin respuesta del Arduino a '{comando.texto}'")
+        self._condicion.notify_all()
+
+    def _caducar(self, ahora):
+        while self._pendientes and ahora - self._pendientes[0].enviado > TIMEOUT_RESPUESTA:
+            self._perder(self._pendientes.popleft())
+
+    def _bucle_escritura(self):
+        while True:
+            with self._condicion:
+                comando = None
+                while self._activo:
+                    self._caducar(time.time())
+                    if len(self._pendientes) < self.ventana:
+                        comando = self._siguiente()
+                        if comando is not None:
+                            break
+                    self._condicion.wait(0.05)
+                if comando is None:
+                    return
+                comando.enviado = time.time()
+                self._espera_cola.append(comando.enviado - comando.encolado)
+                if comando.esperada is not None:
+                    # Se registra antes de escribir: la respuesta puede llegar antes de que write() vuelva
+                    self._pendientes.append(comando)
+            try:
+                self.conexion.write(f"{comando.texto}\n".encode("utf-8"))
+                self.enviados += 1
+            except Exception as e:
+                logging.info(f"Error al enviar comando '{comando.texto}': {e}")
+                with self._condicion:
+                    if comando in self._pendientes:
+                        self._pendientes.remove(comando)
+                    comando.perdido = True
+                    self._condicion.notify_all()
+
+    def _procesar(self, linea):
+        with self._condicion:
+            super()._procesar(linea)
+            for i, comando in enumerate(self._pendientes):
+                if comando.esperada == linea:
+                    # Las respuestas llegan en orden: las anteriores sin respuesta se perdieron
+                    for _ in range(i):
+                        self._perder(self._pendientes.popleft())
+                    self._pendientes.popleft()
+                    comando.fines_en_ack = self.fines
+                    self._rtt.append(time.time() - comando.enviado)
+                    self._condicion.notify_all()
+                    break
+
+    def esperar_fin(self, marca, timeout, parada=None):
+        """
+        Como LectorSerie.esperar_fin, pero con `marca` = Comando devuelto por enviar():
+        primero su propia respuesta (el tiempo en cola no cuenta) y después un FIN
+        posterior a ella, hasta `timeout` segundos desde la respuesta.
+        """
+        if not isinstance(marca, Comando):
+            return super().esperar_fin(marca, timeout, parada)
+        with self._condicion:
+            limite = time.time() + timeout
+            while marca.fines_en_ack is None:
+                if parada is not None and parada.is_set():
+                    return None
+                if marca.perdido or not self._activo or (marca.enviado is not None and time.time() > limite):
+                    return False
+                if marca.enviado is None:
+                    # Aún en cola: el plazo empieza al escribirse
+                    limite = time.time() + timeout
+                self._condicion.wait(0.05)
+            limite = time.time() + timeout
+            while self.fines <= marca.fines_en_ack:
+                if parada is not None and parada.is_set():
+                    return None
+                restante = limite - time.time()
+                if restante <= 0 or not self._activo:
+                    if not self.fin_visto and not self.sin_fin:
+                        self.sin_fin = True
+                        logging.info("Advertencia: el firmware no envía FIN: MOVIMIENTO; se usan tiempos estimados")
+                    return False
+                self._condicion.wait(min(restante, 0.05))
+            return True
+
+    def estadisticas(self):
+        with self._condicion:
+            rtt = np.array(self._rtt) * 1000.0
+            espera = np.array(self._espera_cola) * 1000.0
+            return {
+                **super().estadisticas(),
+                "cola": self._en_cola,
+                "cola_max": self.profundidad_max,
+                "en_vuelo": len(self._pendientes),
+                "enviados": self.enviados,
+                "fusionados": self.fusionados,
+                "perdidos": self.perdidos,
+                "rtt_ms": {
+                    "media": round(float(rtt.mean()), 1) if len(rtt) else None,
+                    "p95": round(float(np.percentile(rtt, 95)), 1) if len(rtt) else None,
+                    "max": round(float(rtt.max()), 1) if len(rtt) else None,
+                },
+                "espera_cola_ms": round(float(espera.mean()), 1) if len(espera) else None,
+            }
@@ -2,6 +2,10 @@
 import numpy as np
 import cv2
 import os
+import threading
+from collections import namedtuple
+from .inferencia import obtener_sesion, SesionCombinada
+from .etiquetas import asegurar_indice
 
 COLOR_RANGES = {
     "rojo": [
@@ -17,11 +21,110 @@ COLOR_RANGES = {
     "vacio": []
 }
 
+TAMANO_ENTRADA = (224, 224)  # (ancho, alto) que esperan los modelos de Teachable Machine
+CLAHE_CLIP_LIMIT = 3.0
+CLAHE_TILE_GRID = (8, 8)
+
+# Resultado del preprocesado fusionado: imagen corregida, RGB 224x224 (uint8) para las CNN y HSV.
+# La normalización a [0, 1] la hace SesionInferencia directamente en el buffer del intérprete.
+FrameProcesado = namedtuple("FrameProcesado", ["corregido", "rgb", "hsv"])
+
+# CLAHE y preprocesadores por hilo: los objetos de OpenCV no son seguros entre hilos
+_locales = threading.local()
+
+def _obtener_clahe():
+    clahe = getattr(_locales, "clahe", None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+        _locales.clahe = clahe
+    return clahe
+
+def _obtener_preprocesador():
+    preprocesador = getattr(_locales, "preprocesador", None)
+    if preprocesador is None:
+        preprocesador = PreprocesadorFrame()
+        _locales.preprocesador = preprocesador
+    return preprocesador
+
+class PreprocesadorFrame:
+    """
+    Preprocesado en una sola pasada: corrige la iluminación (CLAHE sobre el canal L)
+    una vez por frame y deriva de esa misma imagen la entrada RGB 224x224 de las CNN
+    y la imagen HSV para la detección de color.
+
+    El CLAHE y todos los buffers intermedios se crean una vez y se reutilizan, por lo
+    que el FrameProcesado devuelto se sobrescribe en la siguiente llamada. Cada hilo
+    debe usar su propia instancia.
+    """
+
+    def __init__(self, tamano=TAMANO_ENTRADA):
+        self.tamano = tamano
+        self.clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+        ancho, alto = tamano
+        self._bgr_reducido = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._rgb_reducido = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._forma = None
+
+    def _reservar(self, forma):
+        alto, ancho = forma[:2]
+        self._lab = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._l = np.empty((alto, ancho), dtype=np.uint8)
+        self._l_corr = np.empty((alto, ancho), dtype=np.uint8)
+        self._corregido = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._hsv = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._forma = forma
+
+    def procesar(self, frame):
+        if frame is None:
+            return None
+        if frame.shape != self._forma:
+            self._reservar(frame.shape)
+
+        # 1. Corrección de iluminación (una única vez por frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=self._lab)
+        self._l[...] = self._lab[:, :, 0]
+        self.clahe.apply(self._l, dst=self._l_corr)
+        self._lab[:, :, 0] = self._l_corr
+        cv2.cvtColor(self._lab, cv2.COLOR_LAB2BGR, dst=self._corregido)
+
+        # 2. HSV a resolución completa para detectar_color_hsv
+        cv2.cvtColor(self._corregido, cv2.COLOR_BGR2HSV, dst=self._hsv)
+
+        # 3. Entrada 224x224: redimensionar antes de pasar a RGB (mismo resultado, menos píxeles)
+        cv2.resize(self._corregido, self.tamano, dst=self._bgr_reducido)
+        cv2.cvtColor(self._bgr_reducido, cv2.COLOR_BGR2RGB, dst=self._rgb_reducido)
+
+        return FrameProcesado(self._corregido, self._rgb_reducido, self._hsv)
+
+def recortar_roi(frame, roi):
+    """
+    Devuelve la vista (sin copiar) del frame dentro de `roi` = [x, y, ancho, alto] en
+    fracciones de 0 a 1 respecto al tamaño del frame. Sin ROI se devuelve el frame entero.
+    """
+    if frame is None or not roi:
+        return frame
+    alto, ancho = frame.shape[:2]
+    x, y, w, h = roi
+    x0, y0 = int(round(x * ancho)), int(round(y * alto))
+    x1, y1 = int(round((x + w) * ancho)), int(round((y + h) * alto))
+    x0, y0 = min(max(x0, 0), ancho - 1), min(max(y0, 0), alto - 1)
+    x1, y1 = min(max(x1, x0 + 1), ancho), min(max(y1, y0 + 1), alto)
+    return frame[y0:y1, x0:x1]
+
+def roi_envolvente(rois):
+    """ROI mínima que contiene a todas las de la lista (None si no hay ROIs)."""
+    if not rois:
+        return None
+    x0 = min(r[0] for r in rois)
+    y0 = min(r[1] for r in rois)
+    x1 = max(r[0] + r[2] for r in rois)
+    y1 = max(r[1] + r[3] for r in rois)
+    return [x0, y0, x1 - x0, y1 - y0]
+
 def corregir_iluminacion(frame):
     lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
     l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    l_corr = clahe.apply(l)
+    l_corr = _obtener_clahe().apply(l)
     lab_corr = cv2.merge((l_corr, a, b))
     return cv2.cvtColor(lab_corr, cv2.COLOR_LAB2BGR)
 
@@ -35,24 +138,188 @@ def preprocesar_imagen(frame):
     return np.float32(input_data) / 255.0
 
 def obtener_prediccion(interpreter, input_data, threshold=0.6):
+    """
+    `interpreter` puede ser una SesionInferencia o un intérprete TFLite; `input_data`
+    puede ser el RGB uint8 de PreprocesadorFrame o el tensor de preprocesar_imagen.
+    """
     try:
-        input_details = interpreter.get_input_details()
-        output_details = interpreter.get_output_details()
-        interpreter.set_tensor(input_details[0]['index'], input_data)
-        interpreter.invoke()
-        output_data = interpreter.get_tensor(output_details[0]['index'])[0]
-
-        class_idx = np.argmax(output_data)
-        max_prob = output_data[class_idx]
-        if max_prob < threshold:
-            return None, output_data
-        return class_idx, output_data
+        output_data = obtener_sesion(interpreter).predecir(input_data)
+        return _clase_con_umbral(output_data, threshold), output_data
     except Exception as e:
         print(f"❌ Error en predicción: {e}")
         return None, None
 
-def detectar_color_hsv(frame, area_threshold_ratio=0.01):
-    hsv = cv2.cvtColor(corregir_iluminacion(frame), cv2.COLOR_BGR2HSV)
+def _clase_con_umbral(output_data, threshold):
+    class_idx = np.argmax(output_data)
+    if output_data[class_idx] < threshold:
+        return None
+    return class_idx
+
+def _predecir_forma_y_color(ejecutor, interpreter_shape, interpreter_color, input_data,
+                            shape_threshold, color_threshold):
+    """Ambas CNN a la vez mediante el EjecutorInferencia (modo paralelo)."""
+    try:
+        salida_forma, salida_color = ejecutor.predecir_par(
+            obtener_sesion(interpreter_shape), obtener_sesion(interpreter_color), input_data)
+    except Exception as e:
+        print(f"❌ Error en predicción: {e}")
+        return None, None, None, None
+    return (_clase_con_umbral(salida_forma, shape_threshold),
+            _clase_con_umbral(salida_color, color_threshold),
+            salida_forma, salida_color)
+
+def _predecir_combinado(sesion, input_data, shape_threshold, color_threshold):
+    """Forma y color con un modelo multicabeza: una sola invocación."""
+    try:
+        salida_forma, salida_color = sesion.predecir(input_data)
+    except Exception as e:
+        print(f"❌ Error en predicción: {e}")
+        return None, None, None, None
+    return (_clase_con_umbral(salida_forma, shape_threshold),
+            _clase_con_umbral(salida_color, color_threshold),
+            salida_forma, salida_color)
+
+class ClasificadorColorLUT:
+    """
+    Clasificador de color HSV en una sola pasada.
+
+    Cada rango de COLOR_RANGES es una caja [H, S, V] y se le asigna un bit. Se precalcula
+    una tabla de 256 entradas por canal con los bits de las cajas que contienen ese
+    valor, de modo que `lut_h[H] & lut_s[S] & lut_v[V]` da las cajas a las que pertenece
+    el píxel (equivale a la tabla completa 180x256x256, pero ocupa 768 bytes). Una
+    segunda tabla traduce esos bits al id de la caja sobre una imagen de etiquetas (uint8).
+
+    La limpieza morfológica es la de la versión por rangos (erosión 1 + dilatación 2 de
+    cada caja y OR de las cajas de un mismo color). La erosión se hace una sola vez sobre
+    la imagen de etiquetas; la dilatación, por caja y solo en las que tienen píxeles, para
+    que donde se solapan las zonas dilatadas de dos colores el píxel cuente para ambos.
+    Cada hilo debe usar su propia instancia porque los buffers intermedios se reutilizan.
+    """
+
+    def __init__(self, rangos=None, morfologia=True):
+        rangos = COLOR_RANGES if rangos is None else rangos
+        self.colores = [color for color, r in rangos.items() if color != "vacio" and r]
+        self.morfologia = morfologia
+        self._kernel = np.ones((3, 3), np.uint8)
+
+        cajas = []  # (id_color, inferior, superior); los ids empiezan en 1, 0 es "fondo"
+        for id_color, color in enumerate(self.colores, start=1):
+            r = rangos[color]
+            for i in range(0, len(r), 2):
+                cajas.append((id_color, r[i], r[i + 1]))
+        if len(cajas) > 8:
+            raise ValueError("ClasificadorColorLUT admite como máximo 8 rangos HSV.")
+
+        # Una tabla por canal (H, S, V): cv2.LUT de un canal es mucho más rápido que la de 3
+        self._luts = [np.zeros(256, dtype=np.uint8) for _ in range(3)]
+        for bit, (_, inferior, superior) in enumerate(cajas):
+            for canal in range(3):
+                self._luts[canal][inferior[canal]:superior[canal] + 1] |= (1 << bit)
+        # Bits -> id de caja (1..n). Si un píxel cae en varias cajas gana la primera.
+        self._bits_a_caja = np.zeros(256, dtype=np.uint8)
+        for bits in range(1, 256):
+            primera = (bits & -bits).bit_length() - 1
+            if primera < len(cajas):
+                self._bits_a_caja[bits] = primera + 1
+        # Id de color -> ids de sus cajas, para unir sus máscaras antes de contar
+        self._cajas_por_color = [[caja for caja, c in enumerate(cajas, start=1) if c[0] == id_color]
+                                 for id_color in range(1, len(self.colores) + 1)]
+        self._forma = None
+
+    def _reservar(self, forma):
+        alto, ancho = forma[:2]
+        self._canales = [np.empty((alto, ancho), dtype=np.uint8) for _ in range(3)]
+        self._bits = [np.empty((alto, ancho), dtype=np.uint8) for _ in range(3)]
+        self._mascara = np.empty((alto, ancho), dtype=np.uint8)
+        self._etiquetas = np.empty((alto, ancho), dtype=np.uint8)
+        self._minimo = np.empty((alto, ancho), dtype=np.uint8)
+        self._maximo = np.empty((alto, ancho), dtype=np.uint8)
+        self._color = np.empty((alto, ancho), dtype=np.uint8)
+        self._forma = forma
+
+    def etiquetar(self, hsv):
+        """Imagen de etiquetas por caja HSV (0 = fondo) tras la erosión; `contar` dilata."""
+        if hsv.shape != self._forma:
+            self._reservar(hsv.shape)
+        cv2.split(hsv, self._canales)
+        for canal, lut, bits in zip(self._canales, self._luts, self._bits):
+            cv2.LUT(canal, lut, dst=bits)
+        cv2.bitwise_and(self._bits[0], self._bits[1], dst=self._mascara)
+        cv2.bitwise_and(self._mascara, self._bits[2], dst=self._mascara)
+        cv2.LUT(self._mascara, self._bits_a_caja, dst=self._etiquetas)
+        if self.morfologia:
+            # Erosión exacta por etiqueta: un píxel sobrevive solo si toda su vecindad 3x3
+            # tiene su misma etiqueta (mínimo == máximo), como al erosionar cada máscara.
+            cv2.erode(self._etiquetas, self._kernel, dst=self._minimo)
+            cv2.dilate(self._etiquetas, self._kernel, dst=self._maximo)
+            cv2.compare(self._minimo, self._maximo, cv2.CMP_EQ, dst=self._mascara)
+            cv2.bitwise_and(self._minimo, self._mascara, dst=self._etiquetas)
+        return self._etiquetas
+
+    def contar(self, hsv):
+        """Número de píxeles por id de color (posición 0 = fondo)."""
+        etiquetas = self.etiquetar(hsv)
+        conteos = np.zeros(len(self.colores) + 1, dtype=np.int64)
+        for id_color, cajas in enumerate(self._cajas_por_color, start=1):
+            union = None
+            for caja in cajas:
+                cv2.compare(etiquetas, caja, cv2.CMP_EQ, dst=self._mascara)
+                # Sin píxeles tras la erosión la dilatación tampoco añade nada
+                if not cv2.countNonZero(self._mascara):
+                    continue
+                if self.morfologia:
+                    cv2.dilate(self._mascara, self._kernel, dst=self._mascara, iterations=2)
+                if union is None and len(cajas) == 1:
+                    union = self._mascara
+                elif union is None:
+                    union = self._color
+                    np.copyto(union, self._mascara)
+                else:
+                    cv2.bitwise_or(union, self._mascara, dst=union)
+            if union is not None:
+                conteos[id_color] = cv2.countNonZero(union)
+        return conteos
+
+def _obtener_clasificador_color():
+    clasificador = getattr(_locales, "clasificador_color", None)
+    if clasificador is None:
+        clasificador = ClasificadorColorLUT()
+        _locales.clasificador_color = clasificador
+    return clasificador
+
+def analizar_color_hsv(hsv, area_threshold_ratio=0.01):
+    """
+    Devuelve (color, ratio, ratio_segundo): el color dominante ("vacio" si no supera
+    `area_threshold_ratio`), su fracción de píxeles y la del segundo color.
+    """
+    h, w = hsv.shape[:2]
+    total_area = float(h * w)
+
+    clasificador = _obtener_clasificador_color()
+    conteos = clasificador.contar(hsv)[1:]
+    if len(conteos) == 0:
+        return "vacio", 0.0, 0.0
+    orden = np.argsort(conteos)[::-1]
+    ratio = conteos[orden[0]] / total_area
+    ratio_segundo = conteos[orden[1]] / total_area if len(orden) > 1 else 0.0
+    if ratio < area_threshold_ratio:
+        return "vacio", ratio, ratio_segundo
+    return clasificador.colores[orden[0]], ratio, ratio_segundo
+
+def detectar_color_hsv(frame, area_threshold_ratio=0.01, hsv=None):
+    # Si el llamador ya tiene la imagen HSV corregida (PreprocesadorFrame) no se repite CLAHE
+    if hsv is None:
+        hsv = cv2.cvtColor(corregir_iluminacion(frame), cv2.COLOR_BGR2HSV)
+    return analizar_color_hsv(hsv, area_threshold_ratio)[0]
+
+def detectar_color_hsv_rangos(frame, area_threshold_ratio=0.01, hsv=None):
+    """
+    Implementación de referencia (un inRange + erode + dilate por rango). Se conserva
+    para comparar exactitud y rendimiento con ClasificadorColorLUT.
+    """
+    # Si el llamador ya tiene la imagen HSV corregida (PreprocesadorFrame) no se repite CLAHE
+    if hsv is None:
+        hsv = cv2.cvtColor(corregir_iluminacion(frame), cv2.COLOR_BGR2HSV)
     h, w = hsv.shape[:2]
     total_area = h * w
 
@@ -86,66 +353,164 @@ def detectar_color_hsv(frame, area_threshold_ratio=0.01):
         return "vacio"
     return max_color
 
+class CascadaClasificacion:
+    """
+    Configuración y contadores del modo cascada de reconocimiento_de_objetos:
+
+    - Si el modelo de forma devuelve "vacio" (o no supera el umbral) no se ejecutan
+      ni la detección HSV ni el modelo de color.
+    - Si la detección HSV es decisiva (fracción de píxeles >= `umbral_decisivo` y al
+      menos `margen_decisivo` veces la del segundo color) se omite el modelo de color,
+      ya que el color HSV prevalece sobre el de la CNN de todas formas.
+    """
+
+    def __init__(self, umbral_decisivo=0.05, margen_decisivo=2.0):
+        self.umbral_decisivo = umbral_decisivo
+        self.margen_decisivo = margen_decisivo
+        self.frames = 0
+        self.hsv_omitido = 0         # Frames en los que la forma fue "vacio"
+        self.color_cnn_omitido = 0   # Frames resueltos solo con HSV
+        self.color_cnn_ejecutado = 0
+
+    def es_decisivo(self, ratio, ratio_segundo):
+        return ratio >= self.umbral_decisivo and ratio >= self.margen_decisivo * ratio_segundo
+
+    def estadisticas(self):
+        return {
+            "frames": self.frames,
+            "hsv_omitido": self.hsv_omitido,
+            "color_cnn_omitido": self.color_cnn_omitido,
+            "color_cnn_ejecutado": self.color_cnn_ejecutado,
+        }
+
+class ResultadoReconocimiento:
+    """
+    Resultado estructurado de reconocimiento_de_objetos.
+
+    - `forma` / `color`: Etiqueta de IndiceEtiquetas (None si no hay objeto).
+    - `prob_forma` / `prob_color`: vectores de salida de las CNN (None si no se ejecutaron).
+    - `clave`: tupla ("id forma", "id color") con la que se buscan las reglas.
+    - `str(resultado)` conserva el formato antiguo "0 circulo_1 azul" / "vacio_vacio" para logs.
+    """
+
+    __slots__ = ("forma", "color", "prob_forma", "prob_color", "clave")
+
+    def __init__(self, forma=None, color=None, prob_forma=None, prob_color=None):
+        self.forma = forma
+        self.color = color
+        self.prob_forma = prob_forma
+        self.prob_color = prob_color
+        if forma is None or color is None:
+            self.clave = None
+        else:
+            self.clave = (f"{forma.id} {forma.nombre}", f"{color.id} {color.nombre}")
+
+    @property
+    def vacio(self):
+        return self.clave is None
+
+    @property
+    def confianza(self):
+        """Probabilidad conjunta forma x color según las CNN (el color HSV cuenta como 1.0)."""
+        if self.clave is None:
+            return 0.0
+        confianza = float(np.max(self.prob_forma)) if self.prob_forma is not None else 1.0
+        if self.prob_color is not None:
+            confianza *= float(np.max(self.prob_color))
+        return confianza
+
+    def __str__(self):
+        if self.clave is None:
+            return "vacio_vacio"
+        return f"{self.clave[0]}_{self.clave[1]}"
+
+    __repr__ = __str__
+
+RESULTADO_VACIO = ResultadoReconocimiento()
+
 def reconocimiento_de_objetos(frame,
                               interpreter_shape, shape_labels,
                               interpreter_color, color_labels,
-                              shape_threshold=0.6, color_threshold=0.6):
+                              shape_threshold=0.6, color_threshold=0.6,
+                              preprocesador=None, ejecutor=None, roi=None, cascada=None):
+    """
+    Clasifica forma y color del objeto del frame (o de la zona `roi`) y devuelve un
+    ResultadoReconocimiento. `shape_labels` / `color_labels` deben ser IndiceEtiquetas
+    construidos al cargar los modelos; las listas de texto se siguen aceptando, pero se
+    parsean en cada llamada. Si `interpreter_shape` es una SesionCombinada (modelo
+    multicabeza) forma y color salen de una sola invocación e `interpreter_color` se ignora.
+    """
     if frame is None:
-        return "vacio_vacio"
-    input_data = preprocesar_imagen(frame)
-    if input_data is None:
-        return "vacio_vacio"
-
-    # Forma
-    shape_class, _ = obtener_prediccion(interpreter_shape, input_data, threshold=shape_threshold)
-    if shape_class is None:
-        return "vacio_vacio"
-    shape_label = shape_labels[shape_class]
-
-    # Color
-    color_class, _ = obtener_prediccion(interpreter_color, input_data, threshold=color_threshold)
-    if color_class is None:
-        return "vacio_vacio"
-    color_label = color_labels[color_class]
+        return RESULTADO_VACIO
+    indice_forma = asegurar_indice(shape_labels, "forma")
+    indice_color = asegurar_indice(color_labels, "color")
+    # Solo se procesa la zona de interés: menos píxeles en CLAHE, resize y HSV
+    frame = recortar_roi(frame, roi)
+    # Corrección de iluminación única: el mismo frame corregido alimenta CNN y HSV
+    procesado = (preprocesador or _obtener_preprocesador()).procesar(frame)
+    if procesado is None:
+        return RESULTADO_VACIO
+    input_data = procesado.rgb
+    color_hsv = None
+    color_class = None
+    prob_color = None
+
+    if isinstance(interpreter_shape, SesionCombinada):
+        # Modelo multicabeza: no hay CNN de color que omitir, la cascada solo evita el HSV
+        if cascada is not None:
+            cascada.frames += 1
+        shape_class, color_class, prob_forma, prob_color = _predecir_combinado(
+            interpreter_shape, input_data, shape_threshold, color_threshold)
+        if cascada is not None and (shape_class is None or indice_forma[shape_class].vacia):
+            cascada.hsv_omitido += 1
+        if shape_class is None or color_class is None:
+            return RESULTADO_VACIO
+    elif cascada is not None:
+        # Cascada: forma -> HSV -> (solo si hace falta) CNN de color
+        cascada.frames += 1
+        shape_class, prob_forma = obtener_prediccion(interpreter_shape, input_data, threshold=shape_threshold)
+        if shape_class is None or indice_forma[shape_class].vacia:
+            cascada.hsv_omitido += 1
+            return RESULTADO_VACIO
+        color_hsv, ratio, ratio_segundo = analizar_color_hsv(procesado.hsv, area_threshold_ratio=0.01)
+        if cascada.es_decisivo(ratio, ratio_segundo) and indice_color.buscar_nombre(color_hsv) is not None:
+            cascada.color_cnn_omitido += 1
+        else:
+            cascada.color_cnn_ejecutado += 1
+            color_class, prob_color = obtener_prediccion(interpreter_color, input_data, threshold=color_threshold)
+            if color_class is None:
+                return RESULTADO_VACIO
+    elif ejecutor is not None and ejecutor.paralelo:
+        # Forma y color se invocan simultáneamente en hilos distintos
+        shape_class, color_class, prob_forma, prob_color = _predecir_forma_y_color(
+            ejecutor, interpreter_shape, interpreter_color, input_data,
+            shape_threshold, color_threshold)
+        if shape_class is None or color_class is None:
+            return RESULTADO_VACIO
+    else:
+        # Forma
+        shape_class, prob_forma = obtener_prediccion(interpreter_shape, input_data, threshold=shape_threshold)
+        if shape_class is None:
+            return RESULTADO_VACIO
+
+        # Color
+        color_class, prob_color = obtener_prediccion(interpreter_color, input_data, threshold=color_threshold)
+        if color_class is None:
+            return RESULTADO_VACIO
+    forma = indice_forma[shape_class]
+    # En cascada la etiqueta de color puede faltar si el HSV fue decisivo
+    color_cnn = indice_color[color_class] if color_class is not None else None
 
     # Si literal es "vacio"
-    if "vacio" in shape_label.lower() or "vacio" in color_label.lower():
-        return "vacio_vacio"
+    if forma.vacia or (color_cnn is not None and color_cnn.vacia):
+        return RESULTADO_VACIO
 
     # HSV (opcional, si sigues usando rangos)
-    color_hsv = detectar_color_hsv(frame, area_threshold_ratio=0.01)
+    if color_hsv is None:
+        color_hsv = detectar_color_hsv(frame, area_threshold_ratio=0.01, hsv=procesado.hsv)
 
-    # Parsear etiquetas
-    parts_shape = shape_label.split(' ', 1)
-    if len(parts_shape) == 2:
-        shape_id, shape_name = parts_shape
-    else:
-        shape_id = parts_shape[0]
-        shape_name = "desconocido"
-
-    color_prefix = None
-    if color_hsv != "vacio":
-        for clabel in color_labels:
-            if '_' in clabel:
-                cparts = clabel.split('_', 1)
-            else:
-                cparts = clabel.split(' ', 1)
-            if len(cparts) == 2:
-                cprefix, cname = cparts
-                if cname.lower() == color_hsv.lower():
-                    color_prefix = cprefix
-                    break
-
-    # Construir salida
-    if color_prefix is not None and color_hsv != "vacio":
-        return f"{shape_id} {shape_name}_{color_prefix} {color_hsv}"
-    else:
-        if '_' in color_label:
-            cparts = color_label.split('_', 1)
-        else:
-            cparts = color_label.split(' ', 1)
-        if len(cparts) == 2:
-            cprefix, cname = cparts
-            return f"{shape_id} {shape_name}_{cprefix} {cname}"
-        else:
-            return f"{shape_id} {shape_name}_0 desconocido"
\ No newline at end of file
+    # El color HSV prevalece sobre el de la CNN si existe una etiqueta con ese nombre
+    color = indice_color.buscar_nombre(color_hsv) if color_hsv != "vacio" else None
+    if color is None:
+        color = color_cnn
+    return ResultadoReconocimiento(forma, color, prob_forma, prob_color)
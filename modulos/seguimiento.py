@@ -0,0 +1,299 @@
+# archivo: modulos/seguimiento.py
+import time
+import threading
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+TAMANO_SEGMENTACION = (160, 120)  # Resolución de trabajo (ancho, alto) para buscar objetos
+UMBRAL_FONDO = 30                 # Diferencia (máx. por canal) respecto al fondo para ser objeto
+AREA_MINIMA = 0.004               # Fracción del frame por debajo de la cual un contorno es ruido
+APRENDIZAJE_FONDO = 0.05          # Peso de cada frame vacío en el fondo acumulado
+DISTANCIA_MAXIMA = 0.15           # Salto máximo (fracción del frame) entre frames de una misma pista
+FRAMES_PERDIDA = 5                # Frames sin ver una pista antes de descartarla
+HISTORIAL_PISTA = 20              # Posiciones que guarda cada pista para estimar su velocidad
+SUAVIZADO_VELOCIDAD = 0.3         # Peso de la medida nueva en la media exponencial de la banda
+EJE_BANDA = "x"                   # Eje de la imagen en el que avanza la banda ("x" o "y")
+LINEA_RECOGIDA = 0.5              # Posición (fracción del eje) donde el brazo recoge el objeto
+ADELANTO_RECOGIDA = 0.8           # Segundos desde lanzar el movimiento hasta que la pinza llega a la banda
+
+# Objeto encontrado en un frame; coordenadas en fracciones (0 a 1) del frame como las ROIs
+Deteccion = namedtuple("Deteccion", ["cx", "cy", "caja", "area"])
+
+
+class SegmentadorObjetos:
+    """
+    Separa los objetos de la banda restando un fondo aprendido con la banda vacía.
+
+    Trabaja a baja resolución (como DetectorCambios) y devuelve el centroide, la caja
+    y el área de cada contorno. El fondo solo se actualiza cuando el reconocimiento
+    dice que la banda está vacía, para que un objeto parado no acabe formando parte de él.
+    """
+
+    def __init__(self, tamano=TAMANO_SEGMENTACION, umbral=UMBRAL_FONDO, area_minima=AREA_MINIMA,
+                 aprendizaje=APRENDIZAJE_FONDO):
+        self.tamano = tamano
+        self.umbral = umbral
+        self.area_minima = area_minima
+        self.aprendizaje = aprendizaje
+        self._fondo = None
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+    def _reducir(self, frame):
+        reducido = cv2.resize(frame, self.tamano, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(reducido, (5, 5), 0)
+
+    @property
+    def tiene_fondo(self):
+        return self._fondo is not None
+
+    def aprender_fondo(self, frame):
+        """Incorpora un frame de banda vacía al fondo (media exponencial)."""
+        reducido = self._reducir(frame)
+        if self._fondo is None:
+            self._fondo = reducido.astype(np.float32)
+        else:
+            cv2.accumulateWeighted(reducido, self._fondo, self.aprendizaje)
+
+    def segmentar(self, frame):
+        """Lista de Deteccion del frame (vacía mientras no haya fondo)."""
+        if self._fondo is None:
+            return []
+        reducido = self._reducir(frame)
+        diferencia = cv2.absdiff(reducido, cv2.convertScaleAbs(self._fondo))
+        if diferencia.ndim == 3:
+            diferencia = diferencia.max(axis=2)
+        _, mascara = cv2.threshold(diferencia, self.umbral, 255, cv2.THRESH_BINARY)
+        mascara = cv2.morphologyEx(mascara, cv2.MORPH_OPEN, self._kernel)
+        mascara = cv2.morphologyEx(mascara, cv2.MORPH_CLOSE, self._kernel, iterations=2)
+        contornos, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        ancho, alto = self.tamano
+        total = float(ancho * alto)
+        detecciones = []
+        for contorno in contornos:
+            area = cv2.contourArea(contorno) / total
+            if area < self.area_minima:
+                continue
+            momentos = cv2.moments(contorno)
+            if momentos["m00"] == 0:
+                continue
+            x, y, w, h = cv2.boundingRect(contorno)
+            detecciones.append(Deteccion(momentos["m10"] / momentos["m00"] / ancho,
+                                         momentos["m01"] / momentos["m00"] / alto,
+                                         (x / ancho, y / alto, w / ancho, h / alto), area))
+        return detecciones
+
+    def reiniciar(self):
+        self._fondo = None
+
+
+class Pista:
+    """Un objeto seguido a lo largo de varios frames."""
+
+    def __init__(self, id_pista, deteccion, ahora):
+        self.id = id_pista
+        self.historial = deque(maxlen=HISTORIAL_PISTA)  # (t, cx, cy)
+        self.perdidos = 0
+        self.creada = ahora
+        self.velocidad = None  # (vx, vy) en fracciones del frame por segundo
+        self.actualizar(deteccion, ahora)
+
+    def actualizar(self, deteccion, ahora):
+        self.deteccion = deteccion
+        self.historial.append((ahora, deteccion.cx, deteccion.cy))
+        self.perdidos = 0
+        if len(self.historial) >= 3 and self.historial[-1][0] - self.historial[0][0] > 0.1:
+            # Recta por mínimos cuadrados: menos sensible al ruido del centroide que dos puntos
+            t, x, y = np.array(self.historial).T
+            t = t - t[0]
+            self.velocidad = (float(np.polyfit(t, x, 1)[0]), float(np.polyfit(t, y, 1)[0]))
+
+    @property
+    def posicion(self):
+        return self.historial[-1][1], self.historial[-1][2]
+
+    def predecir(self, ahora):
+        """Posición esperada en `ahora` suponiendo velocidad constante."""
+        t, x, y = self.historial[-1]
+        if self.velocidad is None:
+            return x, y
+        return x + self.velocidad[0] * (ahora - t), y + self.velocidad[1] * (ahora - t)
+
+
+class SeguidorCentroides:
+    """
+    Asocia las detecciones de cada frame con las pistas existentes por cercanía a la
+    posición predicha, y estima la velocidad de la banda como la media exponencial de
+    la mediana de las velocidades de las pistas a lo largo de `eje`.
+    """
+
+    def __init__(self, eje=EJE_BANDA, distancia_maxima=DISTANCIA_MAXIMA, frames_perdida=FRAMES_PERDIDA):
+        self.eje = 0 if eje == "x" else 1
+        self.distancia_maxima = distancia_maxima
+        self.frames_perdida = frames_perdida
+        self.pistas = {}
+        self._siguiente_id = 1
+        self.velocidad_banda = None  # Fracciones del eje por segundo (con signo)
+
+    def actualizar(self, detecciones, ahora=None):
+        """Procesa las detecciones de un frame y devuelve las pistas activas."""
+        ahora = time.time() if ahora is None else ahora
+        pistas = list(self.pistas.values())
+        pares = []
+        for i, pista in enumerate(pistas):
+            px, py = pista.predecir(ahora)
+            for j, det in enumerate(detecciones):
+                distancia = np.hypot(det.cx - px, det.cy - py)
+                if distancia <= self.distancia_maxima:
+                    pares.append((distancia, i, j))
+
+        # Asociación voraz: primero los pares más cercanos
+        usadas, asignadas = set(), set()
+        for _, i, j in sorted(pares):
+            if i in usadas or j in asignadas:
+                continue
+            pistas[i].actualizar(detecciones[j], ahora)
+            usadas.add(i)
+            asignadas.add(j)
+
+        for i, pista in enumerate(pistas):
+            if i not in usadas:
+                pista.perdidos += 1
+                if pista.perdidos > self.frames_perdida:
+                    del self.pistas[pista.id]
+        for j, det in enumerate(detecciones):
+            if j not in asignadas:
+                self.pistas[self._siguiente_id] = Pista(self._siguiente_id, det, ahora)
+                self._siguiente_id += 1
+
+        self._estimar_velocidad()
+        return list(self.pistas.values())
+
+    def _estimar_velocidad(self):
+        medidas = [p.velocidad[self.eje] for p in self.pistas.values()
+                   if p.velocidad is not None and p.perdidos == 0]
+        if not medidas:
+            return
+        medida = float(np.median(medidas))
+        if self.velocidad_banda is None:
+            self.velocidad_banda = medida
+        else:
+            self.velocidad_banda += SUAVIZADO_VELOCIDAD * (medida - self.velocidad_banda)
+
+    def reiniciar(self):
+        self.pistas.clear()
+
+
+class SeguimientoBanda:
+    """
+    Segmentación + seguimiento + predicción de llegada a la zona de recogida.
+
+    Con `al_vuelo` activo el bucle de ejecución usa `instante_disparo` para lanzar el
+    movimiento sin parar la banda: el objeto llega a `linea_recogida` a la vez que la
+    pinza, que tarda `adelanto` segundos desde que empieza el movimiento.
+
+    Sin recogida al vuelo, la banda se para cuando el objeto llega a `linea_recogida`
+    (si se conoce su velocidad), no en cuanto se decide recogerlo.
+
+    Con `multiobjeto` el bucle de ejecución clasifica cada pista por separado y las
+    recoge en orden desde una ColaObjetos; en ese modo el hilo de visión actualiza el
+    seguimiento mientras el del brazo lo consulta, de ahí el lock.
+    """
+
+    def __init__(self, eje=EJE_BANDA, linea_recogida=LINEA_RECOGIDA, adelanto=ADELANTO_RECOGIDA,
+                 al_vuelo=False, multiobjeto=False, segmentador=None, seguidor=None):
+        self.segmentador = segmentador or SegmentadorObjetos()
+        self.seguidor = seguidor or SeguidorCentroides(eje)
+        self.linea_recogida = linea_recogida
+        self.adelanto = adelanto
+        self.al_vuelo = al_vuelo
+        self.multiobjeto = multiobjeto
+        self.cola = None  # ColaObjetos de la ejecución en curso (modo multiobjeto)
+        self._lock = threading.Lock()
+        self.recogidas_al_vuelo = 0
+        self.recogidas_con_parada = 0
+
+    @property
+    def velocidad_banda(self):
+        return self.seguidor.velocidad_banda
+
+    def actualizar(self, frame, vacio=False, ahora=None):
+        """
+        Segmenta y sigue los objetos de un frame. `vacio` indica que el reconocimiento
+        no ve nada: si la segmentación tampoco, el frame se usa para aprender el fondo.
+        """
+        ahora = time.time() if ahora is None else ahora
+        if not self.segmentador.tiene_fondo:
+            if vacio:
+                self.segmentador.aprender_fondo(frame)
+            detecciones = []
+        else:
+            detecciones = self.segmentador.segmentar(frame)
+            if vacio and not detecciones:
+                self.segmentador.aprender_fondo(frame)
+        with self._lock:
+            return self.seguidor.actualizar(detecciones, ahora)
+
+    @property
+    def tiene_fondo(self):
+        return self.segmentador.tiene_fondo
+
+    def objetivo(self):
+        """Pista que corresponde al objeto reconocido: la más antigua de las visibles."""
+        with self._lock:
+            visibles = [p for p in self.seguidor.pistas.values() if p.perdidos == 0]
+        if not visibles:
+            return None
+        return min(visibles, key=lambda p: (p.creada, -p.deteccion.area))
+
+    def activa(self, pista):
+        """True mientras la pista no se haya descartado (puede faltar en algún frame)."""
+        with self._lock:
+            return pista.id in self.seguidor.pistas
+
+    def visible(self, pista):
+        """True si la pista sigue activa y se vio en el último frame."""
+        with self._lock:
+            return pista.id in self.seguidor.pistas and pista.perdidos == 0
+
+    def tiempo_hasta_recogida(self, pista, ahora=None):
+        """
+        Segundos hasta que `pista` cruce la línea de recogida, o None si la banda no se
+        mueve (todavía sin estimación) o el objeto ya la ha pasado.
+        """
+        ahora = time.time() if ahora is None else ahora
+        velocidad = self.velocidad_banda
+        if pista is None or not velocidad:
+            return None
+        posicion = pista.predecir(ahora)[self.seguidor.eje]
+        tiempo = (self.linea_recogida - posicion) / velocidad
+        return tiempo if tiempo >= 0 else None
+
+    def instante_disparo(self, pista, ahora=None, adelanto=None):
+        """
+        Instante (time.time()) en que hay que lanzar el movimiento, o None si no llega a
+        tiempo. Con `adelanto=0`, instante en que el objeto cruza la línea de recogida.
+        """
+        ahora = time.time() if ahora is None else ahora
+        adelanto = self.adelanto if adelanto is None else adelanto
+        tiempo = self.tiempo_hasta_recogida(pista, ahora)
+        if tiempo is None or tiempo < adelanto:
+            return None
+        return ahora + tiempo - adelanto
+
+    def reiniciar(self):
+        with self._lock:
+            self.seguidor.reiniciar()
+
+    def estadisticas(self):
+        return {
+            "pistas": len(self.seguidor.pistas),
+            "multiobjeto": self.multiobjeto,
+            "velocidad_banda": round(self.velocidad_banda, 4) if self.velocidad_banda is not None else None,
+            "al_vuelo": self.al_vuelo,
+            "recogidas_al_vuelo": self.recogidas_al_vuelo,
+            "recogidas_con_parada": self.recogidas_con_parada,
+            "cola": self.cola.estadisticas() if self.cola is not None else None,
+        }
@@ -29,6 +29,14 @@ def get_ip_address():
 # Creamos la instancia de la aplicación usando la fábrica
 app = create_app()
 
+def servir(host, port):
+    # Con Flask-SocketIO el servidor también atiende el jog por WebSocket
+    from app.routes_socket import socketio
+    if socketio:
+        socketio.run(app, host=host, port=port, debug=True, use_reloader=False, allow_unsafe_werkzeug=True)
+    else:
+        app.run(host=host, port=port, debug=True, use_reloader=False)
+
 if __name__ == '__main__':
     # Configuración según README original (Puerto 80 preferido para RPi)
     PORT = 5000
@@ -46,13 +54,13 @@ if __name__ == '__main__':
         # IMPORTANTE: use_reloader=False evita que Flask cree un proceso hijo.
         # Esto es vital cuando iniciamos hilos de hardware (Serial/Cámara) en el arranque,
         # para evitar que se inicien dos veces y causen conflictos de "Access Denied".
-        app.run(host=HOST, port=PORT, debug=True, use_reloader=False)
+        servir(HOST, PORT)
         
     except PermissionError:
         # Si no tenemos permisos de root en Linux para puerto 80, fallback a 5000
         print(f"⚠️  Permiso denegado en puerto {PORT}. Intentando en puerto 5000...")
         print(f"🌍 Nuevo Panel de Control: http://{ip_addr}:5000")
-        app.run(host=HOST, port=5000, debug=True, use_reloader=False)
+        servir(HOST, 5000)
         
     finally:
         # Paridad con app.py original: Limpieza segura al salir (Ctrl+C)
@@ -62,6 +70,10 @@ if __name__ == '__main__':
             robot.modbus.stop()
             print("✅ Conexión Modbus cerrada.")
             
+        robot.release_cameras()
+        print("✅ Cámara liberada.")
+            
+        robot.stop_serial_io()
         if robot.serial_port and robot.serial_port.is_open:
             robot.serial_port.close()
             print("✅ Puerto Serie cerrado.")
@@ -78,6 +78,28 @@ const RobotAPI = {
         } catch (e) { console.error("Error moverServos:", e); }
     },
 
+    // --- Jog por WebSocket (Socket.IO) ---
+    // El servidor limita la frecuencia y se queda con el último valor de cada servo,
+    // así que se puede emitir en cada evento 'input' del slider sin saturar el enlace.
+    socketJog: null,
+
+    usarSocketJog: (socket) => { RobotAPI.socketJog = socket; },
+
+    /** Devuelve false si no hay socket conectado (el llamador debe usar moverServos). */
+    jogServo: (servo, angulo, velocidad) => {
+        const s = RobotAPI.socketJog;
+        if (!s || !s.connected) return false;
+        s.emit("jog", { servo, angulo, velocidad });
+        return true;
+    },
+
+    jog: (servos, velocidad) => {
+        const s = RobotAPI.socketJog;
+        if (!s || !s.connected) return false;
+        s.emit("jog", { servos, velocidad });
+        return true;
+    },
+
     // ==========================================
     // 3. CINEMÁTICA Y PUNTOS
     // ==========================================
@@ -184,6 +206,14 @@ const RobotAPI = {
         } catch (e) { console.error("Error ejecutarMovimiento:", e); }
     },
 
+    predecirMovimiento: async (nombre) => {
+        try {
+            const res = await fetch(`/prediccion_movimiento/${nombre}`);
+            if (!res.ok) throw new Error("No encontrado");
+            return await res.json();
+        } catch (e) { return null; }
+    },
+
     borrarMovimiento: async (nombre) => {
         try {
             const res = await fetch(`/borrar_movimiento/${nombre}`, { method: "DELETE" });
@@ -20,12 +20,18 @@ let estadoRobot = {
 let pasosSecuencia = [];   // Buffer temporal para crear nuevos movimientos
 let interaccionUsuario = false; // Flag para evitar conflictos con actualizaciones automáticas
 
-// --- Configuración de Debounce (Evitar saturar la red) ---
+// --- Envío de movimientos manuales (jog) ---
+// Con Socket.IO cada cambio se emite al momento: el servidor limita la frecuencia y se
+// queda con el último valor de cada servo. Sin socket, debounce por HTTP como antes.
 let timeoutMovimiento = null;
-const enviarMovimientoDebounced = () => {
+const enviarMovimientoDebounced = (servo) => {
+    const porSocket = servo
+        ? RobotAPI.jogServo(servo, estadoRobot.servos[servo - 1], estadoRobot.velocidad)
+        : RobotAPI.jog(estadoRobot.servos, estadoRobot.velocidad);
+
     clearTimeout(timeoutMovimiento);
     timeoutMovimiento = setTimeout(() => {
-        RobotAPI.moverServos(estadoRobot.servos, estadoRobot.velocidad);
+        if (!porSocket) RobotAPI.moverServos(estadoRobot.servos, estadoRobot.velocidad);
         actualizarCinematica(); // Actualizamos coordenadas al detenerse
     }, 100); // Espera 100ms de inactividad antes de enviar
 };
@@ -60,6 +66,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     try {
         if(window.io) {
             socket = io();
+            RobotAPI.usarSocketJog(socket);
             socket.on('connect', () => console.log("Socket Conectado"));
             socket.on('state_updated', (data) => {
                 // Solo actualizamos si el usuario NO está tocando los controles
@@ -99,8 +106,8 @@ function configurarControles() {
             // Actualizar Simulación (Inmediato)
             if(simulation) simulation.updateAngles(estadoRobot.servos);
             
-            // Enviar a Robot (Debounce)
-            enviarMovimientoDebounced();
+            // Enviar a Robot (jog por socket o debounce HTTP)
+            enviarMovimientoDebounced(i);
         });
 
         // Al soltar
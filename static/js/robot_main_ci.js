@@ -63,6 +63,11 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // 5. Cargar utilidades
     cargarListaPuntos();
+
+    // 6. Canal de jog por Socket.IO (si existe); si no, se usa la API HTTP
+    try {
+        if (window.io) RobotAPI.usarSocketJog(io());
+    } catch (e) { console.warn("Socket.IO no disponible"); }
 });
 
 // ==========================================
@@ -227,7 +232,9 @@ async function ejecutarMovimiento() {
 
     // 1. Mover Robot Real (Llamada al Backend)
     // Usamos el API existente. Esto es asíncrono.
-    await RobotAPI.moverServos(pendingSolution, 50); // Velocidad media por defecto
+    if (!RobotAPI.jog(pendingSolution, 50)) {      // Velocidad media por defecto
+        await RobotAPI.moverServos(pendingSolution, 50);
+    }
 
     // 2. Feedback final
     // Ocultar fantasma porque el real ya llegó (o va a llegar)